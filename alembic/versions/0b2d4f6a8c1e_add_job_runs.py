@@ -0,0 +1,42 @@
+"""add job_runs for background job metrics
+
+Revision ID: 0b2d4f6a8c1e
+Revises: f2b4d6e8a0c3
+Create Date: 2026-10-20 09:12:37.448210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b2d4f6a8c1e'
+down_revision: Union[str, None] = 'f2b4d6e8a0c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('job_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job', sa.String(length=50), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('counters', sa.JSON(), nullable=True),
+    sa.Column('summaries', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_runs_id'), 'job_runs', ['id'], unique=False)
+    op.create_index('ix_job_runs_job_started_at', 'job_runs', ['job', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_job_runs_job_started_at', table_name='job_runs')
+    op.drop_index(op.f('ix_job_runs_id'), table_name='job_runs')
+    op.drop_table('job_runs')
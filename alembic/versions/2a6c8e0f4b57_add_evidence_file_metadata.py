@@ -0,0 +1,46 @@
+"""add evidence file metadata columns
+
+Revision ID: 2a6c8e0f4b57
+Revises: 9d1f3b5e7c20
+Create Date: 2026-10-19 15:02:47.318260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a6c8e0f4b57'
+down_revision: Union[str, None] = '9d1f3b5e7c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('evidence', sa.Column('byte_size', sa.BigInteger(), nullable=True))
+    op.add_column('evidence', sa.Column('mime_type', sa.String(), nullable=True))
+    op.add_column('evidence', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('height', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('duration_seconds', sa.Float(), nullable=True))
+    op.add_column('evidence', sa.Column('captured_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('evidence', sa.Column('gps_latitude', sa.Float(), nullable=True))
+    op.add_column('evidence', sa.Column('gps_longitude', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_evidence_mime_type'), 'evidence', ['mime_type'], unique=False)
+    op.create_index(op.f('ix_evidence_captured_at'), 'evidence', ['captured_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_evidence_captured_at'), table_name='evidence')
+    op.drop_index(op.f('ix_evidence_mime_type'), table_name='evidence')
+    op.drop_column('evidence', 'gps_longitude')
+    op.drop_column('evidence', 'gps_latitude')
+    op.drop_column('evidence', 'captured_at')
+    op.drop_column('evidence', 'duration_seconds')
+    op.drop_column('evidence', 'height')
+    op.drop_column('evidence', 'width')
+    op.drop_column('evidence', 'mime_type')
+    op.drop_column('evidence', 'byte_size')
@@ -0,0 +1,48 @@
+"""add stored_blobs and evidence.content_sha256
+
+Revision ID: 3f9a1c7d2b41
+Revises: cf380fcfb32c
+Create Date: 2026-10-19 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2b41'
+down_revision: Union[str, None] = 'cf380fcfb32c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('object_key', sa.String(), nullable=False),
+    sa.Column('blob_url', sa.String(), nullable=False),
+    sa.Column('byte_size', sa.BigInteger(), nullable=True),
+    sa.Column('content_type', sa.String(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stored_blobs_id'), 'stored_blobs', ['id'], unique=False)
+    op.create_index(op.f('ix_stored_blobs_sha256'), 'stored_blobs', ['sha256'], unique=True)
+
+    op.add_column('evidence', sa.Column('content_sha256', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_evidence_content_sha256'), 'evidence', ['content_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_evidence_content_sha256'), table_name='evidence')
+    op.drop_column('evidence', 'content_sha256')
+
+    op.drop_index(op.f('ix_stored_blobs_sha256'), table_name='stored_blobs')
+    op.drop_index(op.f('ix_stored_blobs_id'), table_name='stored_blobs')
+    op.drop_table('stored_blobs')
@@ -0,0 +1,51 @@
+"""add evidence perceptual hash and near-duplicate hint
+
+Revision ID: 4f8a2c6e1d39
+Revises: 7e4b1d9c3f62
+Create Date: 2026-10-19 17:55:31.804126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f8a2c6e1d39'
+down_revision: Union[str, None] = '7e4b1d9c3f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('evidence', sa.Column('phash', sa.BigInteger(), nullable=True))
+    op.add_column('evidence', sa.Column('phash_band0', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('phash_band1', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('phash_band2', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('phash_band3', sa.Integer(), nullable=True))
+    op.add_column('evidence', sa.Column('near_duplicate_of', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_evidence_phash_band0'), 'evidence', ['phash_band0'], unique=False)
+    op.create_index(op.f('ix_evidence_phash_band1'), 'evidence', ['phash_band1'], unique=False)
+    op.create_index(op.f('ix_evidence_phash_band2'), 'evidence', ['phash_band2'], unique=False)
+    op.create_index(op.f('ix_evidence_phash_band3'), 'evidence', ['phash_band3'], unique=False)
+    op.create_foreign_key(
+        'evidence_near_duplicate_of_fkey', 'evidence', 'evidence',
+        ['near_duplicate_of'], ['id'], ondelete='SET NULL',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('evidence_near_duplicate_of_fkey', 'evidence', type_='foreignkey')
+    op.drop_index(op.f('ix_evidence_phash_band3'), table_name='evidence')
+    op.drop_index(op.f('ix_evidence_phash_band2'), table_name='evidence')
+    op.drop_index(op.f('ix_evidence_phash_band1'), table_name='evidence')
+    op.drop_index(op.f('ix_evidence_phash_band0'), table_name='evidence')
+    op.drop_column('evidence', 'near_duplicate_of')
+    op.drop_column('evidence', 'phash_band3')
+    op.drop_column('evidence', 'phash_band2')
+    op.drop_column('evidence', 'phash_band1')
+    op.drop_column('evidence', 'phash_band0')
+    op.drop_column('evidence', 'phash')
@@ -0,0 +1,50 @@
+"""add media_jobs and evidence.variants
+
+Revision ID: 5c7e9a2b4d86
+Revises: 8b2e4d6f0a13
+Create Date: 2026-10-19 12:03:55.271904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7e9a2b4d86'
+down_revision: Union[str, None] = '8b2e4d6f0a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('media_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('evidence_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['evidence_id'], ['evidence.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_media_jobs_id'), 'media_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_media_jobs_evidence_id'), 'media_jobs', ['evidence_id'], unique=False)
+    op.create_index('ix_media_jobs_status_run_after', 'media_jobs', ['status', 'run_after'], unique=False)
+
+    op.add_column('evidence', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('evidence', 'variants')
+
+    op.drop_index('ix_media_jobs_status_run_after', table_name='media_jobs')
+    op.drop_index(op.f('ix_media_jobs_evidence_id'), table_name='media_jobs')
+    op.drop_index(op.f('ix_media_jobs_id'), table_name='media_jobs')
+    op.drop_table('media_jobs')
@@ -0,0 +1,88 @@
+"""add evidence_tags and tag_counts, backfill from evidence.tags
+
+Revision ID: 7e4b1d9c3f62
+Revises: 2a6c8e0f4b57
+Create Date: 2026-10-19 16:41:09.552914
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4b1d9c3f62'
+down_revision: Union[str, None] = '2a6c8e0f4b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+# Frozen copy of utils.evidence_tags.normalize_tags
+def normalize_tags(raw):
+    tags = []
+    for part in (raw or "").split(","):
+        tag = re.sub(r"\s+", " ", part).strip().lstrip("#").strip().lower()[:64]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags[:20]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('evidence_tags',
+    sa.Column('evidence_id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(length=64), nullable=False),
+    sa.ForeignKeyConstraint(['evidence_id'], ['evidence.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('evidence_id', 'tag')
+    )
+    op.create_index('ix_evidence_tags_tag_evidence_id', 'evidence_tags', ['tag', 'evidence_id'], unique=False)
+    op.create_table('tag_counts',
+    sa.Column('tag', sa.String(length=64), nullable=False),
+    sa.Column('evidence_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+    # Backfill from the free-form column
+    conn = op.get_bind()
+    evidence_tags = sa.table('evidence_tags', sa.column('evidence_id'), sa.column('tag'))
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                "SELECT id, tags FROM evidence "
+                "WHERE id > :last_id AND tags IS NOT NULL AND tags <> '' "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE},
+        ).fetchall()
+        if not rows:
+            break
+
+        values = [
+            {"evidence_id": evidence_id, "tag": tag}
+            for evidence_id, raw in rows
+            for tag in normalize_tags(raw)
+        ]
+        if values:
+            op.bulk_insert(evidence_tags, values)
+        last_id = rows[-1][0]
+
+    op.execute(
+        "INSERT INTO tag_counts (tag, evidence_count) "
+        "SELECT t.tag, COUNT(*) FROM evidence_tags t "
+        "JOIN evidence e ON e.id = t.evidence_id "
+        "WHERE e.is_public = true "
+        "GROUP BY t.tag"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tag_counts')
+    op.drop_index('ix_evidence_tags_tag_evidence_id', table_name='evidence_tags')
+    op.drop_table('evidence_tags')
@@ -0,0 +1,77 @@
+"""add upload_sessions and upload_session_parts
+
+Revision ID: 8b2e4d6f0a13
+Revises: 3f9a1c7d2b41
+Create Date: 2026-10-19 10:41:07.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d6f0a13'
+down_revision: Union[str, None] = '3f9a1c7d2b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('vault_entry_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('tags', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('is_public', sa.Boolean(), nullable=False),
+    sa.Column('is_anonymous', sa.Boolean(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('content_type', sa.String(), nullable=False),
+    sa.Column('object_key', sa.String(), nullable=False),
+    sa.Column('multipart_upload_id', sa.String(), nullable=False),
+    sa.Column('chunk_size', sa.Integer(), nullable=False),
+    sa.Column('total_size', sa.BigInteger(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('evidence_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['entity_id'], ['rated_entities.id']),
+    sa.ForeignKeyConstraint(['vault_entry_id'], ['vault_entries.id']),
+    sa.ForeignKeyConstraint(['evidence_id'], ['evidence.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_sessions_user_id'), 'upload_sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_upload_sessions_status'), 'upload_sessions', ['status'], unique=False)
+    op.create_index(op.f('ix_upload_sessions_expires_at'), 'upload_sessions', ['expires_at'], unique=False)
+
+    op.create_table('upload_session_parts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('part_number', sa.Integer(), nullable=False),
+    sa.Column('etag', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['upload_sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'part_number', name='uq_upload_session_part')
+    )
+    op.create_index(op.f('ix_upload_session_parts_id'), 'upload_session_parts', ['id'], unique=False)
+    op.create_index(op.f('ix_upload_session_parts_session_id'), 'upload_session_parts', ['session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_upload_session_parts_session_id'), table_name='upload_session_parts')
+    op.drop_index(op.f('ix_upload_session_parts_id'), table_name='upload_session_parts')
+    op.drop_table('upload_session_parts')
+
+    op.drop_index(op.f('ix_upload_sessions_expires_at'), table_name='upload_sessions')
+    op.drop_index(op.f('ix_upload_sessions_status'), table_name='upload_sessions')
+    op.drop_index(op.f('ix_upload_sessions_user_id'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
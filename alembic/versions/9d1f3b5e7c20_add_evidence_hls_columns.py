@@ -0,0 +1,32 @@
+"""add evidence HLS playback columns
+
+Revision ID: 9d1f3b5e7c20
+Revises: 5c7e9a2b4d86
+Create Date: 2026-10-19 13:26:12.905417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d1f3b5e7c20'
+down_revision: Union[str, None] = '5c7e9a2b4d86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('evidence', sa.Column('processing_status', sa.String(), nullable=True))
+    op.add_column('evidence', sa.Column('hls_url', sa.String(), nullable=True))
+    op.add_column('evidence', sa.Column('poster_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('evidence', 'poster_url')
+    op.drop_column('evidence', 'hls_url')
+    op.drop_column('evidence', 'processing_status')
@@ -0,0 +1,28 @@
+"""add users.token_version for access token invalidation
+
+Revision ID: a7c9e1f3b5d2
+Revises: e6a8c0b2d4f7
+Create Date: 2026-10-19 19:07:26.118403
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c9e1f3b5d2'
+down_revision: Union[str, None] = 'e6a8c0b2d4f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,51 @@
+"""add per-user storage usage counters
+
+Revision ID: b3d5f7a9c1e4
+Revises: 4f8a2c6e1d39
+Create Date: 2026-10-19 18:22:47.310258
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d5f7a9c1e4'
+down_revision: Union[str, None] = '4f8a2c6e1d39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_storage_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('stored_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('evidence_count', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=True),
+    sa.Column('day_uploaded_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_user_storage_usage_stored_bytes'), 'user_storage_usage', ['stored_bytes'], unique=False)
+
+    # Seed the counters once from existing evidence
+    op.execute(
+        """
+        INSERT INTO user_storage_usage
+            (user_id, stored_bytes, evidence_count, day_uploaded_bytes, updated_at)
+        SELECT user_id, COALESCE(SUM(byte_size), 0), COUNT(*), 0, now()
+        FROM evidence
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_storage_usage_stored_bytes'), table_name='user_storage_usage')
+    op.drop_table('user_storage_usage')
@@ -0,0 +1,79 @@
+"""add normalized email / username lookup columns
+
+Revision ID: c8e0a2b4d6f9
+Revises: a7c9e1f3b5d2
+Create Date: 2026-10-19 19:31:52.640157
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e0a2b4d6f9'
+down_revision: Union[str, None] = 'a7c9e1f3b5d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def find_collisions(column: str):
+    """
+    Accounts whose `column` only differs by case/whitespace, as
+    [(normalized value, [ids])].
+    """
+    rows = op.get_bind().execute(sa.text(
+        f"""
+        SELECT lower(trim({column})) AS value, min(id) AS first_id
+        FROM users
+        WHERE {column} IS NOT NULL
+        GROUP BY lower(trim({column}))
+        HAVING count(*) > 1
+        ORDER BY first_id
+        """
+    )).fetchall()
+
+    collisions = []
+    for value, _ in rows:
+        ids = op.get_bind().execute(
+            sa.text(f"SELECT id FROM users WHERE lower(trim({column})) = :value ORDER BY id"),
+            {"value": value},
+        ).scalars().all()
+        collisions.append((value, ids))
+    return collisions
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Legacy rows that only differ by case/whitespace can't share a unique
+    # lookup key, and whichever lost it could no longer sign in. Stop and
+    # have them merged or renamed by hand first.
+    problems = []
+    for column in ("email", "username"):
+        for value, ids in find_collisions(column):
+            problems.append(f"  {column} {value!r}: user ids {ids}")
+
+    if problems:
+        raise RuntimeError(
+            "Accounts collide once emails/usernames are case-insensitive. "
+            "Rename or merge them, then rerun the migration:\n" + "\n".join(problems)
+        )
+
+    op.add_column('users', sa.Column('email_normalized', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('username_normalized', sa.String(), nullable=True))
+
+    # Same rule as models.user.normalize_identifier
+    op.execute("UPDATE users SET email_normalized = lower(trim(email)) WHERE email IS NOT NULL")
+    op.execute("UPDATE users SET username_normalized = lower(trim(username)) WHERE username IS NOT NULL")
+
+    op.create_index(op.f('ix_users_email_normalized'), 'users', ['email_normalized'], unique=True)
+    op.create_index(op.f('ix_users_username_normalized'), 'users', ['username_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_username_normalized'), table_name='users')
+    op.drop_index(op.f('ix_users_email_normalized'), table_name='users')
+    op.drop_column('users', 'username_normalized')
+    op.drop_column('users', 'email_normalized')
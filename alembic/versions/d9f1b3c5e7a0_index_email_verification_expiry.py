@@ -0,0 +1,28 @@
+"""index users.email_verification_expires_at for the token sweeper
+
+Revision ID: d9f1b3c5e7a0
+Revises: c8e0a2b4d6f9
+Create Date: 2026-10-19 19:48:15.207734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f1b3c5e7a0'
+down_revision: Union[str, None] = 'c8e0a2b4d6f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_email_verification_expires_at'), 'users', ['email_verification_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_email_verification_expires_at'), table_name='users')
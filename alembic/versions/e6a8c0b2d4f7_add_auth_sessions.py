@@ -0,0 +1,52 @@
+"""add auth sessions for refresh tokens
+
+Revision ID: e6a8c0b2d4f7
+Revises: b3d5f7a9c1e4
+Create Date: 2026-10-19 18:49:03.552817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a8c0b2d4f7'
+down_revision: Union[str, None] = 'b3d5f7a9c1e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('auth_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('refresh_token_hash', sa.String(length=64), nullable=False),
+    sa.Column('previous_token_hash', sa.String(length=64), nullable=True),
+    sa.Column('user_agent', sa.String(length=255), nullable=True),
+    sa.Column('ip_address', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('revoked_reason', sa.String(length=32), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_auth_sessions_id'), 'auth_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_auth_sessions_user_id'), 'auth_sessions', ['user_id'], unique=False)
+    op.create_index(op.f('ix_auth_sessions_refresh_token_hash'), 'auth_sessions', ['refresh_token_hash'], unique=True)
+    op.create_index(op.f('ix_auth_sessions_previous_token_hash'), 'auth_sessions', ['previous_token_hash'], unique=False)
+    op.create_index(op.f('ix_auth_sessions_expires_at'), 'auth_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_auth_sessions_expires_at'), table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_previous_token_hash'), table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_refresh_token_hash'), table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_user_id'), table_name='auth_sessions')
+    op.drop_index(op.f('ix_auth_sessions_id'), table_name='auth_sessions')
+    op.drop_table('auth_sessions')
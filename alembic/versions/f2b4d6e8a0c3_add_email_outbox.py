@@ -0,0 +1,46 @@
+"""add transactional email outbox
+
+Revision ID: f2b4d6e8a0c3
+Revises: d9f1b3c5e7a0
+Create Date: 2026-10-19 20:06:41.873520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b4d6e8a0c3'
+down_revision: Union[str, None] = 'd9f1b3c5e7a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=50), nullable=False),
+    sa.Column('to_email', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_outbox_id'), 'email_outbox', ['id'], unique=False)
+    op.create_index('ix_email_outbox_status_run_after', 'email_outbox', ['status', 'run_after'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_email_outbox_status_run_after', table_name='email_outbox')
+    op.drop_index(op.f('ix_email_outbox_id'), table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,97 @@
+"""
+Cleanup for ended sign-in sessions.
+
+Deletes refresh-token sessions that expired or were revoked more than
+AUTH_SESSION_RETENTION_DAYS ago (kept that long so reuse of a rotated
+token is still recognised and audit questions can be answered).
+
+    python -m jobs.auth_sessions              # one pass
+    python -m jobs.auth_sessions --loop 3600  # every hour
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.auth_session import AuthSession
+from utils import metrics
+from utils.job_runs import recorded_run
+
+AUTH_SESSION_RETENTION_DAYS = int(os.getenv("AUTH_SESSION_RETENTION_DAYS", 7))
+
+BATCH_SIZE = 1000
+
+# Pause between batches so the deletes never hog the table
+BATCH_PAUSE_SECONDS = 0.1
+
+
+def purge_ended_sessions(
+    db: Session,
+    batch_size: int = BATCH_SIZE,
+    pause: float = BATCH_PAUSE_SECONDS,
+) -> int:
+    """
+    Deletes ended sessions, one batch per transaction. Returns the count.
+    """
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=AUTH_SESSION_RETENTION_DAYS)
+    deleted = 0
+
+    while True:
+        ids = [
+            session_id
+            for (session_id,) in (
+                db.query(AuthSession.id)
+                .filter(
+                    or_(
+                        AuthSession.expires_at < cutoff,
+                        AuthSession.revoked_at < cutoff,
+                    )
+                )
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+        ]
+
+        if not ids:
+            break
+
+        db.query(AuthSession).filter(AuthSession.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+
+    metrics.incr("jobs.auth_sessions.deleted", deleted)
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", type=int, default=0, help="seconds between passes (0 = run once)")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("auth_sessions"):
+                deleted = purge_ended_sessions(db)
+            print(f"🧹 Deleted {deleted} ended sign-in session(s)")
+        finally:
+            db.close()
+
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Dispatcher for the transactional email outbox.
+
+Claims queued rows from email_outbox (SKIP LOCKED, so several dispatchers
+can run side by side), sends them through Resend and retries failures with
+exponential backoff. Messages that keep failing, or that Resend rejects
+outright, are dead-lettered (status "dead") with the last error kept.
+
+Bodies with a one-time link are dropped once the message is sent or dead,
+and a link that expired while queued is dead-lettered instead of sent.
+jobs/expired_tokens.py purges old sent and dead rows.
+
+    python -m jobs.email_outbox                # run forever
+    python -m jobs.email_outbox --once         # drain what is queued, then exit
+    python -m jobs.email_outbox --requeue-dead # retry dead letters without a link
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.email_outbox import EmailOutbox
+from utils import metrics
+from utils.job_runs import recorded_run
+from utils.email import deliver_email, PermanentEmailError
+from utils.email_outbox import scrub_payload
+
+MAX_ATTEMPTS = 8
+POLL_INTERVAL_SECONDS = 2
+
+# Backoff: 30s, 1m, 2m, 4m ... capped at an hour
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+# A message whose dispatcher died mid-send is picked up again after this long
+# (the idempotency key stops Resend from sending it twice)
+SEND_LEASE_MINUTES = 5
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def mark_dead(message: EmailOutbox, error: str):
+    message.status = "dead"
+    message.last_error = error
+    if message.expires_at is not None:
+        # Never resent (see requeue_dead); the user asks for a new link
+        scrub_payload(message)
+    metrics.incr(f"email.outbox.{message.kind}.dead")
+    print(f"☠️ Email {message.id} ({message.kind}) dead-lettered: {error}")
+
+
+def claim_message(db: Session):
+    now = datetime.now(timezone.utc)
+
+    message = (
+        db.query(EmailOutbox)
+        .filter(
+            or_(EmailOutbox.status == "queued", EmailOutbox.status == "sending"),
+            EmailOutbox.run_after <= now,
+        )
+        .order_by(EmailOutbox.run_after.asc(), EmailOutbox.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+    if not message:
+        return None
+
+    # Dispatcher kept dying on this one; stop retrying
+    if message.status == "sending" and message.attempts >= MAX_ATTEMPTS:
+        mark_dead(message, message.last_error or "Dispatcher lease expired too often")
+        db.commit()
+        return claim_message(db)
+
+    if message.expires_at is not None and message.expires_at <= now:
+        mark_dead(message, "Link expired before it could be sent")
+        db.commit()
+        return claim_message(db)
+
+    message.status = "sending"
+    message.attempts += 1
+    message.run_after = now + timedelta(minutes=SEND_LEASE_MINUTES)
+    db.commit()
+    return message
+
+
+def send_message(db: Session, message: EmailOutbox):
+    started = time.perf_counter()
+
+    try:
+        deliver_email(message.payload, idempotency_key=f"ares-outbox-{message.id}")
+
+    except PermanentEmailError as e:
+        mark_dead(message, str(e))
+
+    except Exception as e:
+        if message.attempts >= MAX_ATTEMPTS:
+            mark_dead(message, str(e))
+        else:
+            message.status = "queued"
+            message.last_error = str(e)
+            message.run_after = datetime.now(timezone.utc) + retry_delay(message.attempts)
+            metrics.incr(f"email.outbox.{message.kind}.retried")
+
+    else:
+        message.status = "sent"
+        message.sent_at = datetime.now(timezone.utc)
+        message.last_error = None
+        scrub_payload(message)
+        metrics.incr(f"email.outbox.{message.kind}.sent")
+        metrics.observe(
+            "email.outbox.delivery_lag_seconds",
+            (message.sent_at - message.created_at).total_seconds(),
+        )
+
+    db.commit()
+    metrics.observe("email.outbox.send_seconds", time.perf_counter() - started)
+
+
+def run_pending(db: Session) -> int:
+    processed = 0
+    while True:
+        message = claim_message(db)
+        if not message:
+            return processed
+        send_message(db, message)
+        processed += 1
+
+
+def requeue_dead(db: Session):
+    """
+    Retries dead letters that carry no one-time link. Returns (requeued,
+    skipped); link emails were scrubbed when they died and are left alone.
+    """
+
+    skipped = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == "dead", EmailOutbox.expires_at != None)
+        .count()
+    )
+
+    requeued = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.status == "dead", EmailOutbox.expires_at == None)
+        .update(
+            {
+                EmailOutbox.status: "queued",
+                EmailOutbox.attempts: 0,
+                EmailOutbox.run_after: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return requeued, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true", help="drain the outbox and exit")
+    parser.add_argument("--requeue-dead", action="store_true", help="move dead letters back to the queue")
+    args = parser.parse_args()
+
+    if args.requeue_dead:
+        db = SessionLocal()
+        try:
+            requeued, skipped = requeue_dead(db)
+            print(f"📬 Requeued {requeued} dead-lettered email(s)")
+            if skipped:
+                print(f"⚠️ Skipped {skipped} dead email(s) with a one-time link; the user must request a new one")
+        finally:
+            db.close()
+        return
+
+    print("📬 Email dispatcher started")
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("email_outbox", skip_if_idle=True):
+                processed = run_pending(db)
+        finally:
+            db.close()
+
+        if args.once:
+            print(f"✅ Sent or rescheduled {processed} email(s)")
+            break
+        if not processed:
+            time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Sweeper for expired and used one-time tokens.
+
+- password_reset_tokens: rows past expiry or already used are deleted
+- users.email_verification_*: expired verification tokens are cleared
+- email_outbox: sent and dead messages older than the retention period
+  are deleted
+
+Works in small LIMIT batches, one transaction each, pausing between
+batches so it never holds locks for long.
+
+    python -m jobs.expired_tokens              # one pass
+    python -m jobs.expired_tokens --loop 3600  # every hour
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.email_outbox import EmailOutbox
+from models.password_reset import PasswordResetToken
+from models.user import User
+from utils import metrics
+from utils.job_runs import recorded_run
+
+BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", 500))
+BATCH_PAUSE_SECONDS = float(os.getenv("TOKEN_SWEEP_PAUSE_SECONDS", 0.2))
+
+# Finished outbox rows are kept this long for delivery questions
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", 14))
+
+
+def _in_batches(db: Session, select_ids, apply, batch_size: int, pause: float) -> int:
+    """
+    Runs select_ids(limit) → apply(ids) until nothing is left. Returns the total.
+    """
+
+    total = 0
+    while True:
+        ids = [row_id for (row_id,) in select_ids(batch_size)]
+        if not ids:
+            break
+
+        apply(ids)
+        db.commit()
+        total += len(ids)
+        metrics.incr("jobs.expired_tokens.batches")
+
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+
+    return total
+
+
+def sweep_password_reset_tokens(
+    db: Session,
+    batch_size: int = BATCH_SIZE,
+    pause: float = BATCH_PAUSE_SECONDS,
+) -> int:
+    now = datetime.now(timezone.utc)
+
+    def select_ids(limit):
+        # Both predicates are ranges on ix_password_reset_tokens_expires_used
+        return (
+            db.query(PasswordResetToken.id)
+            .filter(
+                (PasswordResetToken.expires_at < now)
+                | ((PasswordResetToken.expires_at >= now) & (PasswordResetToken.used == True))
+            )
+            .order_by(PasswordResetToken.expires_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def apply(ids):
+        (
+            db.query(PasswordResetToken)
+            .filter(PasswordResetToken.id.in_(ids))
+            .delete(synchronize_session=False)
+        )
+
+    deleted = _in_batches(db, select_ids, apply, batch_size, pause)
+    metrics.incr("jobs.expired_tokens.reset_tokens_deleted", deleted)
+    return deleted
+
+
+def sweep_email_verification_tokens(
+    db: Session,
+    batch_size: int = BATCH_SIZE,
+    pause: float = BATCH_PAUSE_SECONDS,
+) -> int:
+    now = datetime.now(timezone.utc)
+
+    def select_ids(limit):
+        return (
+            db.query(User.id)
+            .filter(User.email_verification_expires_at < now)
+            .order_by(User.email_verification_expires_at.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def apply(ids):
+        # /auth/resend-verification issues a fresh token when needed
+        (
+            db.query(User)
+            .filter(User.id.in_(ids))
+            .update(
+                {
+                    User.email_verification_token_hash: None,
+                    User.email_verification_expires_at: None,
+                },
+                synchronize_session=False,
+            )
+        )
+
+    cleared = _in_batches(db, select_ids, apply, batch_size, pause)
+    metrics.incr("jobs.expired_tokens.verification_tokens_cleared", cleared)
+    return cleared
+
+
+def sweep_email_outbox(
+    db: Session,
+    batch_size: int = BATCH_SIZE,
+    pause: float = BATCH_PAUSE_SECONDS,
+) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=EMAIL_OUTBOX_RETENTION_DAYS)
+
+    def select_ids(limit):
+        return (
+            db.query(EmailOutbox.id)
+            .filter(
+                EmailOutbox.status.in_(("sent", "dead")),
+                EmailOutbox.created_at < cutoff,
+            )
+            .order_by(EmailOutbox.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def apply(ids):
+        (
+            db.query(EmailOutbox)
+            .filter(EmailOutbox.id.in_(ids))
+            .delete(synchronize_session=False)
+        )
+
+    deleted = _in_batches(db, select_ids, apply, batch_size, pause)
+    metrics.incr("jobs.expired_tokens.outbox_rows_deleted", deleted)
+    return deleted
+
+
+def sweep_expired_tokens(db: Session, **kwargs) -> dict:
+    return {
+        "reset_tokens_deleted": sweep_password_reset_tokens(db, **kwargs),
+        "verification_tokens_cleared": sweep_email_verification_tokens(db, **kwargs),
+        "outbox_rows_deleted": sweep_email_outbox(db, **kwargs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", type=int, default=0, help="seconds between passes (0 = run once)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("expired_tokens"):
+                report = sweep_expired_tokens(db, batch_size=args.batch_size)
+            print(
+                f"🧹 Deleted {report['reset_tokens_deleted']} reset token(s), "
+                f"cleared {report['verification_tokens_cleared']} verification token(s), "
+                f"purged {report['outbox_rows_deleted']} outbox message(s)"
+            )
+        finally:
+            db.close()
+
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
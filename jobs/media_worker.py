@@ -0,0 +1,178 @@
+"""
+Background worker for evidence media processing.
+
+Claims queued rows from media_jobs (SKIP LOCKED, so several workers can run
+side by side), runs the handler for the job kind, and retries failures with
+exponential backoff.
+
+    python -m jobs.media_worker          # run forever
+    python -m jobs.media_worker --once   # drain what is queued, then exit
+"""
+import argparse
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.media_job import MediaJob
+from utils import metrics
+from utils.media_jobs import PermanentJobError
+from utils.job_runs import recorded_run
+
+MAX_ATTEMPTS = 5
+POLL_INTERVAL_SECONDS = 5
+
+# A running job whose worker died is picked up again after this long.
+# Handlers must finish well within it (see TRANSCODE_TIMEOUT_SECONDS)
+JOB_LEASE_MINUTES = 30
+
+
+def handle_image_variants(db: Session, evidence):
+    # Imported lazily so the API never needs Pillow loaded
+    from utils.image_variants import generate_image_variants
+    generate_image_variants(db, evidence)
+
+
+def handle_image_phash(db: Session, evidence):
+    from utils.perceptual_hash import compute_image_phash
+    compute_image_phash(db, evidence)
+
+
+def handle_video_hls(db: Session, evidence):
+    from utils.video_transcode import transcode_to_hls
+    transcode_to_hls(db, evidence)
+
+
+def video_hls_failed(evidence):
+    evidence.processing_status = "failed"
+
+
+# kind → handler(db, evidence)
+HANDLERS = {
+    "image_variants": handle_image_variants,
+    "image_phash": handle_image_phash,
+    "video_hls": handle_video_hls,
+}
+
+# kind → hook(evidence) run once a job has permanently failed
+FAILURE_HOOKS = {
+    "video_hls": video_hls_failed,
+}
+
+
+def mark_failed(job: MediaJob):
+    job.status = "failed"
+    job.finished_at = datetime.now(timezone.utc)
+
+    hook = FAILURE_HOOKS.get(job.kind)
+    if hook and job.evidence is not None:
+        hook(job.evidence)
+
+    metrics.incr(f"jobs.media.{job.kind}.failed")
+
+
+def claim_job(db: Session):
+    now = datetime.now(timezone.utc)
+
+    job = (
+        db.query(MediaJob)
+        .filter(
+            or_(MediaJob.status == "queued", MediaJob.status == "running"),
+            MediaJob.run_after <= now,
+        )
+        .order_by(MediaJob.run_after.asc(), MediaJob.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+    if not job:
+        return None
+
+    # Worker kept dying on this one; stop retrying
+    if job.status == "running" and job.attempts >= MAX_ATTEMPTS:
+        mark_failed(job)
+        db.commit()
+        return claim_job(db)
+
+    job.status = "running"
+    job.attempts += 1
+    job.run_after = now + timedelta(minutes=JOB_LEASE_MINUTES)
+    db.commit()
+    return job
+
+
+def run_job(db: Session, job: MediaJob):
+    handler = HANDLERS.get(job.kind)
+    started = time.perf_counter()
+
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown media job kind: {job.kind}")
+
+        if job.evidence is None:
+            # Evidence deleted while queued
+            job.status = "done"
+        else:
+            handler(db, job.evidence)
+            job.status = "done"
+
+        job.last_error = None
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        metrics.incr(f"jobs.media.{job.kind}.done")
+
+    except Exception as e:
+        db.rollback()
+        job = db.get(MediaJob, job.id)
+        job.last_error = traceback.format_exc(limit=5)
+
+        if isinstance(e, PermanentJobError) or job.attempts >= MAX_ATTEMPTS:
+            mark_failed(job)
+        else:
+            job.status = "queued"
+            job.run_after = datetime.now(timezone.utc) + timedelta(minutes=2 ** job.attempts)
+            metrics.incr(f"jobs.media.{job.kind}.retried")
+
+        db.commit()
+
+    metrics.observe(f"jobs.media.{job.kind}.seconds", time.perf_counter() - started)
+
+
+def run_pending(db: Session) -> int:
+    processed = 0
+    while True:
+        job = claim_job(db)
+        if not job:
+            return processed
+        run_job(db, job)
+        processed += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true", help="drain the queue and exit")
+    args = parser.parse_args()
+
+    print("🎞️ Media worker started")
+
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("media_worker", skip_if_idle=True):
+                processed = run_pending(db)
+        finally:
+            db.close()
+
+        if args.once:
+            print(f"✅ Processed {processed} media job(s)")
+            break
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
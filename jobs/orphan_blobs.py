@@ -0,0 +1,275 @@
+"""
+Garbage collector for orphaned storage objects.
+
+Deleting evidence, vault entries or users removes database rows; objects
+nothing points at any more (originals, image variants, HLS renditions,
+posters, abandoned direct uploads) are swept here. Objects younger than
+the grace period are never touched, so in-flight uploads are safe.
+
+    python -m jobs.orphan_blobs --dry-run       # report only
+    python -m jobs.orphan_blobs                 # delete
+    python -m jobs.orphan_blobs --loop 86400    # once a day
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.evidence import Evidence
+from models.stored_blob import StoredBlob
+from models.upload_session import UploadSession
+from utils import metrics
+from utils.job_runs import recorded_run
+from utils.blob_utils import (
+    DELETE_BATCH_SIZE,
+    key_for_url,
+    public_url_for_key,
+    list_blobs,
+    head_object,
+    delete_blobs,
+)
+
+ORPHAN_GRACE_HOURS = int(os.getenv("ORPHAN_GRACE_HOURS", 24))
+ORPHAN_SCAN_PREFIX = os.getenv("ORPHAN_SCAN_PREFIX", "evidence/")
+
+REPORT_SAMPLE_SIZE = 20
+
+
+def referenced_keys(db: Session):
+    """
+    Returns (keys, prefixes). An object is live if its key is in `keys` or
+    starts with one of `prefixes` — derived files (variants, HLS) live under
+    the original's key without its extension.
+    """
+
+    keys = set()
+    prefixes = set()
+
+    def add_url(url):
+        key = key_for_url(url)
+        if key:
+            keys.add(key)
+        return key
+
+    rows = (
+        db.query(Evidence.blob_url, Evidence.variants, Evidence.hls_url, Evidence.poster_url)
+        .yield_per(1000)
+    )
+    for blob_url, variants, hls_url, poster_url in rows:
+        key = add_url(blob_url)
+        if key:
+            prefixes.add(os.path.splitext(key)[0] + "/")
+
+        for variant in (variants or {}).values():
+            add_url(variant.get("webp"))
+            add_url(variant.get("jpeg"))
+
+        for url in (hls_url, poster_url):
+            key = add_url(url)
+            if key:
+                prefixes.add(key.rsplit("/", 1)[0] + "/")
+
+    for (object_key,) in db.query(StoredBlob.object_key).yield_per(1000):
+        keys.add(object_key)
+
+    # Resumable uploads still in progress
+    open_sessions = db.query(UploadSession.object_key).filter(UploadSession.status == "open")
+    for (object_key,) in open_sessions:
+        keys.add(object_key)
+
+    return keys, prefixes
+
+
+def is_referenced(key: str, keys: set, prefixes: set) -> bool:
+    if key in keys:
+        return True
+
+    # evidence/abc/hls/720p/seg_00001.ts → evidence/, evidence/abc/, evidence/abc/hls/, ...
+    i = key.find("/")
+    while i != -1:
+        if key[:i + 1] in prefixes:
+            return True
+        i = key.find("/", i + 1)
+    return False
+
+
+def collect_orphans(
+    db: Session,
+    *,
+    grace_hours: int = ORPHAN_GRACE_HOURS,
+    prefix: str = ORPHAN_SCAN_PREFIX,
+):
+    """
+    Yields listing entries for unreferenced objects older than the grace period.
+    References are loaded before listing, so anything uploaded meanwhile is
+    newer than the cutoff.
+    """
+
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    keys, prefixes = referenced_keys(db)
+
+    # Release the read transaction; the listing can take a while
+    db.rollback()
+
+    for obj in list_blobs(prefix):
+        metrics.incr("jobs.orphan_blobs.scanned")
+
+        if obj["LastModified"] >= cutoff:
+            continue
+        if is_referenced(obj["Key"], keys, prefixes):
+            continue
+        yield obj
+
+
+def still_orphaned(db: Session, keys: list, cutoff: datetime) -> list:
+    """
+    Re-checks a batch right before it is deleted. Content-addressed keys
+    can come back to life after the snapshot (the same bytes uploaded
+    again), so drop any key the database references now or whose object
+    was rewritten since the cutoff.
+    """
+
+    urls = [public_url_for_key(key) for key in keys]
+    live = set()
+
+    live.update(
+        key for (key,) in
+        db.query(StoredBlob.object_key).filter(StoredBlob.object_key.in_(keys))
+    )
+    live.update(
+        key for (key,) in
+        db.query(UploadSession.object_key).filter(
+            UploadSession.object_key.in_(keys),
+            UploadSession.status == "open",
+        )
+    )
+    rows = db.query(Evidence.blob_url, Evidence.hls_url, Evidence.poster_url).filter(
+        or_(
+            Evidence.blob_url.in_(urls),
+            Evidence.hls_url.in_(urls),
+            Evidence.poster_url.in_(urls),
+        )
+    )
+    for row in rows:
+        live.update(key_for_url(url) for url in row if url)
+    db.rollback()
+
+    orphans = []
+    for key in keys:
+        if key in live:
+            metrics.incr("jobs.orphan_blobs.revived")
+            continue
+
+        head = head_object(key)
+        if head is None:
+            continue  # already gone
+        if head["LastModified"] >= cutoff:
+            metrics.incr("jobs.orphan_blobs.revived")
+            continue
+        orphans.append(key)
+    return orphans
+
+
+def sweep_orphan_blobs(
+    db: Session,
+    *,
+    grace_hours: int = ORPHAN_GRACE_HOURS,
+    prefix: str = ORPHAN_SCAN_PREFIX,
+    dry_run: bool = False,
+    batch_size: int = DELETE_BATCH_SIZE,
+) -> dict:
+    """
+    Deletes orphans in DeleteObjects batches (or only reports them with
+    dry_run), re-checking each batch first (see still_orphaned).
+    Returns {"orphans", "bytes", "deleted", "revived", "failed", "sample"}.
+    """
+
+    batch_size = min(batch_size, DELETE_BATCH_SIZE)
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    report = {"orphans": 0, "bytes": 0, "deleted": 0, "revived": 0, "failed": 0, "sample": []}
+    batch = []
+
+    def flush():
+        keys = still_orphaned(db, batch, cutoff)
+        report["revived"] += len(batch) - len(keys)
+        failed = delete_blobs(keys) if keys else []
+        report["deleted"] += len(keys) - len(failed)
+        report["failed"] += len(failed)
+        for key in failed:
+            print(f"⚠️ Could not delete orphan {key}")
+        batch.clear()
+
+    for obj in collect_orphans(db, grace_hours=grace_hours, prefix=prefix):
+        report["orphans"] += 1
+        report["bytes"] += obj["Size"]
+        if len(report["sample"]) < REPORT_SAMPLE_SIZE:
+            report["sample"].append(obj["Key"])
+
+        if dry_run:
+            continue
+
+        batch.append(obj["Key"])
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    metrics.incr("jobs.orphan_blobs.orphans", report["orphans"])
+    metrics.incr("jobs.orphan_blobs.deleted", report["deleted"])
+    metrics.incr("jobs.orphan_blobs.errors", report["failed"])
+
+    return report
+
+
+def print_report(report: dict, dry_run: bool):
+    mb = report["bytes"] / (1024 * 1024)
+
+    if dry_run:
+        print(f"🔎 Dry run: {report['orphans']} orphaned object(s), {mb:.1f} MB")
+    else:
+        print(
+            f"🧹 Deleted {report['deleted']} orphaned object(s), {mb:.1f} MB"
+            f" ({report['revived']} back in use, {report['failed']} failed)"
+        )
+
+    for key in report["sample"]:
+        print(f"   - {key}")
+    if report["orphans"] > len(report["sample"]):
+        print(f"   ... and {report['orphans'] - len(report['sample'])} more")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true", help="only report orphans")
+    parser.add_argument("--grace-hours", type=int, default=ORPHAN_GRACE_HOURS)
+    parser.add_argument("--prefix", default=ORPHAN_SCAN_PREFIX)
+    parser.add_argument("--loop", type=int, default=0, help="seconds between passes (0 = run once)")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("orphan_blobs"):
+                report = sweep_orphan_blobs(
+                    db,
+                    grace_hours=args.grace_hours,
+                    prefix=args.prefix,
+                    dry_run=args.dry_run,
+                )
+            print_report(report, args.dry_run)
+        finally:
+            db.close()
+
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Sweeper for abandoned resumable uploads.
+
+Aborts the B2 multipart upload (so its parts stop costing storage) and
+marks the session aborted. Run from cron / a Render cron job:
+
+    python -m jobs.upload_sessions            # one pass
+    python -m jobs.upload_sessions --loop 600 # every 10 minutes
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+import models  # noqa: F401  (registers all mappers)
+from db import SessionLocal
+from models.upload_session import UploadSession
+from utils import metrics
+from utils.job_runs import recorded_run
+from utils.blob_utils import abort_multipart_upload
+
+BATCH_SIZE = 100
+
+
+def sweep_abandoned_sessions(db: Session, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Aborts expired open sessions, one batch per transaction. Returns the count.
+    """
+
+    now = datetime.now(timezone.utc)
+    swept = 0
+    failed = set()
+
+    while True:
+        sessions = (
+            db.query(UploadSession)
+            .filter(
+                UploadSession.status == "open",
+                UploadSession.expires_at < now,
+                UploadSession.id.notin_(failed),
+            )
+            .order_by(UploadSession.expires_at.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+        if not sessions:
+            break
+
+        for session in sessions:
+            try:
+                abort_multipart_upload(
+                    key=session.object_key,
+                    upload_id=session.multipart_upload_id,
+                )
+            except Exception as e:
+                # Leave it open; the next run retries
+                failed.add(session.id)
+                metrics.incr("jobs.upload_sessions.errors")
+                print(f"⚠️ Could not abort upload session {session.id}: {e}")
+                continue
+
+            session.status = "aborted"
+            session.parts.clear()
+            swept += 1
+
+        db.commit()
+
+        if len(sessions) < batch_size:
+            break
+
+    metrics.incr("jobs.upload_sessions.swept", swept)
+    return swept
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--loop", type=int, default=0, help="seconds between passes (0 = run once)")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            with recorded_run("upload_sessions"):
+                swept = sweep_abandoned_sessions(db)
+            print(f"🧹 Aborted {swept} abandoned upload session(s)")
+        finally:
+            db.close()
+
+        if not args.loop:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
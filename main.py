@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 import os
 import uvicorn
 
@@ -14,6 +15,7 @@ from routes.official_post_routes import router as official_post_router
 from routes.post_comment_routes import router as post_comment_router
 from routes.admin_routes import router as admin_router
 from routes import evidence
+from routes import upload_sessions
 from routes import vault_entries
 from routes import feed
 from routes import entities
@@ -23,6 +25,10 @@ from routes.policy_routes import router as policy_router
 # Import all models so SQLAlchemy registers tables
 import models
 
+from utils.quotas import UploadQuotaMiddleware
+from utils.password_hashing import shutdown_pool
+from utils.identifier_filter import refresh_identifier_filter
+
 # ======================================================
 # FASTAPI APP (SINGLE INSTANCE)
 # ======================================================
@@ -31,6 +37,13 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# ======================================================
+# UPLOAD QUOTAS (reject before the body is accepted)
+# Registered before CORS so CORS stays outermost and its headers
+# reach the 413s too
+# ======================================================
+app.add_middleware(UploadQuotaMiddleware)
+
 # ======================================================
 # CORS (THIS IS ALL YOU NEED)
 # ======================================================
@@ -55,6 +68,12 @@ def create_tables():
     print("🔧 Creating database tables (if missing)...")
     Base.metadata.create_all(bind=engine)
     print("✅ Tables ready!")
+    refresh_identifier_filter()
+
+
+@app.on_event("shutdown")
+def stop_password_hash_pool():
+    shutdown_pool()
 
 # ======================================================
 # ROUTES
@@ -65,12 +84,36 @@ app.include_router(official_post_router)
 app.include_router(post_comment_router)
 app.include_router(admin_router)
 app.include_router(evidence.router)
+app.include_router(upload_sessions.router)
 app.include_router(vault_entries.router)
 app.include_router(feed.router)
 app.include_router(entities.router)
 app.include_router(policy_router)
 
 
+# Local storage backend (dev only, opt-in): serve stored files directly
+from utils.storage import STORAGE_BACKEND, STORAGE_LOCAL_ROOT, STORAGE_LOCAL_SERVE
+
+
+class LocalStorageFiles(StaticFiles):
+    """
+    Stored objects only: in-progress multipart parts (.multipart/),
+    content-type sidecars and temp files stay hidden.
+    """
+
+    async def get_response(self, path: str, scope):
+        parts = path.replace("\\", "/").split("/")
+        if any(p.startswith(".") for p in parts) or path.endswith((".content-type", ".tmp")):
+            return PlainTextResponse("Not Found", status_code=404)
+        return await super().get_response(path, scope)
+
+
+if STORAGE_BACKEND == "local" and STORAGE_LOCAL_SERVE:
+    print("⚠️ STORAGE_LOCAL_SERVE is on: /local-storage serves every stored file without auth (dev only)")
+    os.makedirs(STORAGE_LOCAL_ROOT, exist_ok=True)
+    app.mount("/local-storage", LocalStorageFiles(directory=STORAGE_LOCAL_ROOT), name="local-storage")
+
+
 # Optional forum trailing-slash fix
 @app.get("/forum", include_in_schema=False)
 async def forum_redirect(request: Request):
@@ -3,7 +3,15 @@ from .rating import RatedEntity, RatingCategoryScore
 from .official_post import OfficialPost
 from .post_comment import PostComment
 from .evidence import Evidence
+from .evidence_tag import EvidenceTag, TagCount
+from .stored_blob import StoredBlob
+from .upload_session import UploadSession, UploadSessionPart
+from .media_job import MediaJob
+from .user_storage_usage import UserStorageUsage
 from .password_reset import PasswordResetToken
+from .auth_session import AuthSession
+from .email_outbox import EmailOutbox
+from .job_run import JobRun
 from .vault_entry import VaultEntry
 from .policy import (
     Policy,
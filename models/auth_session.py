@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from db import Base
+
+
+class AuthSession(Base):
+    """
+    A signed-in device. Holds the hash of its current refresh token, which
+    is replaced on every refresh (rotation).
+    """
+    __tablename__ = "auth_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    # 🔐 Hashes only (never the raw tokens)
+    refresh_token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    # The token this one replaced; presenting it again means it leaked
+    previous_token_hash = Column(String(64), index=True, nullable=True)
+
+    user_agent = Column(String(255), nullable=True)
+    ip_address = Column(String(64), nullable=True)
+
+    # ⏱️ Lifetime: idle expiry slides on refresh, capped by created_at + max age
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    last_used_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_reason = Column(String(32), nullable=True)  # logout | logout_all | password_reset | reuse
+
+    user = relationship("User")
@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from db import Base
+
+
+class EmailOutbox(Base):
+    """
+    An email written in the same transaction as the change that causes it,
+    delivered later by jobs/email_outbox.py.
+    """
+    __tablename__ = "email_outbox"
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    kind = Column(String(50), nullable=False)     # verification | password_reset | entity_approved
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=True)
+
+    # Resend payload; the body is dropped once sent (it may carry a token)
+    payload = Column(JSON, nullable=True)
+
+    # When the one-time link in the body expires (None = no link)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    status = Column(String(20), default="queued", nullable=False)  # queued | sending | sent | dead
+
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    run_after = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, Float, String, Boolean, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from db import Base
 
@@ -12,6 +12,39 @@ class Evidence(Base):
     # 📦 Storage
     blob_url = Column(String, nullable=False)
 
+    # SHA-256 of the file; links to the shared StoredBlob (NULL for legacy rows)
+    content_sha256 = Column(String(64), index=True, nullable=True)
+
+    # 🖼 Resized copies for images, filled in by the media worker
+    # {"thumb": {"webp": url, "jpeg": url, "width": int, "height": int}, "card": ..., "full": ...}
+    variants = Column(JSON(none_as_null=True), nullable=True)
+
+    # 🎞 Video playback (HLS), filled in by the media worker
+    processing_status = Column(String, nullable=True)  # pending | processing | ready | failed
+    hls_url = Column(String, nullable=True)
+    poster_url = Column(String, nullable=True)
+
+    # 🧬 Perceptual hash (64-bit dHash, images only) for near-duplicate search.
+    # The four 16-bit bands are indexed separately (multi-index hashing).
+    phash = Column(BigInteger, nullable=True)
+    phash_band0 = Column(Integer, index=True, nullable=True)
+    phash_band1 = Column(Integer, index=True, nullable=True)
+    phash_band2 = Column(Integer, index=True, nullable=True)
+    phash_band3 = Column(Integer, index=True, nullable=True)
+
+    # 🚩 Moderation hint: closest earlier image that looks the same
+    near_duplicate_of = Column(Integer, ForeignKey("evidence.id", ondelete="SET NULL"), nullable=True)
+
+    # 🔍 File metadata, extracted while the upload is hashed (NULL when unknown)
+    byte_size = Column(BigInteger, nullable=True)
+    mime_type = Column(String, index=True, nullable=True)  # sniffed from the bytes
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    captured_at = Column(DateTime(timezone=True), index=True, nullable=True)  # EXIF / video header
+    gps_latitude = Column(Float, nullable=True)
+    gps_longitude = Column(Float, nullable=True)
+
     # 📝 Metadata
     description = Column(String)
     tags = Column(String)
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from db import Base
+
+
+class EvidenceTag(Base):
+    """
+    One row per (evidence, normalized tag), built from Evidence.tags.
+    """
+    __tablename__ = "evidence_tags"
+
+    evidence_id = Column(
+        Integer,
+        ForeignKey("evidence.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tag = Column(String(64), primary_key=True)
+
+    __table_args__ = (
+        # Tag lookups walk evidence ids in order (cursor pagination)
+        Index("ix_evidence_tags_tag_evidence_id", "tag", "evidence_id"),
+    )
+
+
+class TagCount(Base):
+    """
+    Rollup: number of public evidence items carrying each tag.
+    """
+    __tablename__ = "tag_counts"
+
+    tag = Column(String(64), primary_key=True)
+    evidence_count = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from db import Base
+
+
+class JobRun(Base):
+    """
+    One pass of a background job (jobs/*) and the metrics it produced.
+    Jobs run in their own processes, so this is how their numbers reach
+    the API (GET /admin/jobs/runs).
+    """
+    __tablename__ = "job_runs"
+
+    __table_args__ = (
+        Index("ix_job_runs_job_started_at", "job", "started_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    job = Column(String(50), nullable=False)       # media_worker | expired_tokens | ...
+    status = Column(String(20), nullable=False)    # ok | failed
+
+    started_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Counter deltas and summary samples from utils/metrics during the pass
+    counters = Column(JSON, nullable=True)
+    summaries = Column(JSON, nullable=True)
+
+    error = Column(Text, nullable=True)
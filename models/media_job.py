@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from db import Base
+
+
+class MediaJob(Base):
+    """
+    Background processing queued for one piece of evidence
+    (image variants, ...). Picked up by jobs/media_worker.py.
+    """
+    __tablename__ = "media_jobs"
+
+    __table_args__ = (
+        Index("ix_media_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    evidence_id = Column(
+        Integer,
+        ForeignKey("evidence.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    kind = Column(String, nullable=False)                       # image_variants | ...
+    status = Column(String, default="queued", nullable=False)   # queued | running | done | failed
+
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    run_after = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    evidence = relationship("Evidence")
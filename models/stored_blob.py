@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, BigInteger, DateTime
+from db import Base
+
+
+class StoredBlob(Base):
+    """
+    One stored object per unique file content (SHA-256).
+    Evidence rows share it; ref_count tracks how many point at it.
+    """
+    __tablename__ = "stored_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 🔑 Content address
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+
+    # 📦 Storage
+    object_key = Column(String, nullable=False)
+    blob_url = Column(String, nullable=False)
+    byte_size = Column(BigInteger, nullable=True)
+    content_type = Column(String, nullable=True)
+
+    # 🔢 Number of Evidence rows referencing this object
+    ref_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
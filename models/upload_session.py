@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+from sqlalchemy import (
+    Column,
+    Integer,
+    BigInteger,
+    String,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+from db import Base
+
+
+class UploadSession(Base):
+    """
+    A resumable evidence upload, backed by a B2 multipart upload.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)  # uuid4, handed to the client
+
+    # 🔐 Ownership
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    # 🔗 Where the evidence will be attached (validated at creation)
+    entity_id = Column(Integer, ForeignKey("rated_entities.id"), nullable=True)
+    vault_entry_id = Column(Integer, ForeignKey("vault_entries.id"), nullable=True)
+
+    # 📝 Evidence metadata, applied on completion
+    description = Column(String)
+    tags = Column(String)
+    location = Column(String)
+    is_public = Column(Boolean, default=True, nullable=False)
+    is_anonymous = Column(Boolean, default=False, nullable=False)
+
+    # 📦 Storage
+    filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=False)
+    object_key = Column(String, nullable=False)
+    multipart_upload_id = Column(String, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    total_size = Column(BigInteger, nullable=True)
+
+    status = Column(String, default="open", nullable=False, index=True)  # open | completed | aborted
+    evidence_id = Column(Integer, ForeignKey("evidence.id", ondelete="SET NULL"), nullable=True)
+
+    # ⏱ Timestamps (expires_at slides forward on every chunk)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+
+    parts = relationship(
+        "UploadSessionPart",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="UploadSessionPart.part_number",
+    )
+
+
+class UploadSessionPart(Base):
+    """
+    One acknowledged chunk (B2 multipart part).
+    """
+    __tablename__ = "upload_session_parts"
+
+    __table_args__ = (
+        UniqueConstraint("session_id", "part_number", name="uq_upload_session_part"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        String(36),
+        ForeignKey("upload_sessions.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    part_number = Column(Integer, nullable=False)  # 1-based, as in S3
+    etag = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    session = relationship("UploadSession", back_populates="parts")
@@ -1,8 +1,18 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy.orm import validates
 from db import Base
 from datetime import datetime, timezone
 
 
+def normalize_identifier(value):
+    """
+    The one normalization for emails and usernames used by every lookup.
+    """
+    if value is None:
+        return None
+    return value.strip().lower()
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -13,13 +23,20 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
 
+    # 🔎 Lookup keys (kept in sync below); unique so logins are index probes
+    email_normalized = Column(String, unique=True, index=True, nullable=True)
+    username_normalized = Column(String, unique=True, index=True, nullable=True)
+
     # Roles
     role = Column(String, default="citizen")  # citizen | official_pending | official_verified | admin
 
+    # Bumped to invalidate every access token issued so far ("tv" claim)
+    token_version = Column(Integer, default=0, nullable=False, server_default="0")
+
     # Email verification
     is_email_verified = Column(Boolean, default=False)
     email_verification_token_hash = Column(String, nullable=True)
-    email_verification_expires_at = Column(DateTime, nullable=True)
+    email_verification_expires_at = Column(DateTime, nullable=True, index=True)  # swept by jobs.expired_tokens
     email_verified_at = Column(DateTime, nullable=True)
 
     # Official verification (admin-controlled)
@@ -43,3 +60,12 @@ class User(Base):
         nullable=False,
     )
 
+    @validates("email")
+    def _sync_email_normalized(self, key, value):
+        self.email_normalized = normalize_identifier(value)
+        return value
+
+    @validates("username")
+    def _sync_username_normalized(self, key, value):
+        self.username_normalized = normalize_identifier(value)
+        return value
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, ForeignKey
+from db import Base
+
+
+class UserStorageUsage(Base):
+    """
+    Per-user upload counters, updated incrementally on upload and delete
+    (never recomputed by scanning evidence).
+    """
+    __tablename__ = "user_storage_usage"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # 📦 Evidence currently attributed to the user (anonymous uploads excluded)
+    stored_bytes = Column(BigInteger, default=0, nullable=False, index=True)
+    evidence_count = Column(Integer, default=0, nullable=False)
+
+    # 📅 Bytes uploaded on `day` (UTC); reset when the day changes
+    day = Column(Date, nullable=True)
+    day_uploaded_bytes = Column(BigInteger, default=0, nullable=False)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timezone
@@ -8,11 +8,36 @@ from db import get_db
 from models.user import User
 from models.rating import RatedEntity, RatingCategoryScore
 from models.evidence import Evidence
-from utils.auth import get_current_user
+from models.user_storage_usage import UserStorageUsage
+from models.job_run import JobRun
+from utils.auth import (
+    get_current_user,
+    Principal,
+    require_admin_claims,
+    TokenClaims,
+    bump_token_version,
+    revoke_tokens_below,
+)
 from schemas.rating_schemas import RatedEntityOut
 from schemas.entity_admin import AdminEntityUpdate
 from datetime import timedelta
-from utils.email import send_entity_approved_email
+from utils.email import build_entity_approved_email
+from utils.email_outbox import enqueue_email
+from utils import metrics
+from utils.evidence_store import release_evidence_blob
+from utils.evidence_tags import unindex_evidence_tags
+from utils.quotas import (
+    USER_STORAGE_QUOTA_BYTES,
+    USER_DAILY_UPLOAD_QUOTA_BYTES,
+    record_evidence_deleted,
+    today,
+)
+from utils.signed_urls import evidence_url, evidence_urls
+from utils.perceptual_hash import (
+    NEAR_DUPLICATE_MAX_DISTANCE,
+    MAX_SEARCH_DISTANCE,
+    find_near_duplicates,
+)
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -20,8 +45,9 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 # ======================================================
 # 🔐 Role-based dependency
+# (read-only listings use require_admin_claims: token only, no user lookup)
 # ======================================================
-def require_admin(current_user: User = Depends(get_current_user)):
+def require_admin(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access only")
     return current_user
@@ -33,7 +59,7 @@ def require_admin(current_user: User = Depends(get_current_user)):
 @router.get("/users")
 def list_users(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin)
+    admin_user: Principal = Depends(require_admin)
 ):
     users = db.query(User).order_by(User.id.desc()).all()
     return [
@@ -53,14 +79,16 @@ def list_users(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    token_version = user.token_version or 0
     db.delete(user)
     db.commit()
+    revoke_tokens_below(user_id, token_version + 1)
     return {"message": f"User {user.username} deleted successfully."}
 
 
@@ -70,7 +98,7 @@ def delete_user(
 @router.get("/officials/pending")
 def get_pending_officials(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin: TokenClaims = Depends(require_admin_claims),
 ):
     officials = (
         db.query(User)
@@ -99,7 +127,7 @@ def get_pending_officials(
 def verify_official(
     user_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     user = db.query(User).filter(User.id == user_id).first()
 
@@ -116,8 +144,10 @@ def verify_official(
     user.is_verified = True
     user.official_verified_at = datetime.now(timezone.utc)
     user.verified_by_admin_id = admin_user.id
+    bump_token_version(user)  # the old token still says official_pending
 
     db.commit()
+    revoke_tokens_below(user.id, user.token_version)
     db.refresh(user)
 
     return {
@@ -132,7 +162,7 @@ def verify_official(
 @router.get("/entities/pending", response_model=List[RatedEntityOut])
 def get_pending_entities(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin: TokenClaims = Depends(require_admin_claims),
 ):
     return (
         db.query(RatedEntity)
@@ -146,7 +176,7 @@ def get_pending_entities(
 def approve_entity(
     entity_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     entity = db.query(RatedEntity).filter(RatedEntity.id == entity_id).first()
 
@@ -162,26 +192,31 @@ def approve_entity(
     entity.approved_by = admin_user.id
     entity.approved_at = datetime.now(timezone.utc)
 
-    db.commit()
-    db.refresh(entity)
-
     # --------------------------------------------------
     # 📧 EMAIL ENTITY CREATOR (ONE-TIME)
     # --------------------------------------------------
     # Only send email if:
     # - entity was pending (prevents duplicate emails)
     # - entity has a recorded creator
+    # Queued in the outbox, committed together with the approval
     if was_pending and entity.created_by_user_id:
         user = db.query(User).filter(
             User.id == entity.created_by_user_id
         ).first()
 
         if user and user.email:
-            send_entity_approved_email(
-                to_email=user.email,
-                entity_name=entity.name
+            enqueue_email(
+                db,
+                "entity_approved",
+                build_entity_approved_email(
+                    to_email=user.email,
+                    entity_name=entity.name
+                ),
             )
 
+    db.commit()
+    db.refresh(entity)
+
     return entity
 
 
@@ -189,7 +224,7 @@ def approve_entity(
 def reject_entity(
     entity_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     entity = db.query(RatedEntity).filter(RatedEntity.id == entity_id).first()
 
@@ -211,32 +246,55 @@ def reject_entity(
 # ======================================================
 @router.get("/evidence")
 def get_all_evidence(
+    mime_type: str | None = Query(None, description='e.g. "video/" or "image/jpeg"'),
+    captured_after: datetime | None = Query(None),
+    captured_before: datetime | None = Query(None),
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     """
     Admin-only:
     - List ALL evidence
     - Regardless of flagged status
     - Regardless of entity approval
+    - Optional filters on file type and capture time
     """
 
-    evidence = (
+    query = (
         db.query(Evidence)
         .join(RatedEntity, Evidence.entity_id == RatedEntity.id)
-        .order_by(Evidence.timestamp.desc())
-        .all()
     )
 
+    if mime_type:
+        if mime_type.endswith("/"):
+            query = query.filter(Evidence.mime_type.startswith(mime_type))
+        else:
+            query = query.filter(Evidence.mime_type == mime_type)
+    if captured_after:
+        query = query.filter(Evidence.captured_at >= captured_after)
+    if captured_before:
+        query = query.filter(Evidence.captured_at < captured_before)
+
+    evidence = query.order_by(Evidence.timestamp.desc()).all()
+
     return [
         {
             "id": e.id,
-            "blob_url": e.blob_url,
+            **evidence_urls(e),
             "description": e.description,
             "tags": e.tags,
             "location": e.location,
             "is_public": e.is_public,
             "is_anonymous": e.is_anonymous,
+            "byte_size": e.byte_size,
+            "mime_type": e.mime_type,
+            "width": e.width,
+            "height": e.height,
+            "duration_seconds": e.duration_seconds,
+            "captured_at": e.captured_at,
+            "gps_latitude": e.gps_latitude,
+            "gps_longitude": e.gps_longitude,
+            "near_duplicate_of": e.near_duplicate_of,
             "entity_id": e.entity_id,
             "entity_name": e.entity.name if e.entity else None,
             "entity_status": e.entity.approval_status if e.entity else None,
@@ -253,7 +311,7 @@ def get_all_evidence(
 def admin_delete_evidence(
     evidence_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     """
     Admin can delete ANY evidence:
@@ -267,19 +325,67 @@ def admin_delete_evidence(
     if not evidence:
         raise HTTPException(status_code=404, detail="Evidence not found")
 
+    release_evidence_blob(db, evidence)
+    unindex_evidence_tags(db, evidence)
+    record_evidence_deleted(db, evidence)
     db.delete(evidence)
     db.commit()
 
     return {"message": f"Evidence {evidence_id} deleted"}
 
 
+# ======================================================
+# 🧬 NEAR-DUPLICATE IMAGES (ADMIN)
+# ======================================================
+@router.get("/evidence/{evidence_id}/near-duplicates")
+def get_near_duplicates(
+    evidence_id: int,
+    max_distance: int = Query(NEAR_DUPLICATE_MAX_DISTANCE, ge=0, le=MAX_SEARCH_DISTANCE),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    admin_user: Principal = Depends(require_admin),
+):
+    evidence = db.query(Evidence).filter(Evidence.id == evidence_id).first()
+
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    if evidence.phash is None:
+        raise HTTPException(status_code=409, detail="Evidence has no perceptual hash yet")
+
+    matches = find_near_duplicates(
+        db,
+        evidence.phash,
+        max_distance=max_distance,
+        exclude_id=evidence.id,
+        limit=limit,
+    )
+
+    return [
+        {
+            "id": e.id,
+            "distance": distance,
+            "blob_url": evidence_url(e.blob_url, e.is_public),
+            "thumb_url": evidence_url(
+                ((e.variants or {}).get("thumb") or {}).get("jpeg"), e.is_public
+            ),
+            "description": e.description,
+            "is_public": e.is_public,
+            "entity_id": e.entity_id,
+            "vault_entry_id": e.vault_entry_id,
+            "created_at": e.timestamp,
+        }
+        for e, distance in matches
+    ]
+
+
 # ======================================================
 # 🔔 ADMIN DASHBOARD COUNTS
 # ======================================================
 @router.get("/counts")
 def admin_counts(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin: TokenClaims = Depends(require_admin_claims),
 ):
     pending_entities = (
         db.query(func.count(RatedEntity.id))
@@ -316,6 +422,84 @@ def admin_counts(
         "flagged_evidence": flagged_evidence or 0,
     }
 
+# ======================================================
+# 📈 IN-PROCESS METRICS (uploads, auth) of the worker that answers
+# Background jobs run elsewhere; see /admin/jobs/runs
+# ======================================================
+@router.get("/metrics")
+def admin_metrics(
+    admin: TokenClaims = Depends(require_admin_claims),
+):
+    return metrics.snapshot()
+
+# ======================================================
+# 🛠️ BACKGROUND JOB RUNS (counters recorded by jobs/*)
+# ======================================================
+@router.get("/jobs/runs")
+def admin_job_runs(
+    job: str = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+    admin: TokenClaims = Depends(require_admin_claims),
+):
+    query = db.query(JobRun)
+    if job:
+        query = query.filter(JobRun.job == job)
+
+    runs = query.order_by(JobRun.started_at.desc()).limit(limit).all()
+
+    return [
+        {
+            "id": run.id,
+            "job": run.job,
+            "status": run.status,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "counters": run.counters or {},
+            "summaries": run.summaries or {},
+            "error": run.error,
+        }
+        for run in runs
+    ]
+
+# ======================================================
+# 💾 STORAGE: TOP CONSUMERS
+# Read from the per-user counters; nothing is summed over evidence
+# ======================================================
+@router.get("/storage/top-consumers")
+def top_storage_consumers(
+    by: str = Query("stored", pattern="^(stored|today)$"),
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db),
+    admin_user: Principal = Depends(require_admin),
+):
+    query = db.query(UserStorageUsage, User).join(User, User.id == UserStorageUsage.user_id)
+
+    if by == "today":
+        query = (
+            query.filter(UserStorageUsage.day == today())
+            .order_by(UserStorageUsage.day_uploaded_bytes.desc())
+        )
+    else:
+        query = query.order_by(UserStorageUsage.stored_bytes.desc())
+
+    return {
+        "storage_quota_bytes": USER_STORAGE_QUOTA_BYTES or None,
+        "daily_upload_quota_bytes": USER_DAILY_UPLOAD_QUOTA_BYTES or None,
+        "users": [
+            {
+                "user_id": user.id,
+                "username": user.username,
+                "role": user.role,
+                "stored_bytes": usage.stored_bytes,
+                "evidence_count": usage.evidence_count,
+                "uploaded_today_bytes": usage.day_uploaded_bytes if usage.day == today() else 0,
+                "updated_at": usage.updated_at,
+            }
+            for usage, user in query.limit(limit).all()
+        ],
+    }
+
 # ======================================================
 # 🔔 Edit Officials
 # ======================================================
@@ -325,7 +509,7 @@ def admin_update_entity(
     entity_id: int,
     payload: AdminEntityUpdate,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     entity = db.query(RatedEntity).filter(RatedEntity.id == entity_id).first()
 
@@ -352,7 +536,7 @@ def admin_update_entity(
 @router.get("/entities")
 def list_all_entities(
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     return (
         db.query(RatedEntity)
@@ -367,7 +551,7 @@ def list_all_entities(
 def retire_entity(
     entity_id: int,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     entity = db.query(RatedEntity).filter(RatedEntity.id == entity_id).first()
 
@@ -389,7 +573,7 @@ def retire_entity(
 def get_new_users(
     days: int = 7,
     db: Session = Depends(get_db),
-    admin_user: User = Depends(require_admin),
+    admin_user: Principal = Depends(require_admin),
 ):
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
@@ -1,19 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 from schemas.schemas import UserCreate, UserOut, UserLogin
-from models.user import User
+from models.user import User, normalize_identifier
 from models.password_reset import PasswordResetToken
 from db import get_db
 from utils.auth import (
     hash_password,
     authenticate_user,
+    find_user_by_identifier,
     create_access_token,
     get_current_user,
+    Principal,
+    invalidate_principal,
+    bump_token_version,
+    revoke_tokens_below,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
 )
-from utils.email import send_verification_email, send_password_reset_email
+from utils.identifier_filter import is_taken, remember_identifiers
+from utils.login_throttle import check_login_attempt, check_availability_lookup, login_succeeded
+from utils.auth_sessions import (
+    create_session,
+    rotate_session,
+    revoke_session,
+    revoke_user_sessions,
+)
+from utils.email import build_verification_email, build_password_reset_email
+from utils.email_outbox import enqueue_email
 
 import os
 import secrets
@@ -68,13 +85,23 @@ async def signup_options(request: Request):
 # ======================================================
 @router.post("/signup", response_model=UserOut)
 def signup(user: UserCreate, db: Session = Depends(get_db)):
-    username = user.username.lower().strip()
-    email = user.email.lower().strip()
+    username = normalize_identifier(user.username)
+    email = normalize_identifier(user.email)
 
-    if db.query(User).filter(User.email == email).first():
+    # One query for both conflicts
+    taken = (
+        db.query(User.email_normalized, User.username_normalized)
+        .filter(
+            (User.email_normalized == email) |
+            (User.username_normalized == username)
+        )
+        .all()
+    )
+
+    if any(row.email_normalized == email for row in taken):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    if db.query(User).filter(User.username == username).first():
+    if taken:
         raise HTTPException(status_code=400, detail="Username already taken")
 
     raw_token, token_hash, expires_at = make_verify_token()
@@ -107,18 +134,75 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
+
+    # 📧 Sent by the outbox dispatcher, committed together with the user
+    enqueue_email(db, "verification", build_verification_email(email, raw_token), expires_at=expires_at)
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent signup for the same name
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email or username already registered")
     db.refresh(new_user)
+    remember_identifiers(email=new_user.email, username=new_user.username)
 
-    send_verification_email(new_user.email, raw_token)
     return new_user
 
+# ======================================================
+# Availability (live check while typing the signup form)
+# Answered from an in-memory filter; the DB is only asked on a possible hit
+# ======================================================
+@router.get("/availability")
+def check_availability(
+    request: Request,
+    username: Optional[str] = Query(None, max_length=150),
+    email: Optional[str] = Query(None, max_length=320),
+    db: Session = Depends(get_db),
+):
+    if not username and not email:
+        raise HTTPException(status_code=400, detail="username or email required")
+
+    # Unauthenticated: rate-limited per address, emails more tightly
+    check_availability_lookup(request, checks_email=bool(email))
+
+    result = {}
+    if username:
+        result["username"] = {
+            "value": normalize_identifier(username),
+            "available": not is_taken(db, "username", username),
+        }
+    if email:
+        result["email"] = {
+            "value": normalize_identifier(email),
+            "available": not is_taken(db, "email", email),
+        }
+    return result
+
 # ======================================================
 # Login (username OR email)
 # ======================================================
+def token_response(user: User, refresh_token: str) -> dict:
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role, "tv": user.token_version or 0}
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        "refresh_token": refresh_token,
+    }
+
+
 @router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = authenticate_user(db, user.identifier, user.password)
+def login(user: UserLogin, request: Request, db: Session = Depends(get_db)):
+    identifier = normalize_identifier(user.identifier)
+
+    # 🚦 Before any lookup or bcrypt work
+    check_login_attempt(identifier, request)
+
+    db_user = authenticate_user(db, identifier, user.password)
 
     if not db_user:
         raise HTTPException(
@@ -126,11 +210,47 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid username/email or password",
         )
 
-    access_token = create_access_token(
-        data={"sub": str(db_user.id), "role": db_user.role}
-    )
+    login_succeeded(identifier)
+
+    refresh_token = create_session(db, db_user, request)
+    db.commit()
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return token_response(db_user, refresh_token)
+
+# ======================================================
+# Refresh (new access token without the password)
+# The refresh token is rotated: each one works exactly once
+# ======================================================
+class RefreshTokenPayload(BaseModel):
+    refresh_token: str
+
+@router.post("/refresh")
+def refresh_access_token(payload: RefreshTokenPayload, db: Session = Depends(get_db)):
+    session, refresh_token = rotate_session(db, payload.refresh_token)
+
+    user = db.query(User).filter(User.id == session.user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+    return token_response(user, refresh_token)
+
+# ======================================================
+# Logout (revokes the session server-side)
+# ======================================================
+@router.post("/logout")
+def logout(payload: RefreshTokenPayload, db: Session = Depends(get_db)):
+    revoke_session(db, payload.refresh_token)
+    db.commit()
+    return {"ok": True}
+
+@router.post("/logout-all")
+def logout_all(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    revoked = revoke_user_sessions(db, current_user.id, "logout_all")
+    db.commit()
+    return {"ok": True, "revoked": revoked}
 
 # ======================================================
 # Forgot Password (Recovery)
@@ -148,16 +268,7 @@ def forgot_password(
     Always returns success to prevent account enumeration.
     """
 
-    identifier = payload.identifier.lower().strip()
-
-    user = (
-        db.query(User)
-        .filter(
-            (User.email == identifier) |
-            (User.username == identifier)
-        )
-        .first()
-    )
+    user = find_user_by_identifier(db, payload.identifier)
 
     response = {
         "message": "If an account exists, a reset link has been sent."
@@ -184,12 +295,13 @@ def forgot_password(
     )
 
     db.add(reset_token)
-    db.commit()
-
-    send_password_reset_email(
-        to_email=user.email,
-        token=raw_token,
+    enqueue_email(
+        db,
+        "password_reset",
+        build_password_reset_email(to_email=user.email, token=raw_token),
+        expires_at=expires_at,
     )
+    db.commit()
 
     return response
 # ======================================================
@@ -246,7 +358,12 @@ def reset_password(
     reset_token.used = True
     reset_token.used_at = datetime.now(timezone.utc)
 
+    # 🔒 Sign out everywhere (whoever knew the old password included)
+    revoke_user_sessions(db, user.id, "password_reset")
+    bump_token_version(user)
+
     db.commit()
+    revoke_tokens_below(user.id, user.token_version)
 
     return {
         "message": "Password reset successful. You may now log in."
@@ -257,7 +374,7 @@ def reset_password(
 # Current user
 # ======================================================
 @router.get("/me", response_model=UserOut)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 # ======================================================
@@ -269,7 +386,7 @@ class VerifyEmailPayload(BaseModel):
 
 @router.post("/verify-email")
 def verify_email(payload: VerifyEmailPayload, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
+    user = db.query(User).filter(User.email_normalized == normalize_identifier(payload.email)).first()
     if not user:
         raise HTTPException(status_code=400, detail="Invalid verification link")
 
@@ -290,6 +407,7 @@ def verify_email(payload: VerifyEmailPayload, db: Session = Depends(get_db)):
     user.email_verification_token_hash = None
     user.email_verification_expires_at = None
     db.commit()
+    invalidate_principal(user.id)
 
     return {"ok": True, "message": "Email verified"}
 
@@ -309,7 +427,7 @@ def resend_verification(
         "message": "If the email exists, a verification link was sent",
     }
 
-    user = db.query(User).filter(User.email == payload.email.lower()).first()
+    user = db.query(User).filter(User.email_normalized == normalize_identifier(payload.email)).first()
     if not user or user.is_email_verified:
         return response
 
@@ -317,7 +435,7 @@ def resend_verification(
     user.email_verification_token_hash = token_hash
     user.email_verification_expires_at = expires_at
     user.email_verified_at = None
+    enqueue_email(db, "verification", build_verification_email(user.email, raw_token), expires_at=expires_at)
     db.commit()
 
-    send_verification_email(user.email, raw_token)
     return response
@@ -1,45 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, status
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from sqlalchemy import and_, or_, insert
+from sqlalchemy.orm import Session, aliased, joinedload
 from typing import Optional, List
+import io
+import os
+import posixpath
+from datetime import datetime, timedelta, timezone
+from jose import JWTError, jwt
 
 from db import get_db
 from models.evidence import Evidence
+from models.evidence_tag import EvidenceTag, TagCount
 from models.rating import RatedEntity
 from models.vault_entry import VaultEntry
-from models.user import User
-from utils.auth import get_current_user
-from utils.blob_utils import upload_file_to_b2
-from schemas.evidence import EvidenceOut
+from utils.auth import get_current_user, Principal, SECRET_KEY, ALGORITHM
+from utils.evidence_store import store_evidence_file, store_evidence_files, release_evidence_blob
+from utils.media_jobs import enqueue_processing_for
+from utils.evidence_tags import (
+    normalize_tag,
+    normalize_tags,
+    index_evidence_tags,
+    index_evidence_tags_many,
+    unindex_evidence_tags,
+)
+from utils.signed_urls import evidence_url, verify_hls_token, sign_hls_playlist, SIGNED_URL_TTL_SECONDS
+from utils.quotas import check_upload_quota, reserve_upload, record_evidence_deleted
+from utils.content_cache import get_content_cache
+from utils import metrics
+from utils.blob_utils import (
+    MB,
+    make_object_key,
+    key_for_url,
+    public_url_for_key,
+    supports_direct_upload,
+    generate_presigned_upload,
+    head_object,
+    iter_blob,
+    download_to_file,
+    delete_blob,
+    PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+)
+from schemas.evidence import (
+    EvidenceOut,
+    EvidencePage,
+    TagCountOut,
+    PresignedUploadRequest,
+    PresignedUploadOut,
+    ConfirmUploadRequest,
+)
 
 router = APIRouter(prefix="/vault", tags=["evidence"])
 
+UPLOAD_TOKEN_PURPOSE = "evidence_upload"
+MAX_FILES_PER_UPLOAD = int(os.getenv("MAX_FILES_PER_UPLOAD", 50))
 
-# ======================================================
-# 1️⃣ Upload Evidence (LOGIN REQUIRED)
-# Supports:
-# - Standalone evidence (old behavior)
-# - Evidence attached to a Vault Entry (new behavior)
-# ======================================================
-@router.post("", response_model=dict)
-async def upload_evidence(
-    file: UploadFile = File(...),
+# Kept "private" so shared caches never hold evidence that is later made
+# private; browsers may reuse their copy for this long
+EVIDENCE_CONTENT_MAX_AGE_SECONDS = int(os.getenv("EVIDENCE_CONTENT_MAX_AGE_SECONDS", 300))
 
-    # OPTIONAL links
-    entity_id: Optional[int] = Form(None),
-    vault_entry_id: Optional[int] = Form(None),
+# Only media a browser renders passively is served inline; SVG can carry script
+INLINE_CONTENT_PREFIXES = ("image/", "video/", "audio/")
+ACTIVE_CONTENT_TYPES = {"image/svg+xml"}
 
-    description: Optional[str] = Form(None),
-    tags: Optional[str] = Form(None),
-    location: Optional[str] = Form(None),
-    is_public: bool = Form(True),
-    is_anonymous: bool = Form(False),
 
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+# ======================================================
+# Shared upload validation
+# Returns the (entity_id, is_public) the evidence should be stored with
+# ======================================================
+def resolve_evidence_target(
+    db: Session,
+    current_user: Principal,
+    *,
+    entity_id: Optional[int],
+    vault_entry_id: Optional[int],
+    is_public: bool,
 ):
-    if not file:
-        raise HTTPException(status_code=400, detail="File required")
-
     # 🔒 Validate Vault Entry (if provided)
     if vault_entry_id:
         vault_entry = (
@@ -79,18 +115,62 @@ async def upload_evidence(
                 detail="This entity is pending review and cannot receive evidence yet.",
             )
 
-    # 📤 Upload file
+    return entity_id, is_public
+
+
+# ======================================================
+# 1️⃣ Upload Evidence (LOGIN REQUIRED)
+# Supports:
+# - Standalone evidence (old behavior)
+# - Evidence attached to a Vault Entry (new behavior)
+# ======================================================
+@router.post("", response_model=dict)
+def upload_evidence(
+    file: UploadFile = File(...),
+
+    # OPTIONAL links
+    entity_id: Optional[int] = Form(None),
+    vault_entry_id: Optional[int] = Form(None),
+
+    description: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),
+    location: Optional[str] = Form(None),
+    is_public: bool = Form(True),
+    is_anonymous: bool = Form(False),
+
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if not file:
+        raise HTTPException(status_code=400, detail="File required")
+
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=entity_id,
+        vault_entry_id=vault_entry_id,
+        is_public=is_public,
+    )
+
+    # 📏 Exact size is known once the form is parsed
+    check_upload_quota(db, current_user, file.size or 0)
+
+    # 📤 Upload file (skipped if the same content is already stored)
     try:
-        blob_url = upload_file_to_b2(
+        blob_url, content_sha256, file_metadata = store_evidence_file(
+            db,
             file_obj=file.file,
             original_filename=file.filename,
             content_type=file.content_type or "application/octet-stream",
         )
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
     evidence = Evidence(
         blob_url=blob_url,
+        content_sha256=content_sha256,
+        **file_metadata,
         description=description,
         tags=tags,
         location=location,
@@ -102,12 +182,290 @@ async def upload_evidence(
     )
 
     db.add(evidence)
+    db.flush()
+    index_evidence_tags(db, evidence)
+    enqueue_processing_for(db, evidence, file.content_type)
+    # Over quota after all (a concurrent upload won): the stored object is
+    # left to the orphan collector
+    reserve_upload(db, current_user, evidence.byte_size, stored=not is_anonymous)
     db.commit()
     db.refresh(evidence)
 
     return {
         "id": evidence.id,
-        "blob_url": evidence.blob_url,
+        "blob_url": evidence_url(evidence.blob_url, evidence.is_public),
+        "created_at": evidence.timestamp,
+    }
+
+
+# ======================================================
+# 1️⃣b Upload Many Files (LOGIN REQUIRED)
+# Same form fields as above, shared by every file.
+# Returns one result per file, in order; failed files don't block the rest
+# ======================================================
+@router.post("/batch", response_model=dict)
+def upload_evidence_batch(
+    files: List[UploadFile] = File(...),
+
+    entity_id: Optional[int] = Form(None),
+    vault_entry_id: Optional[int] = Form(None),
+
+    description: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),
+    location: Optional[str] = Form(None),
+    is_public: bool = Form(True),
+    is_anonymous: bool = Form(False),
+
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if not files:
+        raise HTTPException(status_code=400, detail="File required")
+
+    if len(files) > MAX_FILES_PER_UPLOAD:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_FILES_PER_UPLOAD} files per request",
+        )
+
+    # 🔒 Validated once for the whole batch
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=entity_id,
+        vault_entry_id=vault_entry_id,
+        is_public=is_public,
+    )
+
+    check_upload_quota(db, current_user, sum(f.size or 0 for f in files))
+
+    # 📤 Hash + upload in parallel (deduplicated per content)
+    try:
+        stored = store_evidence_files(
+            db,
+            [
+                (f.file, f.filename, f.content_type or "application/octet-stream")
+                for f in files
+            ],
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    rows = []
+    stored_files = []
+    for f, result in zip(files, stored):
+        if isinstance(result, Exception):
+            continue
+        blob_url, content_sha256, file_metadata = result
+        stored_files.append(f)
+        rows.append({
+            "blob_url": blob_url,
+            "content_sha256": content_sha256,
+            **file_metadata,
+            "description": description,
+            "tags": tags,
+            "location": location,
+            "is_public": is_public,
+            "is_anonymous": is_anonymous,
+            "entity_id": entity_id,
+            "vault_entry_id": vault_entry_id,
+            "user_id": None if is_anonymous else current_user.id,
+        })
+
+    # One multi-row INSERT ... RETURNING for all evidence
+    created = []
+    if rows:
+        created = db.scalars(
+            insert(Evidence).returning(Evidence, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        index_evidence_tags_many(db, created)
+        for evidence, f in zip(created, stored_files):
+            enqueue_processing_for(db, evidence, f.content_type)
+        reserve_upload(
+            db,
+            current_user,
+            sum(evidence.byte_size or 0 for evidence in created),
+            count=len(created),
+            stored=not is_anonymous,
+        )
+
+    db.commit()
+
+    results = []
+    created_iter = iter(created)
+    for f, result in zip(files, stored):
+        if isinstance(result, Exception):
+            results.append({
+                "filename": f.filename,
+                "status": "failed",
+                "error": str(result),
+            })
+            continue
+
+        evidence = next(created_iter)
+        results.append({
+            "filename": f.filename,
+            "status": "created",
+            "id": evidence.id,
+            "blob_url": evidence_url(evidence.blob_url, evidence.is_public),
+            "created_at": evidence.timestamp,
+        })
+
+    return {
+        "created": len(created),
+        "failed": len(files) - len(created),
+        "results": results,
+    }
+
+
+# ======================================================
+# 📤 DIRECT UPLOAD – STEP 1: PRESIGN (LOGIN REQUIRED)
+# Client PUTs the file straight to B2, bytes never touch the API
+# ======================================================
+@router.post("/uploads/presign", response_model=PresignedUploadOut)
+def presign_evidence_upload(
+    payload: PresignedUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    if not supports_direct_upload():
+        raise HTTPException(
+            status_code=501,
+            detail="This storage backend does not support direct uploads",
+        )
+
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=payload.entity_id,
+        vault_entry_id=payload.vault_entry_id,
+        is_public=payload.is_public,
+    )
+
+    # Size is unknown until confirm; refuse only when nothing is left
+    check_upload_quota(db, current_user, 1)
+
+    content_type = payload.content_type or "application/octet-stream"
+    key = make_object_key(payload.filename)
+
+    try:
+        upload_url = generate_presigned_upload(key=key, content_type=content_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not prepare upload: {str(e)}")
+
+    # Signed so /confirm can trust the key and metadata without a DB row
+    upload_token = jwt.encode(
+        {
+            "purpose": UPLOAD_TOKEN_PURPOSE,
+            "sub": str(current_user.id),
+            "key": key,
+            "entity_id": entity_id,
+            "vault_entry_id": payload.vault_entry_id,
+            "is_public": is_public,
+            "is_anonymous": payload.is_anonymous,
+            "description": payload.description,
+            "tags": payload.tags,
+            "location": payload.location,
+            # Leave time to confirm after a slow upload finishes
+            "exp": datetime.now(timezone.utc)
+            + timedelta(seconds=PRESIGNED_UPLOAD_EXPIRES_SECONDS * 2),
+        },
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+    return {
+        "upload_url": upload_url,
+        "method": "PUT",
+        "headers": {"Content-Type": content_type},
+        "object_key": key,
+        "upload_token": upload_token,
+        "expires_in": PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+    }
+
+
+# ======================================================
+# 📤 DIRECT UPLOAD – STEP 2: CONFIRM (LOGIN REQUIRED)
+# ======================================================
+@router.post("/uploads/confirm", response_model=dict)
+def confirm_evidence_upload(
+    payload: ConfirmUploadRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    try:
+        claims = jwt.decode(payload.upload_token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=400, detail="Invalid or expired upload token")
+
+    if claims.get("purpose") != UPLOAD_TOKEN_PURPOSE or claims.get("sub") != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Upload token does not belong to this user")
+
+    # Re-check: the vault entry or entity may have changed since presign
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=claims.get("entity_id"),
+        vault_entry_id=claims.get("vault_entry_id"),
+        is_public=claims.get("is_public", True),
+    )
+
+    blob_url = public_url_for_key(claims["key"])
+
+    # Confirm is idempotent for retries from flaky clients
+    existing = db.query(Evidence).filter(Evidence.blob_url == blob_url).first()
+    if existing:
+        return {
+            "id": existing.id,
+            "blob_url": evidence_url(existing.blob_url, existing.is_public),
+            "created_at": existing.timestamp,
+        }
+
+    try:
+        head = head_object(claims["key"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload check failed: {str(e)}")
+
+    if head is None:
+        raise HTTPException(status_code=400, detail="Uploaded file not found")
+
+    is_anonymous = claims.get("is_anonymous", False)
+
+    # The bytes are already in storage; drop them if they don't fit
+    try:
+        reserve_upload(db, current_user, head.get("ContentLength"), stored=not is_anonymous)
+    except HTTPException:
+        db.rollback()
+        delete_blob(claims["key"])
+        raise
+
+    # Bytes never pass through us here; only what storage reports is known
+    evidence = Evidence(
+        blob_url=blob_url,
+        byte_size=head.get("ContentLength"),
+        mime_type=head.get("ContentType"),
+        description=claims.get("description"),
+        tags=claims.get("tags"),
+        location=claims.get("location"),
+        is_public=is_public,
+        is_anonymous=is_anonymous,
+        entity_id=entity_id,
+        vault_entry_id=claims.get("vault_entry_id"),
+        user_id=None if is_anonymous else current_user.id,
+    )
+
+    db.add(evidence)
+    db.flush()
+    index_evidence_tags(db, evidence)
+    enqueue_processing_for(db, evidence, head.get("ContentType"))
+    db.commit()
+    db.refresh(evidence)
+
+    return {
+        "id": evidence.id,
+        "blob_url": evidence_url(evidence.blob_url, evidence.is_public),
         "created_at": evidence.timestamp,
     }
 
@@ -139,6 +497,104 @@ def vault_feed(
     return evidence_items
 
 
+# ======================================================
+# 2️⃣b Tags (PUBLIC READ)
+# ======================================================
+@router.get("/tags", response_model=List[TagCountOut])
+def list_tags(
+    db: Session = Depends(get_db),
+    prefix: Optional[str] = Query(None, description="autocomplete"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    query = db.query(TagCount).filter(TagCount.evidence_count > 0)
+
+    prefix = normalize_tag(prefix)
+    if prefix:
+        query = query.filter(TagCount.tag.startswith(prefix))
+
+    return (
+        query
+        .order_by(TagCount.evidence_count.desc(), TagCount.tag.asc())
+        .limit(limit)
+        .all()
+    )
+
+
+@router.get("/tags/search", response_model=EvidencePage)
+def search_by_tags(
+    tags: str = Query(..., description="comma-separated, e.g. bodycam,traffic stop"),
+    mode: str = Query("all", pattern="^(all|any)$"),
+    state: Optional[str] = Query(None),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    tag_list = normalize_tags(tags)
+    if not tag_list:
+        raise HTTPException(status_code=400, detail="At least one tag required")
+
+    query = db.query(Evidence)
+
+    if mode == "all":
+        # Drive the join from the rarest tag; the others are index probes
+        counts = dict(
+            db.query(TagCount.tag, TagCount.evidence_count)
+            .filter(TagCount.tag.in_(tag_list))
+            .all()
+        )
+        if len(counts) < len(tag_list):
+            return {"items": [], "next_cursor": None}
+
+        for tag in sorted(tag_list, key=lambda t: counts[t]):
+            tagged = aliased(EvidenceTag)
+            query = query.join(
+                tagged,
+                and_(tagged.evidence_id == Evidence.id, tagged.tag == tag),
+            )
+    else:
+        matching = (
+            db.query(EvidenceTag.evidence_id)
+            .filter(EvidenceTag.tag.in_(tag_list))
+        )
+        query = query.filter(Evidence.id.in_(matching))
+
+    # Same visibility as the feeds: entity approved, vault entry public
+    query = query.filter(
+        Evidence.is_public == True,
+        or_(
+            Evidence.entity_id == None,
+            Evidence.entity.has(approval_status="approved"),
+        ),
+        or_(
+            Evidence.vault_entry_id == None,
+            Evidence.vault_entry.has(is_public=True),
+        ),
+    )
+
+    if state:
+        query = query.filter(Evidence.entity.has(state=state))
+    if cursor:
+        query = query.filter(Evidence.id < cursor)
+
+    items = (
+        query
+        .options(
+            joinedload(Evidence.user),
+            joinedload(Evidence.entity),
+        )
+        .order_by(Evidence.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = items[-1].id
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
 # ======================================================
 # 3️⃣ Single Evidence Detail (PUBLIC READ)
 # ======================================================
@@ -166,6 +622,189 @@ def get_evidence_detail(
     return evidence
 
 
+# ======================================================
+# 3️⃣b Evidence Content (PUBLIC READ, streamed through the API)
+# Supports single HTTP ranges so video players can seek
+# ======================================================
+def parse_range(header: Optional[str], size: int):
+    """
+    Returns (start, end) inclusive for a "bytes=" range, None to send the
+    whole file, or raises 416. Multi-range requests get the whole file.
+    """
+
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # "bytes=-500" → the last 500 bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+
+    return start, min(end, size - 1)
+
+
+def content_headers(evidence_id: int, content_type: Optional[str]):
+    """
+    (media_type, headers) for serving a user upload from the API origin.
+    Anything that is not passive media is sent as an opaque download, and
+    the sandbox CSP keeps even a mislabeled file from running script here.
+    """
+
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    headers = {
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "sandbox; default-src 'none'",
+        "Cache-Control": f"private, max-age={EVIDENCE_CONTENT_MAX_AGE_SECONDS}",
+    }
+
+    if content_type.startswith(INLINE_CONTENT_PREFIXES) and content_type not in ACTIVE_CONTENT_TYPES:
+        headers["Content-Disposition"] = "inline"
+        return content_type, headers
+
+    headers["Content-Disposition"] = f'attachment; filename="evidence-{evidence_id}"'
+    return "application/octet-stream", headers
+
+
+def iter_file(path: str, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(MB, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/{evidence_id}/content")
+def get_evidence_content(
+    evidence_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    evidence = (
+        db.query(Evidence)
+        .filter(
+            Evidence.id == evidence_id,
+            Evidence.is_public == True,
+        )
+        .first()
+    )
+
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    key = key_for_url(evidence.blob_url)
+    if not key:
+        # Legacy evidence stored outside our bucket
+        return RedirectResponse(evidence.blob_url)
+
+    size = evidence.byte_size
+    content_type = evidence.mime_type
+    if size is None or content_type is None:
+        head = head_object(key)
+        if head is None:
+            raise HTTPException(status_code=404, detail="Evidence file not found")
+        size = head["ContentLength"]
+        content_type = content_type or head.get("ContentType")
+
+    cache = get_content_cache()
+    cached_path = None
+    if cache.cacheable(size):
+        try:
+            cached_path = cache.fetch(key)
+            size = os.path.getsize(cached_path)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Could not fetch evidence: {str(e)}")
+
+    byte_range = parse_range(request.headers.get("range"), size)
+    start, end = byte_range or (0, size - 1)
+
+    media_type, headers = content_headers(evidence.id, content_type)
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Length"] = str(end - start + 1)
+    if evidence.content_sha256:
+        headers["ETag"] = f'"{evidence.content_sha256}"'
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    if size == 0:
+        body = iter([])
+    elif cached_path:
+        body = iter_file(cached_path, start, end)
+    else:
+        body = iter_blob(key, start, end)
+
+    metrics.incr("storage.content.bytes_served", end - start + 1)
+
+    return StreamingResponse(
+        body,
+        status_code=206 if byte_range else 200,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+# ======================================================
+# 3️⃣c Signed HLS playlists (token from utils/signed_urls.hls_playlist_url)
+# Segment URLs inside are signed; players can't send auth headers
+# ======================================================
+@router.get("/{evidence_id}/hls/{path:path}")
+def get_hls_playlist(
+    evidence_id: int,
+    path: str,
+    token: str = Query(...),
+    db: Session = Depends(get_db),
+):
+    if not verify_hls_token(token, evidence_id):
+        raise HTTPException(status_code=403, detail="Invalid or expired playlist token")
+
+    path = posixpath.normpath(path)
+    if not path.endswith(".m3u8") or path.startswith(("/", "..")):
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    evidence = db.query(Evidence).filter(Evidence.id == evidence_id).first()
+    master_key = key_for_url(evidence.hls_url) if evidence and evidence.hls_url else None
+    if not master_key:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    key_prefix = posixpath.dirname(master_key)
+    buffer = io.BytesIO()
+    try:
+        download_to_file(f"{key_prefix}/{path}", buffer)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+
+    playlist = sign_hls_playlist(
+        buffer.getvalue().decode("utf-8"), evidence.id, path, key_prefix, token
+    )
+    metrics.incr("storage.hls.playlists_signed")
+
+    return Response(
+        playlist,
+        media_type="application/vnd.apple.mpegurl",
+        headers={
+            "Cache-Control": f"private, max-age={min(SIGNED_URL_TTL_SECONDS, 300)}",
+            "X-Content-Type-Options": "nosniff",
+        },
+    )
+
+
 # ======================================================
 # 4️⃣ DELETE EVIDENCE (OWNER ONLY)
 # ======================================================
@@ -173,7 +812,7 @@ def get_evidence_detail(
 def delete_evidence(
     evidence_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     evidence = db.query(Evidence).filter(Evidence.id == evidence_id).first()
 
@@ -192,6 +831,9 @@ def delete_evidence(
             detail="Not authorized to delete this evidence",
         )
 
+    release_evidence_blob(db, evidence)
+    unindex_evidence_tags(db, evidence)
+    record_evidence_deleted(db, evidence)
     db.delete(evidence)
     db.commit()
     return
@@ -7,6 +7,7 @@ from models.rating import RatingCategoryScore
 from models.official_post import OfficialPost
 from models.evidence import Evidence
 from schemas.feed import FeedItemOut
+from utils.signed_urls import evidence_urls
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
@@ -53,7 +54,8 @@ def unified_feed(
             "evidence": [
                 {
                     "id": ev.id,
-                    "blob_url": ev.blob_url,
+                    **evidence_urls(ev),
+                    "processing_status": ev.processing_status,
                     "description": ev.description,
                 }
                 for ev in evidence_items
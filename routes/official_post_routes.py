@@ -3,8 +3,7 @@ from sqlalchemy.orm import Session, joinedload
 
 from db import get_db
 from models.official_post import OfficialPost
-from models.user import User
-from utils.auth import get_current_user
+from utils.auth import get_current_user, Principal
 from schemas.official_post_schemas import OfficialPostCreate
 
 router = APIRouter(prefix="/forum", tags=["official_posts"])
@@ -15,7 +14,7 @@ router = APIRouter(prefix="/forum", tags=["official_posts"])
 def create_post(
     post: OfficialPostCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role not in ("official_verified", "admin"):
         raise HTTPException(status_code=403, detail="Only officials can post")
@@ -2,9 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from db import get_db
 from models.post_comment import PostComment
-from models.user import User
 from schemas.post_comment_schemas import PostCommentCreate, PostCommentOut
-from utils.auth import get_current_user
+from utils.auth import get_current_user, Principal
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
@@ -16,7 +15,7 @@ router = APIRouter(prefix="/comments", tags=["comments"])
 def create_comment(
     comment: PostCommentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     new_comment = PostComment(
         post_id=comment.post_id,
@@ -49,7 +48,7 @@ def get_comments_for_post(post_id: int, db: Session = Depends(get_db)):
 def delete_comment(
     comment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     comment = db.query(PostComment).filter(PostComment.id == comment_id).first()
 
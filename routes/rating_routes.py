@@ -6,8 +6,7 @@ from datetime import datetime, timezone
 
 from db import get_db
 from models.rating import RatedEntity, RatingCategoryScore, EvidenceAttachment
-from models.user import User
-from utils.auth import get_current_user
+from utils.auth import get_current_user, Principal
 from schemas.rating_schemas import (
     RatedEntityCreate,
     RatedEntityOut,
@@ -59,7 +58,7 @@ def recalculate_reputation(entity_id: int, db: Session) -> float:
 def create_entity(
     entity: RatedEntityCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     existing = db.query(RatedEntity).filter(
         func.lower(RatedEntity.name) == entity.name.strip().lower(),
@@ -187,7 +186,7 @@ def list_entities(
 def submit_or_update_rating(
     rating: RatingCategoryScoreCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     # 🔒 Must be an approved entity to receive ratings
     entity = db.query(RatedEntity).filter(
@@ -279,7 +278,7 @@ def submit_or_update_rating(
 def verify_rating(
     rating_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
@@ -321,7 +320,7 @@ def verify_rating(
 def delete_rating(
     rating_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     rating = db.query(RatingCategoryScore).filter(
         RatingCategoryScore.id == rating_id
@@ -373,7 +372,7 @@ def flag_rating(
     rating_id: int,
     flag: FlagRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     rating = db.query(RatingCategoryScore).filter(
         RatingCategoryScore.id == rating_id
@@ -396,7 +395,7 @@ def flag_rating(
 @router.get("/admin/flagged-ratings", response_model=List[RatingCategoryScoreOut])
 def get_flagged_ratings(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
@@ -412,7 +411,7 @@ def get_flagged_ratings(
 @router.get("/unverified", response_model=List[RatingCategoryScoreOut])
 def get_unverified_ratings(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
@@ -432,7 +431,7 @@ def get_unverified_ratings(
 def get_my_rating_for_entity(
     entity_id: int = Query(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     rating = (
         db.query(RatingCategoryScore)
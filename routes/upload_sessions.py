@@ -0,0 +1,352 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from db import get_db
+from models.evidence import Evidence
+from models.upload_session import UploadSession, UploadSessionPart
+from routes.evidence import resolve_evidence_target
+from utils.auth import get_current_user, Principal
+from utils.media_jobs import enqueue_processing_for
+from utils.evidence_tags import index_evidence_tags
+from utils.signed_urls import evidence_url
+from utils.quotas import check_upload_quota, reserve_upload
+from utils.blob_utils import (
+    MB,
+    make_object_key,
+    public_url_for_key,
+    create_multipart_upload,
+    upload_part,
+    complete_multipart_upload,
+    abort_multipart_upload,
+)
+from schemas.evidence import UploadSessionCreate, UploadSessionOut
+
+router = APIRouter(prefix="/vault/uploads/sessions", tags=["evidence"])
+
+# ======================================================
+# Config
+# ======================================================
+# B2/S3 require every part except the last to be at least 5 MB
+RESUMABLE_CHUNK_SIZE = max(5, int(os.getenv("RESUMABLE_CHUNK_SIZE_MB", 8))) * MB
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv("UPLOAD_SESSION_TTL_HOURS", 24))
+MAX_PARTS = 10000
+
+
+def session_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=UPLOAD_SESSION_TTL_HOURS)
+
+
+def serialize_session(session: UploadSession) -> dict:
+    received = [p.part_number for p in session.parts]
+
+    next_part = 1
+    for number in received:
+        if number != next_part:
+            break
+        next_part += 1
+
+    return {
+        "id": session.id,
+        "status": session.status,
+        "chunk_size": session.chunk_size,
+        "total_size": session.total_size,
+        "received_parts": received,
+        "received_bytes": sum(p.size for p in session.parts),
+        "next_part": next_part,
+        "expires_at": session.expires_at,
+        "evidence_id": session.evidence_id,
+    }
+
+
+def get_open_session(db: Session, session_id: str, current_user: Principal) -> UploadSession:
+    session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+    if session.status != "open":
+        raise HTTPException(status_code=409, detail=f"Upload session is {session.status}")
+
+    if session.expires_at < datetime.now(timezone.utc):
+        raise HTTPException(status_code=410, detail="Upload session expired")
+
+    return session
+
+
+# ======================================================
+# 1️⃣ CREATE SESSION (LOGIN REQUIRED)
+# ======================================================
+@router.post("", response_model=UploadSessionOut, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    payload: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=payload.entity_id,
+        vault_entry_id=payload.vault_entry_id,
+        is_public=payload.is_public,
+    )
+
+    if payload.total_size is not None:
+        if payload.total_size <= 0:
+            raise HTTPException(status_code=400, detail="total_size must be positive")
+        if payload.total_size > RESUMABLE_CHUNK_SIZE * MAX_PARTS:
+            raise HTTPException(status_code=413, detail="File too large")
+        check_upload_quota(db, current_user, payload.total_size)
+
+    content_type = payload.content_type or "application/octet-stream"
+    key = make_object_key(payload.filename)
+
+    try:
+        upload_id = create_multipart_upload(key=key, content_type=content_type)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not start upload: {str(e)}")
+
+    session = UploadSession(
+        id=str(uuid.uuid4()),
+        user_id=current_user.id,
+        entity_id=entity_id,
+        vault_entry_id=payload.vault_entry_id,
+        description=payload.description,
+        tags=payload.tags,
+        location=payload.location,
+        is_public=is_public,
+        is_anonymous=payload.is_anonymous,
+        filename=payload.filename,
+        content_type=content_type,
+        object_key=key,
+        multipart_upload_id=upload_id,
+        chunk_size=RESUMABLE_CHUNK_SIZE,
+        total_size=payload.total_size,
+        status="open",
+        expires_at=session_expiry(),
+    )
+
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+
+    return serialize_session(session)
+
+
+# ======================================================
+# 2️⃣ SESSION STATUS (resume from `next_part`)
+# ======================================================
+@router.get("/{session_id}", response_model=UploadSessionOut)
+def get_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+
+    if not session or session.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+    return serialize_session(session)
+
+
+# ======================================================
+# 3️⃣ PUT CHUNK (raw request body, 1-based part number)
+# Re-sending an acknowledged part replaces it
+# ======================================================
+async def read_chunk(request: Request, limit: int) -> bytes:
+    """
+    Reads the request body, with 413 as soon as it grows past `limit`
+    (chunked requests carry no Content-Length to check up front).
+    """
+
+    body = bytearray()
+    async for data in request.stream():
+        body.extend(data)
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Chunk larger than chunk_size")
+    return bytes(body)
+
+
+def record_chunk(db: Session, session: UploadSession, part_number: int, etag: str, size: int) -> dict:
+    part = (
+        db.query(UploadSessionPart)
+        .filter(
+            UploadSessionPart.session_id == session.id,
+            UploadSessionPart.part_number == part_number,
+        )
+        .first()
+    )
+
+    if part:
+        part.etag = etag
+        part.size = size
+    else:
+        db.add(UploadSessionPart(
+            session_id=session.id,
+            part_number=part_number,
+            etag=etag,
+            size=size,
+        ))
+
+    session.expires_at = session_expiry()
+    db.commit()
+    db.refresh(session)
+
+    return serialize_session(session)
+
+
+@router.put("/{session_id}/chunks/{part_number}", response_model=UploadSessionOut)
+async def put_upload_chunk(
+    session_id: str,
+    part_number: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    # Database work goes to the threadpool; only the body is read here
+    session = await run_in_threadpool(get_open_session, db, session_id, current_user)
+
+    if part_number < 1 or part_number > MAX_PARTS:
+        raise HTTPException(status_code=400, detail="Invalid part number")
+
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        if not content_length.strip().isdigit():
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        if int(content_length) > session.chunk_size:
+            raise HTTPException(status_code=413, detail="Chunk larger than chunk_size")
+
+    body = await read_chunk(request, session.chunk_size)
+
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty chunk")
+
+    try:
+        etag = await run_in_threadpool(
+            upload_part,
+            key=session.object_key,
+            upload_id=session.multipart_upload_id,
+            part_number=part_number,
+            body=body,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Chunk upload failed: {str(e)}")
+
+    return await run_in_threadpool(record_chunk, db, session, part_number, etag, len(body))
+
+
+# ======================================================
+# 4️⃣ COMPLETE → creates the Evidence row
+# ======================================================
+@router.post("/{session_id}/complete", response_model=dict)
+def complete_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    session = get_open_session(db, session_id, current_user)
+    parts = session.parts
+
+    if not parts:
+        raise HTTPException(status_code=400, detail="No chunks uploaded")
+
+    numbers = [p.part_number for p in parts]
+    if numbers != list(range(1, len(parts) + 1)):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Missing chunks; resume from part {serialize_session(session)['next_part']}",
+        )
+
+    if any(p.size != session.chunk_size for p in parts[:-1]):
+        raise HTTPException(status_code=400, detail="Only the last chunk may be smaller than chunk_size")
+
+    received = sum(p.size for p in parts)
+    if session.total_size is not None and received != session.total_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Received {received} bytes, expected {session.total_size}",
+        )
+
+    reserve_upload(db, current_user, received, stored=not session.is_anonymous)
+
+    # Re-check: the vault entry or entity may have changed since the session began
+    entity_id, is_public = resolve_evidence_target(
+        db,
+        current_user,
+        entity_id=session.entity_id,
+        vault_entry_id=session.vault_entry_id,
+        is_public=session.is_public,
+    )
+
+    try:
+        complete_multipart_upload(
+            key=session.object_key,
+            upload_id=session.multipart_upload_id,
+            parts=[(p.part_number, p.etag) for p in parts],
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not finalize upload: {str(e)}")
+
+    evidence = Evidence(
+        blob_url=public_url_for_key(session.object_key),
+        byte_size=received,
+        mime_type=session.content_type,
+        description=session.description,
+        tags=session.tags,
+        location=session.location,
+        is_public=is_public,
+        is_anonymous=session.is_anonymous,
+        entity_id=entity_id,
+        vault_entry_id=session.vault_entry_id,
+        user_id=None if session.is_anonymous else current_user.id,
+    )
+
+    db.add(evidence)
+    db.flush()
+    index_evidence_tags(db, evidence)
+    enqueue_processing_for(db, evidence, session.content_type)
+
+    session.status = "completed"
+    session.evidence_id = evidence.id
+
+    # Part bookkeeping is no longer needed
+    session.parts.clear()
+
+    db.commit()
+    db.refresh(evidence)
+
+    return {
+        "id": evidence.id,
+        "blob_url": evidence_url(evidence.blob_url, evidence.is_public),
+        "created_at": evidence.timestamp,
+    }
+
+
+# ======================================================
+# 5️⃣ CANCEL SESSION
+# ======================================================
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    session = get_open_session(db, session_id, current_user)
+
+    try:
+        abort_multipart_upload(
+            key=session.object_key,
+            upload_id=session.multipart_upload_id,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Could not cancel upload: {str(e)}")
+
+    session.status = "aborted"
+    session.parts.clear()
+    db.commit()
+    return
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional, List
@@ -7,8 +8,12 @@ from datetime import datetime, timezone
 from db import get_db
 from models.vault_entry import VaultEntry
 from models.evidence import Evidence
-from models.user import User
-from utils.auth import get_current_user
+from utils.auth import get_current_user, Principal
+from utils.evidence_store import release_evidence_blob
+from utils.evidence_tags import unindex_evidence_tags
+from utils.quotas import record_evidence_deleted
+from utils.blob_utils import key_for_url
+from utils.zip_export import stream_zip
 from schemas.evidence import EvidenceOut
 from schemas.vault_entry import VaultEntryCreate, VaultEntryUpdate
 
@@ -24,7 +29,7 @@ router = APIRouter(
 def create_vault_entry(
     payload: VaultEntryCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if not payload.testimony or not payload.testimony.strip():
         raise HTTPException(status_code=400, detail="Testimony is required")
@@ -58,7 +63,7 @@ def create_vault_entry(
 @router.get("/mine", response_model=list[dict])
 def get_my_vault_entries(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     entries = (
         db.query(VaultEntry)
@@ -105,7 +110,7 @@ def toggle_vault_entry_visibility(
     entry_id: int,
     make_public: bool,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     entry = db.query(VaultEntry).filter(VaultEntry.id == entry_id).first()
 
@@ -162,7 +167,7 @@ def public_vault_feed(
 def get_vault_entry_evidence(
     entry_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     entry = db.query(VaultEntry).filter(VaultEntry.id == entry_id).first()
 
@@ -181,6 +186,77 @@ def get_vault_entry_evidence(
 
     return evidence_items
 
+# ======================================================
+# 5️⃣b EXPORT ENTRY AS ZIP (OWNER / ADMIN)
+# Evidence files + manifest.json, streamed as it is built
+# ======================================================
+@router.get("/{entry_id}/export")
+def export_vault_entry(
+    entry_id: int,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    entry = db.query(VaultEntry).filter(VaultEntry.id == entry_id).first()
+
+    if not entry:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    if entry.user_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    evidence_items = (
+        db.query(Evidence)
+        .filter(Evidence.vault_entry_id == entry_id)
+        .order_by(Evidence.timestamp.asc())
+        .all()
+    )
+
+    # Everything the stream needs is copied out now; the DB session is
+    # closed before the response body is produced.
+    manifest = {
+        "vault_entry": {
+            "id": entry.id,
+            "testimony": entry.testimony,
+            "incident_date": entry.incident_date,
+            "location": entry.location,
+            "category": entry.category,
+            "entity": entry.entity.name if entry.entity else None,
+            "created_at": entry.created_at,
+        },
+        "exported_at": datetime.now(timezone.utc),
+        "evidence": [
+            {
+                "id": e.id,
+                "description": e.description,
+                "tags": e.tags,
+                "location": e.location,
+                "uploaded_at": e.timestamp,
+                "sha256": e.content_sha256,
+                "byte_size": e.byte_size,
+                "mime_type": e.mime_type,
+                "captured_at": e.captured_at,
+                "gps_latitude": e.gps_latitude,
+                "gps_longitude": e.gps_longitude,
+                "duration_seconds": e.duration_seconds,
+                "source_url": e.blob_url,
+            }
+            for e in evidence_items
+        ],
+    }
+
+    items = [
+        {"id": e.id, "key": key_for_url(e.blob_url), "mime_type": e.mime_type}
+        for e in evidence_items
+    ]
+
+    return StreamingResponse(
+        stream_zip(manifest, items),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="vault-entry-{entry.id}.zip"',
+        },
+    )
+
 # ======================================================
 # 6️⃣ UPDATE VAULT ENTRY (JSON BODY – FIXED)
 # ======================================================
@@ -189,7 +265,7 @@ def update_vault_entry(
     entry_id: int,
     payload: VaultEntryUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     entry = db.query(VaultEntry).filter(VaultEntry.id == entry_id).first()
 
@@ -222,7 +298,7 @@ def update_vault_entry(
 def delete_vault_entry_admin(
     entry_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
@@ -232,9 +308,18 @@ def delete_vault_entry_admin(
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
 
-    db.query(Evidence).filter(
-        Evidence.vault_entry_id == entry_id
-    ).delete()
+    evidence_items = (
+        db.query(Evidence)
+        .filter(Evidence.vault_entry_id == entry_id)
+        .all()
+    )
+
+    # Row-by-row so shared stored objects keep correct reference counts
+    for evidence in evidence_items:
+        release_evidence_blob(db, evidence)
+        unindex_evidence_tags(db, evidence)
+        record_evidence_deleted(db, evidence)
+        db.delete(evidence)
 
     db.delete(entry)
     db.commit()
@@ -244,7 +329,7 @@ def delete_vault_entry_admin(
 @router.get("/admin/all", response_model=list[dict])
 def admin_get_all_vault_entries(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
@@ -275,7 +360,7 @@ def admin_get_all_vault_entries(
 @router.get("/admin/text-only", response_model=list[dict])
 def admin_get_text_only_testimonies(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin only")
@@ -1,8 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from typing import Optional
 from datetime import datetime
 from schemas.user_public import PublicUserOut
 from schemas.rating_schemas import RatedEntityOut
+from utils.signed_urls import evidence_urls
 
 
 # ======================================================
@@ -25,9 +26,106 @@ class EvidenceOut(EvidenceCreate):
     id: int
     timestamp: datetime
 
+    # Standalone and vault evidence have no entity
+    entity_id: Optional[int] = None
+
+    # 🖼 Resized image URLs (thumb / card / full), once processed
+    variants: Optional[dict] = None
+
+    # 🎞 Video playback (HLS) once transcoded
+    processing_status: Optional[str] = None
+    hls_url: Optional[str] = None
+    poster_url: Optional[str] = None
+
+    # 🔍 File metadata (capture time / GPS stay admin-only, see admin evidence list)
+    byte_size: Optional[int] = None
+    mime_type: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration_seconds: Optional[float] = None
+
     # ✅ THESE MUST BE TOP-LEVEL FIELDS
     user: Optional[PublicUserOut]
     entity: Optional[RatedEntityOut]
 
+    # 🔐 Private evidence is only reachable through expiring signed URLs
+    @model_validator(mode="after")
+    def sign_urls(self):
+        for field, value in evidence_urls(self).items():
+            setattr(self, field, value)
+        return self
+
     class Config:
         from_attributes = True
+
+
+# ======================================================
+# Tags
+# ======================================================
+class EvidencePage(BaseModel):
+    items: list[EvidenceOut]
+    next_cursor: Optional[int] = None
+
+
+class TagCountOut(BaseModel):
+    tag: str
+    evidence_count: int
+
+    class Config:
+        from_attributes = True
+
+
+# ======================================================
+# Direct-to-storage upload (presign → PUT → confirm)
+# ======================================================
+class PresignedUploadRequest(BaseModel):
+    filename: str
+    content_type: str = "application/octet-stream"
+    entity_id: Optional[int] = None
+    vault_entry_id: Optional[int] = None
+    description: Optional[str] = None
+    tags: Optional[str] = None
+    location: Optional[str] = None
+    is_public: bool = True
+    is_anonymous: bool = False
+
+
+class PresignedUploadOut(BaseModel):
+    upload_url: str
+    method: str = "PUT"
+    headers: dict[str, str]
+    object_key: str
+    upload_token: str
+    expires_in: int
+
+
+class ConfirmUploadRequest(BaseModel):
+    upload_token: str
+
+
+# ======================================================
+# Resumable upload sessions (create → PUT chunks → complete)
+# ======================================================
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str = "application/octet-stream"
+    total_size: Optional[int] = None
+    entity_id: Optional[int] = None
+    vault_entry_id: Optional[int] = None
+    description: Optional[str] = None
+    tags: Optional[str] = None
+    location: Optional[str] = None
+    is_public: bool = True
+    is_anonymous: bool = False
+
+
+class UploadSessionOut(BaseModel):
+    id: str
+    status: str
+    chunk_size: int
+    total_size: Optional[int] = None
+    received_parts: list[int] = []
+    received_bytes: int = 0
+    next_part: int = 1
+    expires_at: datetime
+    evidence_id: Optional[int] = None
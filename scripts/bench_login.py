@@ -0,0 +1,111 @@
+"""
+Benchmark password verification throughput under concurrent logins.
+
+    python scripts/bench_login.py --threads 32 --logins 400
+    python scripts/bench_login.py --url http://127.0.0.1:8000 \
+        --identifier someone@example.com --password secret
+
+Without --url, compares bcrypt inline in the request threads (the old
+behaviour) with the process pool from utils/password_hashing.py. With
+--url, fires POST /auth/login at a running server and reports status codes.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32, help="concurrent logins")
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--identifier", default="bench@example.com")
+    parser.add_argument("--password", default="correct horse battery staple")
+    return parser.parse_args()
+
+
+def run(label: str, fn, threads: int, logins: int):
+    latencies = []
+    outcomes = Counter()
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            outcomes[fn()] += 1
+        except Exception as e:
+            outcomes[type(e).__name__] += 1
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(one, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{label:<20} {logins / elapsed:>9.1f} {statistics.median(latencies) * 1000:>9.0f}"
+        f" {p95 * 1000:>9.0f}  {dict(outcomes)}"
+    )
+
+
+def bench_local(args):
+    # utils.password_hashing reads its settings at import time
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ.setdefault("PASSWORD_HASH_MAX_PENDING", str(args.logins))
+
+    from utils import password_hashing
+
+    hashed = password_hashing.pwd_context.hash(args.password)
+
+    # Start the workers before timing
+    password_hashing.verify_password(args.password, hashed)
+
+    run(
+        "inline (threads)",
+        lambda: password_hashing._verify(args.password, hashed),
+        args.threads,
+        args.logins,
+    )
+    run(
+        f"pool ({args.workers} procs)",
+        lambda: password_hashing.verify_password(args.password, hashed),
+        args.threads,
+        args.logins,
+    )
+
+    password_hashing.shutdown_pool()
+
+
+def bench_http(args):
+    import requests
+
+    session = requests.Session()
+    payload = {"identifier": args.identifier, "password": args.password}
+
+    def login():
+        return session.post(f"{args.url.rstrip('/')}/auth/login", json=payload, timeout=60).status_code
+
+    run("POST /auth/login", login, args.threads, args.logins)
+
+
+def main():
+    args = parse_args()
+
+    print(f"{'mode':<20} {'logins/s':>9} {'p50 ms':>9} {'p95 ms':>9}  outcomes")
+    if args.url:
+        bench_http(args)
+    else:
+        bench_local(args)
+
+
+if __name__ == "__main__":
+    main()
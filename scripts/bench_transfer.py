@@ -0,0 +1,85 @@
+"""
+Benchmark evidence uploads against a local S3-compatible server.
+
+    # moto:  pip install "moto[server]" && moto_server -p 5000
+    # MinIO: docker run -p 9000:9000 minio/minio server /data
+    python scripts/bench_transfer.py --endpoint http://127.0.0.1:5000 --size-mb 300
+
+Compares boto3's default TransferConfig with the tuned one from
+utils/storage.py and a few chunk size / concurrency combinations.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoint", default="http://127.0.0.1:5000")
+    parser.add_argument("--bucket", default="ares-bench")
+    parser.add_argument("--key-id", default="testing")
+    parser.add_argument("--secret", default="testing")
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=3)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # utils.storage reads its settings at import time
+    os.environ["STORAGE_BACKEND"] = "b2"
+    os.environ["B2_ENDPOINT_URL"] = args.endpoint
+    os.environ["B2_KEY_ID"] = args.key_id
+    os.environ["B2_APPLICATION_KEY"] = args.secret
+    os.environ["B2_BUCKET_NAME"] = args.bucket
+
+    from boto3.s3.transfer import TransferConfig
+    from utils.storage import get_storage, MB
+
+    storage = get_storage()
+    client = storage.client
+
+    try:
+        client.create_bucket(Bucket=args.bucket)
+    except Exception:
+        pass  # already exists
+
+    configs = {
+        "boto3 default": TransferConfig(),
+        "tuned (env)": storage.transfer_config,
+        "8MB x 4": TransferConfig(multipart_chunksize=8 * MB, max_concurrency=4),
+        "16MB x 16": TransferConfig(multipart_chunksize=16 * MB, max_concurrency=16),
+        "64MB x 8": TransferConfig(multipart_chunksize=64 * MB, max_concurrency=8),
+    }
+
+    with tempfile.TemporaryFile() as f:
+        chunk = os.urandom(MB)
+        for _ in range(args.size_mb):
+            f.write(chunk)
+
+        print(f"{'config':<16} {'best s':>8} {'MB/s':>8}")
+
+        for name, config in configs.items():
+            timings = []
+            for run in range(args.runs):
+                f.seek(0)
+                started = time.perf_counter()
+                client.upload_fileobj(
+                    Fileobj=f,
+                    Bucket=args.bucket,
+                    Key=f"bench/{run}.bin",
+                    Config=config,
+                )
+                timings.append(time.perf_counter() - started)
+
+            best = min(timings)
+            print(f"{name:<16} {best:>8.2f} {args.size_mb / best:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Runs the app against a throwaway SQLite database and local storage.
+
+    python -m pytest -q
+"""
+import os
+import sys
+import tempfile
+from datetime import timezone
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+_tmp = tempfile.mkdtemp(prefix="ares-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/test.db",
+    "STORAGE_BACKEND": "local",
+    "STORAGE_LOCAL_ROOT": os.path.join(_tmp, "storage"),
+    "PASSWORD_HASH_WORKERS": "0",
+    "BCRYPT_ROUNDS": "4",
+})
+
+# SQLite stand-ins for the Postgres-only bits the models use
+from sqlalchemy.dialects.postgresql import ARRAY  # noqa: E402
+from sqlalchemy.dialects.sqlite import base as sqlite_base  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(ARRAY, "sqlite")
+def _array_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+_datetime_result = sqlite_base.DATETIME.result_processor
+
+
+def _aware_datetime_result(self, dialect, coltype):
+    """
+    SQLite drops tzinfo; hand back UTC-aware values like Postgres does.
+    """
+
+    process = _datetime_result(self, dialect, coltype)
+
+    def convert(value):
+        value = process(value) if process else value
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+    return convert
+
+
+sqlite_base.DATETIME.result_processor = _aware_datetime_result
+
+
+@pytest.fixture
+def db():
+    import models  # noqa: F401
+    from db import Base, SessionLocal, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def storage():
+    import shutil
+
+    from utils.storage import get_storage
+
+    backend = get_storage()
+    shutil.rmtree(backend.root, ignore_errors=True)
+    os.makedirs(backend.root)
+    return backend
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    import main
+    from utils import auth
+
+    with auth._principals_lock:
+        auth._principals.clear()
+        auth._token_floors.clear()
+
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def make_user(db):
+    from models.user import User
+    from utils.auth import hash_password
+
+    def make(username: str, role: str = "public", password: str = "pw"):
+        user = User(
+            username=username,
+            email=f"{username}@example.com",
+            hashed_password=hash_password(password),
+            role=role,
+            is_email_verified=True,
+        )
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+def login(client, username: str, password: str = "pw") -> dict:
+    response = client.post("/auth/login", json={"identifier": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,33 @@
+from conftest import login
+
+
+def test_relogin_after_bump_on_another_worker_is_accepted(client, db, make_user):
+    user = make_user("alice")
+    old = login(client, "alice")
+
+    # Warm this worker's principal cache at version 0
+    assert client.get("/auth/me", headers=old).status_code == 200
+
+    # Another worker bumps the version (password reset...), so this
+    # process's cache is not invalidated
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+
+    new = login(client, "alice")
+    assert client.get("/auth/me", headers=new).status_code == 200
+
+    # The reload also catches the revoked token
+    assert client.get("/auth/me", headers=old).status_code == 401
+
+
+def test_claims_only_guard_accepts_newer_token_with_warm_cache(client, db, make_user):
+    user = make_user("root", role="admin")
+    old = login(client, "root")
+    assert client.get("/admin/counts", headers=old).status_code == 200
+
+    user.token_version = (user.token_version or 0) + 1
+    db.commit()
+
+    new = login(client, "root")
+    assert client.get("/admin/counts", headers=new).status_code == 200
+    assert client.get("/admin/counts", headers=old).status_code == 401
@@ -0,0 +1,59 @@
+from models.evidence import Evidence
+from models.rating import RatedEntity
+from models.vault_entry import VaultEntry
+from utils.evidence_tags import index_evidence_tags
+
+
+def add_evidence(db, **fields):
+    evidence = Evidence(
+        blob_url="http://localhost:8000/local-storage/evidence/x.jpg",
+        tags="bodycam",
+        is_public=True,
+        **fields,
+    )
+    db.add(evidence)
+    db.flush()
+    index_evidence_tags(db, evidence)
+    db.commit()
+    return evidence
+
+
+def add_entity(db, approval_status):
+    entity = RatedEntity(
+        name="Dept", type="agency", category="police", state="TX", county="Travis",
+        approval_status=approval_status,
+    )
+    db.add(entity)
+    db.commit()
+    return entity
+
+
+def search(client, tags="bodycam"):
+    response = client.get("/vault/tags/search", params={"tags": tags})
+    assert response.status_code == 200, response.text
+    return {item["id"] for item in response.json()["items"]}
+
+
+def test_standalone_evidence_is_found(client, db):
+    standalone = add_evidence(db)
+
+    response = client.get("/vault/tags/search", params={"tags": "bodycam"})
+    assert response.status_code == 200, response.text
+    [item] = response.json()["items"]
+    assert item["id"] == standalone.id
+    assert item["entity_id"] is None
+
+
+def test_hidden_parents_are_filtered(client, db, make_user):
+    owner = make_user("owner")
+    approved = add_evidence(db, entity_id=add_entity(db, "approved").id)
+    add_evidence(db, entity_id=add_entity(db, "under_review").id)
+
+    private_entry = VaultEntry(user_id=owner.id, testimony="t", is_public=False)
+    public_entry = VaultEntry(user_id=owner.id, testimony="t", is_public=True)
+    db.add_all([private_entry, public_entry])
+    db.commit()
+    add_evidence(db, vault_entry_id=private_entry.id)
+    in_public_entry = add_evidence(db, vault_entry_id=public_entry.id)
+
+    assert search(client) == {approved.id, in_public_entry.id}
@@ -0,0 +1,16 @@
+from conftest import login
+
+
+def test_upload_stores_file_and_returns_url(client, make_user, storage):
+    make_user("alice")
+    headers = login(client, "alice")
+
+    response = client.post(
+        "/vault",
+        headers=headers,
+        files={"file": ("photo.jpg", b"\xff\xd8\xff\xe0not really a jpeg", "image/jpeg")},
+        data={"tags": "bodycam"},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["id"]
@@ -0,0 +1,32 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from main import LocalStorageFiles
+
+
+def test_local_store_is_not_served_by_default(client, storage):
+    os.makedirs(os.path.join(storage.root, "evidence"), exist_ok=True)
+    with open(os.path.join(storage.root, "evidence", "private.jpg"), "wb") as f:
+        f.write(b"secret")
+
+    assert client.get("/local-storage/evidence/private.jpg").status_code == 404
+
+
+def test_dev_mount_hides_multipart_parts_and_sidecars(storage):
+    os.makedirs(os.path.join(storage.root, ".multipart", "abc"))
+    with open(os.path.join(storage.root, ".multipart", "abc", "00001"), "wb") as f:
+        f.write(b"part")
+    os.makedirs(os.path.join(storage.root, "evidence"))
+    for name in ("a.jpg", "a.jpg.content-type"):
+        with open(os.path.join(storage.root, "evidence", name), "w") as f:
+            f.write("x")
+
+    app = FastAPI()
+    app.mount("/local-storage", LocalStorageFiles(directory=storage.root))
+    dev = TestClient(app)
+
+    assert dev.get("/local-storage/evidence/a.jpg").status_code == 200
+    assert dev.get("/local-storage/evidence/a.jpg.content-type").status_code == 404
+    assert dev.get("/local-storage/.multipart/abc/00001").status_code == 404
@@ -0,0 +1,59 @@
+import io
+import os
+import time
+
+from jobs import orphan_blobs
+from models.stored_blob import StoredBlob
+from utils.blob_utils import head_object, upload_file_to_b2
+
+
+def put_old_object(storage, key: str, data: bytes = b"evidence"):
+    upload_file_to_b2(file_obj=io.BytesIO(data), original_filename=key, content_type="image/jpeg", key=key)
+    week_ago = time.time() - 7 * 24 * 3600
+    os.utime(storage.path_for(key), (week_ago, week_ago))
+
+
+def test_sweeps_plain_orphans(db, storage):
+    put_old_object(storage, "evidence/sha256/aaa.jpg")
+
+    report = orphan_blobs.sweep_orphan_blobs(db)
+
+    assert report["deleted"] == 1
+    assert head_object("evidence/sha256/aaa.jpg") is None
+
+
+def test_reupload_after_snapshot_is_not_deleted(db, storage, monkeypatch):
+    key = "evidence/sha256/bbb.jpg"
+    put_old_object(storage, key)
+    real_list_blobs = orphan_blobs.list_blobs
+
+    def list_then_reupload(prefix):
+        # The same bytes arrive again between the listing and the delete
+        yield from real_list_blobs(prefix)
+        upload_file_to_b2(file_obj=io.BytesIO(b"evidence"), original_filename=key, content_type="image/jpeg", key=key)
+
+    monkeypatch.setattr(orphan_blobs, "list_blobs", list_then_reupload)
+
+    report = orphan_blobs.sweep_orphan_blobs(db)
+
+    assert report["orphans"] == 1
+    assert report["deleted"] == 0
+    assert head_object(key) is not None
+
+
+def test_reference_recorded_after_snapshot_is_not_deleted(db, storage, monkeypatch):
+    key = "evidence/sha256/ccc.jpg"
+    put_old_object(storage, key)
+    real_list_blobs = orphan_blobs.list_blobs
+
+    def list_then_reference(prefix):
+        yield from real_list_blobs(prefix)
+        db.add(StoredBlob(sha256="c" * 64, object_key=key, blob_url=key, ref_count=1))
+        db.commit()
+
+    monkeypatch.setattr(orphan_blobs, "list_blobs", list_then_reference)
+
+    report = orphan_blobs.sweep_orphan_blobs(db)
+
+    assert report["deleted"] == 0
+    assert head_object(key) is not None
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from conftest import login
+from routes.upload_sessions import read_chunk
+
+
+def start_session(client, headers):
+    response = client.post("/vault/uploads/sessions", headers=headers, json={"filename": "clip.mp4"})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_chunk_upload_roundtrip(client, make_user, storage):
+    make_user("alice")
+    headers = login(client, "alice")
+    session = start_session(client, headers)
+
+    response = client.put(f"/vault/uploads/sessions/{session['id']}/chunks/1", headers=headers, content=b"x" * 1024)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["received_parts"] == [1]
+    assert response.json()["next_part"] == 2
+
+
+def test_chunked_body_over_chunk_size_is_rejected(client, make_user, storage):
+    make_user("alice")
+    headers = login(client, "alice")
+    session = start_session(client, headers)
+    chunk_size = session["chunk_size"]
+
+    def body():
+        # No Content-Length: sent with Transfer-Encoding: chunked
+        for _ in range(chunk_size // (1024 * 1024) + 1):
+            yield b"x" * (1024 * 1024)
+
+    response = client.put(f"/vault/uploads/sessions/{session['id']}/chunks/1", headers=headers, content=body())
+    assert response.status_code == 413
+
+    status = client.get(f"/vault/uploads/sessions/{session['id']}", headers=headers).json()
+    assert status["received_parts"] == []
+
+
+def test_malformed_content_length_is_rejected(client, make_user, storage):
+    make_user("alice")
+    headers = login(client, "alice")
+    session = start_session(client, headers)
+
+    response = client.put(
+        f"/vault/uploads/sessions/{session['id']}/chunks/1",
+        headers={**headers, "Content-Length": "abc"},
+        content=b"x",
+    )
+    assert response.status_code == 400
+
+
+def test_read_chunk_stops_at_the_limit():
+    received = []
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": b"x" * 1024, "more_body": len(received) < 100}
+
+    request = Request({"type": "http", "method": "PUT", "headers": []}, receive)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_chunk(request, 4 * 1024))
+
+    assert exc.value.status_code == 413
+    assert len(received) == 5
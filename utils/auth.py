@@ -1,16 +1,23 @@
 import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import or_
 
-from models.user import User
+from models.user import User, normalize_identifier
 from db import get_db
+from utils import metrics
+
+# Hashing & verification (bcrypt runs in a process pool)
+from utils.password_hashing import hash_password, verify_password, verify_and_rehash  # noqa: F401
 
 # -------------------------------
 # Config
@@ -19,25 +26,33 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your_fallback_dev_key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Authenticated-user cache (per process). Changes made through this
+# process invalidate immediately; other workers see them within the TTL.
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+
+# Token-version floors remembered per process (see revoke_tokens_below)
+TOKEN_FLOOR_CACHE_SIZE = int(os.getenv("TOKEN_FLOOR_CACHE_SIZE", 10000))
+
+# Set to share token-version floors between workers (needs the `redis`
+# package). Without it, claims-only guards check the principal cache and
+# load the account on a miss, so a revoked token keeps working on other
+# workers for at most PRINCIPAL_CACHE_TTL_SECONDS.
+TOKEN_FLOOR_REDIS_URL = os.getenv("TOKEN_FLOOR_REDIS_URL")
+
 # -------------------------------
 # Security & OAuth2
 # -------------------------------
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-# -------------------------------
-# Hashing & Verification
-# -------------------------------
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 # -------------------------------
 # JWT Token Creation
 # -------------------------------
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """
+    data: {"sub": user id, "role": role, "tv": token version}. Bumping
+    User.token_version invalidates every token issued before.
+    """
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
@@ -47,22 +62,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 # Authenticate User
 # (EMAIL OR USERNAME — CASE INSENSITIVE)
 # -------------------------------
-def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
-    identifier = identifier.lower().strip()
+def find_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
+    """
+    One query, one unique-index probe per column.
+    """
+    identifier = normalize_identifier(identifier)
 
-    user = db.query(User).filter(
+    return db.query(User).filter(
         or_(
-            func.lower(User.email) == identifier,
-            func.lower(User.username) == identifier
+            User.email_normalized == identifier,
+            User.username_normalized == identifier
         )
     ).first()
 
+def authenticate_user(db: Session, identifier: str, password: str) -> Optional[User]:
+    user = find_user_by_identifier(db, identifier)
+
     if not user:
         return None
 
-    if not verify_password(password, user.hashed_password):
+    ok, new_hash = verify_and_rehash(password, user.hashed_password)
+    if not ok:
         return None
 
+    # Cost factor changed since this hash was made
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+
     if not user.is_email_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -72,37 +99,291 @@ def authenticate_user(db: Session, identifier: str, password: str) -> Optional[U
     return user
 
 # -------------------------------
-# Decode Token and Get User
+# Principal cache
 # -------------------------------
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+@dataclass(frozen=True)
+class Principal:
+    """
+    Read-only snapshot of the fields endpoints use from the current user.
+    Not attached to a session: load the User row to change it.
+    """
+
+    id: int
+    username: str
+    email: str
+    role: str
+    is_verified: bool
+    is_email_verified: bool
+    is_anonymous: bool
+    token_version: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            is_verified=bool(user.is_verified),
+            is_email_verified=bool(user.is_email_verified),
+            is_anonymous=bool(user.is_anonymous),
+            token_version=user.token_version or 0,
+        )
+
+
+_principals = OrderedDict()  # user_id -> (expires_at, Principal)
+_principals_lock = threading.Lock()
+
+
+def cached_principal(user_id: int) -> Optional[Principal]:
+    with _principals_lock:
+        entry = _principals.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _principals[user_id]
+            return None
+        _principals.move_to_end(user_id)
+        return entry[1]
+
+
+def cache_principal(principal: Principal):
+    with _principals_lock:
+        _principals[principal.id] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, principal)
+        _principals.move_to_end(principal.id)
+        while len(_principals) > PRINCIPAL_CACHE_SIZE:
+            _principals.popitem(last=False)
+
+
+def invalidate_principal(user_id: int):
+    """
+    Call after changing a user's role, password or verification state,
+    or deleting them.
+    """
+
+    with _principals_lock:
+        _principals.pop(user_id, None)
+
+
+_token_floors = OrderedDict()  # user_id -> lowest token version still accepted
+
+
+class RedisTokenFloors:
+    """
+    tokenfloor:<user id> -> lowest accepted version, kept only as long as
+    a token issued before it could still be unexpired.
+    """
+
+    # Never lowers a floor when two revocations race
+    RAISE_FLOOR = """
+    local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+    if tonumber(ARGV[1]) > current then
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    end
+    """
+
+    def __init__(self, url: str):
+        import redis  # optional dependency
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.errors = (redis.RedisError,)
+
+    def get(self, user_id: int) -> int:
+        return int(self.client.get(f"tokenfloor:{user_id}") or 0)
+
+    def raise_to(self, user_id: int, token_version: int):
+        self.client.eval(
+            self.RAISE_FLOOR, 1, f"tokenfloor:{user_id}",
+            token_version, ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+
+
+def make_shared_floors():
+    if TOKEN_FLOOR_REDIS_URL:
+        try:
+            return RedisTokenFloors(TOKEN_FLOOR_REDIS_URL)
+        except ImportError:
+            print("⚠️ TOKEN_FLOOR_REDIS_URL is set but redis is not installed; checking revocations against the database")
+    return None
+
+
+_shared_floors = make_shared_floors()
+
+
+def shared_token_floor(user_id: int) -> Optional[int]:
+    """
+    The floor every worker agrees on, or None when there is no shared
+    store (or it is unreachable) and the caller must ask the database.
+    """
+
+    if _shared_floors is None:
+        return None
+    try:
+        return _shared_floors.get(user_id)
+    except _shared_floors.errors as e:
+        metrics.incr("auth.token_floors.backend_errors")
+        print(f"⚠️ Token floor lookup failed, falling back to the database: {e}")
+        return None
+
+
+def revoke_tokens_below(user_id: int, token_version: int):
+    """
+    Rejects the user's tokens older than `token_version`: immediately in
+    this process and, with TOKEN_FLOOR_REDIS_URL, in every worker. Without
+    it other workers notice once their principal cache entry expires.
+    """
+
+    with _principals_lock:
+        _principals.pop(user_id, None)
+        _token_floors[user_id] = max(token_version, _token_floors.get(user_id, 0))
+        _token_floors.move_to_end(user_id)
+        while len(_token_floors) > TOKEN_FLOOR_CACHE_SIZE:
+            _token_floors.popitem(last=False)
+
+    if _shared_floors is not None:
+        try:
+            _shared_floors.raise_to(user_id, token_version)
+        except _shared_floors.errors as e:
+            metrics.incr("auth.token_floors.backend_errors")
+            print(f"⚠️ Could not share token floor for user {user_id}: {e}")
+
+
+def bump_token_version(user: User) -> int:
+    """
+    Invalidates the user's outstanding access tokens (role change, password
+    reset...). The caller commits, then calls revoke_tokens_below.
+    """
+
+    user.token_version = (user.token_version or 0) + 1
+    return user.token_version
+
+
+def token_version_floor(user_id: int) -> int:
+    with _principals_lock:
+        return _token_floors.get(user_id, 0)
+
+# -------------------------------
+# Decode Token
+# -------------------------------
+@dataclass(frozen=True)
+class TokenClaims:
+    """
+    What a verified access token says about its bearer.
+    """
+
+    id: int
+    role: str
+    token_version: int
+
+
+def credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def decode_access_token(token: str) -> TokenClaims:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(payload.get("sub"))
-        if user_id is None:
-            raise credentials_exception
-    except (JWTError, ValueError):
-        raise credentials_exception
+        claims = TokenClaims(
+            id=int(payload.get("sub")),
+            role=payload.get("role"),
+            token_version=int(payload.get("tv", 0)),
+        )
+    except (JWTError, TypeError, ValueError):
+        raise credentials_exception()
+
+    if claims.token_version < token_version_floor(claims.id):
+        metrics.incr("auth.tokens.stale_version")
+        raise credentials_exception()
+
+    return claims
+
+# -------------------------------
+# Current user (loads the account, cached)
+# -------------------------------
+def load_principal(db: Session, user_id: int, token_version: int = 0) -> Principal:
+    """
+    Cached principal, reloaded from the database when the token is newer
+    than the cached copy (re-login after a version bump on this or
+    another worker).
+    """
 
+    principal = cached_principal(user_id)
+    if principal is not None and principal.token_version >= token_version:
+        metrics.incr("auth.principal_cache.hits")
+        return principal
+
+    if principal is not None:
+        metrics.incr("auth.principal_cache.stale")
+        invalidate_principal(user_id)
+
+    metrics.incr("auth.principal_cache.misses")
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()  # deleted account
 
-    return user
+    principal = Principal.from_user(user)
+    cache_principal(principal)
+    return principal
+
+def check_token_version(claims: TokenClaims, principal: Principal):
+    """
+    Older tokens were revoked by a version bump. Newer than a freshly
+    loaded account means the version was never issued.
+    """
+
+    if claims.token_version != principal.token_version:
+        metrics.incr("auth.tokens.stale_version")
+        raise credentials_exception()
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    claims = decode_access_token(token)
+    principal = load_principal(db, claims.id, claims.token_version)
+    check_token_version(claims, principal)
+    return principal
+
+# -------------------------------
+# Current claims (no user row needed)
+# For read-only endpoints that only need the id and role.
+# Revocation is checked against the shared floor store when configured,
+# else against the principal cache (loading the account on a miss).
+# -------------------------------
+def get_current_claims(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    claims = decode_access_token(token)
+
+    floor = shared_token_floor(claims.id)
+    if floor is not None:
+        if claims.token_version < floor:
+            metrics.incr("auth.tokens.stale_version")
+            raise credentials_exception()
+
+        principal = cached_principal(claims.id)
+        if principal is not None and claims.token_version > principal.token_version:
+            # Issued after a bump this worker hasn't loaded yet
+            invalidate_principal(claims.id)
+        elif principal is not None and claims.token_version < principal.token_version:
+            metrics.incr("auth.tokens.stale_version")
+            raise credentials_exception()
+    else:
+        check_token_version(claims, load_principal(db, claims.id, claims.token_version))
+
+    metrics.incr("auth.claims_only")
+    return claims
 
 # -------------------------------
 # Role-based Access Dependency
 # -------------------------------
 def require_role(required_role: str):
-    def checker(current_user: User = Depends(get_current_user)):
+    def checker(current_user: Principal = Depends(get_current_user)):
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -111,5 +392,17 @@ def require_role(required_role: str):
         return current_user
     return checker
 
-def require_admin(current_user: User = Depends(get_current_user)):
+def require_admin(current_user: Principal = Depends(get_current_user)):
     return require_role("admin")(current_user)
+
+def require_role_claims(*roles: str):
+    def checker(claims: TokenClaims = Depends(get_current_claims)):
+        if claims.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Access denied: {' or '.join(roles)} role required"
+            )
+        return claims
+    return checker
+
+require_admin_claims = require_role_claims("admin")
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from models.auth_session import AuthSession
+from models.user import User
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+# A session unused for this long expires; each refresh pushes it out again
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+
+# Hard cap: sign in again after this long no matter how active
+SESSION_MAX_AGE_DAYS = int(os.getenv("SESSION_MAX_AGE_DAYS", 90))
+
+# Two tabs refreshing at once both present the same token; the loser
+# gets a 401 instead of having the whole session revoked as stolen
+REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", 10))
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def new_refresh_token():
+    token = secrets.token_urlsafe(48)
+    return token, hash_refresh_token(token)
+
+
+def session_expiry(created_at: datetime, now: datetime) -> datetime:
+    return min(
+        now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        created_at + timedelta(days=SESSION_MAX_AGE_DAYS),
+    )
+
+
+def invalid_refresh_token():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+    )
+
+
+# ======================================================
+# Lifecycle
+# ======================================================
+def create_session(db: Session, user: User, request: Request = None) -> str:
+    """
+    Starts a session for a user who just proved their password. Returns the
+    raw refresh token (only its hash is stored). The caller commits.
+    """
+
+    token, token_hash = new_refresh_token()
+    now = datetime.now(timezone.utc)
+
+    db.add(AuthSession(
+        user_id=user.id,
+        refresh_token_hash=token_hash,
+        user_agent=(request.headers.get("user-agent") or "")[:255] if request else None,
+        ip_address=request.client.host if request and request.client else None,
+        created_at=now,
+        last_used_at=now,
+        expires_at=session_expiry(now, now),
+    ))
+
+    metrics.incr("auth.sessions.created")
+    return token
+
+
+def rotate_session(db: Session, token: str):
+    """
+    Swaps a valid refresh token for a new one. Returns (session, new_token).
+    A token that was already rotated away revokes the session: either it
+    was stolen or the legitimate client is out of sync. Commits.
+    """
+
+    token_hash = hash_refresh_token(token)
+    now = datetime.now(timezone.utc)
+
+    session = (
+        db.query(AuthSession)
+        .filter(AuthSession.refresh_token_hash == token_hash)
+        .with_for_update()
+        .first()
+    )
+
+    if session is None:
+        reused = (
+            db.query(AuthSession)
+            .filter(AuthSession.previous_token_hash == token_hash)
+            .with_for_update()
+            .first()
+        )
+        if reused and reused.revoked_at is None:
+            if now - reused.last_used_at > timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS):
+                reused.revoked_at = now
+                reused.revoked_reason = "reuse"
+                db.commit()
+                metrics.incr("auth.sessions.reuse_detected")
+                print(f"⚠️ Refresh token reuse, revoked session {reused.id} (user {reused.user_id})")
+        raise invalid_refresh_token()
+
+    if session.revoked_at is not None or session.expires_at <= now:
+        raise invalid_refresh_token()
+
+    new_token, new_hash = new_refresh_token()
+    session.previous_token_hash = session.refresh_token_hash
+    session.refresh_token_hash = new_hash
+    session.last_used_at = now
+    session.expires_at = session_expiry(session.created_at, now)
+    db.commit()
+
+    metrics.incr("auth.sessions.refreshed")
+    return session, new_token
+
+
+def revoke_session(db: Session, token: str, reason: str = "logout") -> bool:
+    """
+    Revokes the session a refresh token belongs to. The caller commits.
+    """
+
+    updated = (
+        db.query(AuthSession)
+        .filter(
+            AuthSession.refresh_token_hash == hash_refresh_token(token),
+            AuthSession.revoked_at == None,
+        )
+        .update(
+            {AuthSession.revoked_at: datetime.now(timezone.utc), AuthSession.revoked_reason: reason},
+            synchronize_session=False,
+        )
+    )
+    return bool(updated)
+
+
+def revoke_user_sessions(db: Session, user_id: int, reason: str) -> int:
+    """
+    Revokes every active session of a user. The caller commits.
+    """
+
+    revoked = (
+        db.query(AuthSession)
+        .filter(AuthSession.user_id == user_id, AuthSession.revoked_at == None)
+        .update(
+            {AuthSession.revoked_at: datetime.now(timezone.utc), AuthSession.revoked_reason: reason},
+            synchronize_session=False,
+        )
+    )
+    metrics.incr("auth.sessions.revoked", revoked)
+    return revoked
@@ -1,42 +1,138 @@
 import os
-import boto3
 import uuid
 
-# Required environment variables (Render)
-B2_ENDPOINT_URL = os.getenv("B2_ENDPOINT_URL")        # https://s3.us-east-005.backblazeb2.com
-B2_KEY_ID = os.getenv("B2_KEY_ID")
-B2_APPLICATION_KEY = os.getenv("B2_APPLICATION_KEY")
-B2_BUCKET_NAME = os.getenv("B2_BUCKET_NAME")          # ares-evidence
+from utils.storage import get_storage, MB, DELETE_BATCH_SIZE  # noqa: F401  (re-exported)
 
-if not all([B2_ENDPOINT_URL, B2_KEY_ID, B2_APPLICATION_KEY, B2_BUCKET_NAME]):
-    raise RuntimeError("Missing Backblaze B2 environment variables")
+# How long a presigned direct-upload URL stays valid
+PRESIGNED_UPLOAD_EXPIRES_SECONDS = int(os.getenv("B2_PRESIGNED_UPLOAD_EXPIRES_SECONDS", 900))
 
-s3 = boto3.client(
-    "s3",
-    endpoint_url=B2_ENDPOINT_URL,
-    aws_access_key_id=B2_KEY_ID,
-    aws_secret_access_key=B2_APPLICATION_KEY,
-)
 
+# ======================================================
+# Keys & URLs
+# ======================================================
+def make_object_key(original_filename: str, folder: str = "evidence") -> str:
+    """
+    Builds a unique object key, keeping the original file extension.
+    """
+
+    ext = os.path.splitext(original_filename or "")[1]
+    return f"{folder}/{uuid.uuid4()}{ext}"
+
+
+def public_url_for_key(key: str) -> str:
+    return get_storage().public_url(key)
+
+
+def key_for_url(url: str):
+    """
+    Inverse of public_url_for_key. Returns None for URLs outside our storage.
+    """
+
+    return get_storage().key_for_url(url)
+
+
+# ======================================================
+# Objects
+# ======================================================
 def upload_file_to_b2(
     *,
     file_obj,
     original_filename: str,
     content_type: str,
     folder: str = "evidence",
+    key: str = None,
 ) -> str:
     """
-    Uploads a file stream to Backblaze B2 and returns the public file URL.
+    Uploads a file stream to the configured storage backend (B2 in
+    production) and returns the public file URL.
+    Pass `key` to choose the object key instead of a random one.
+    """
+
+    filename = key or make_object_key(original_filename, folder)
+
+    storage = get_storage()
+    storage.upload_fileobj(filename, file_obj, content_type)
+
+    return storage.public_url(filename)
+
+
+def supports_direct_upload() -> bool:
+    return get_storage().supports_direct_upload
+
+
+def generate_presigned_upload(
+    *,
+    key: str,
+    content_type: str,
+    expires_in: int = PRESIGNED_UPLOAD_EXPIRES_SECONDS,
+) -> str:
+    """
+    Returns a presigned PUT URL so the client can upload straight to B2.
+    The client must send the same Content-Type header that was signed.
+    """
+
+    return get_storage().presigned_put(key, content_type, expires_in)
+
+
+def head_object(key: str):
+    """
+    Returns the object's metadata, or None if it does not exist.
+    """
+
+    return get_storage().head(key)
+
+
+def download_to_file(key: str, file_obj):
+    get_storage().download_to_file(key, file_obj)
+    file_obj.seek(0)
+
+
+def iter_blob(key: str, start: int = 0, end: int = None):
+    """
+    Streams an object (or the inclusive byte range start..end) in chunks.
+    """
+
+    return get_storage().iter_object(key, start, end)
+
+
+def delete_blob(key: str):
+    get_storage().delete(key)
+
+
+def delete_blobs(keys: list) -> list:
+    """
+    Batch delete (at most DELETE_BATCH_SIZE keys). Returns the keys that failed.
+    """
+
+    return get_storage().delete_many(keys)
+
+
+def list_blobs(prefix: str = ""):
+    """
+    Yields {"Key", "Size", "LastModified"} for every object under `prefix`.
+    """
+
+    return get_storage().list_objects(prefix)
+
+
+# ======================================================
+# Multipart primitives (resumable uploads)
+# ======================================================
+def create_multipart_upload(*, key: str, content_type: str) -> str:
+    return get_storage().create_multipart_upload(key, content_type)
+
+
+def upload_part(*, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+    return get_storage().upload_part(key, upload_id, part_number, body)
+
+
+def complete_multipart_upload(*, key: str, upload_id: str, parts: list):
+    """
+    `parts` is a list of (part_number, etag) in ascending order.
     """
 
-    ext = os.path.splitext(original_filename)[1]
-    filename = f"{folder}/{uuid.uuid4()}{ext}"
+    get_storage().complete_multipart_upload(key, upload_id, parts)
 
-    s3.upload_fileobj(
-        Fileobj=file_obj,
-        Bucket=B2_BUCKET_NAME,
-        Key=filename,
-        ExtraArgs={"ContentType": content_type},
-    )
 
-    return f"{B2_ENDPOINT_URL}/{B2_BUCKET_NAME}/{filename}"
+def abort_multipart_upload(*, key: str, upload_id: str):
+    get_storage().abort_multipart_upload(key, upload_id)
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+
+from utils import metrics
+from utils.blob_utils import MB, download_to_file
+
+# ======================================================
+# Config
+# ======================================================
+CONTENT_CACHE_DIR = os.getenv(
+    "CONTENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ares-content-cache")
+)
+CONTENT_CACHE_MAX_BYTES = int(os.getenv("CONTENT_CACHE_MAX_MB", 2048)) * MB
+
+# Bigger objects are streamed straight from storage with ranged GETs;
+# filling the cache first would delay the first byte of a long video
+CONTENT_CACHE_MAX_OBJECT_BYTES = int(os.getenv("CONTENT_CACHE_MAX_OBJECT_MB", 64)) * MB
+
+
+class ContentCache:
+    """
+    Bounded on-disk LRU of storage objects.
+
+    Files are named after a hash of the object key; a hit bumps the file's
+    mtime, eviction removes the oldest mtimes first. State lives on disk
+    only, so several workers can share one directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_object_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_object_bytes = max_object_bytes
+
+        self._lock = threading.Lock()
+        self._fill_locks = {}
+        self._approx_bytes = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def cacheable(self, size: int) -> bool:
+        return size is not None and 0 < size <= self.max_object_bytes
+
+    def get(self, key: str):
+        """
+        Path of the cached copy (marked recently used), or None.
+        """
+
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def fetch(self, key: str) -> str:
+        """
+        Returns a local path for the object, downloading it on a miss.
+        Concurrent misses for one key in this process download it once.
+        """
+
+        path = self.get(key)
+        if path:
+            metrics.incr("storage.content_cache.hits")
+            return path
+
+        with self._lock:
+            fill_lock = self._fill_locks.setdefault(key, threading.Lock())
+
+        with fill_lock:
+            path = self.get(key)
+            if path:
+                metrics.incr("storage.content_cache.hits")
+                return path
+
+            metrics.incr("storage.content_cache.misses")
+            path = self.path_for(key)
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    download_to_file(key, f)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+        with self._lock:
+            self._fill_locks.pop(key, None)
+
+        self._added(os.path.getsize(path))
+        return path
+
+    def _added(self, size: int):
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._disk_usage()
+            else:
+                self._approx_bytes += size
+
+            if self._approx_bytes > self.max_bytes:
+                self._approx_bytes = self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # evicted by another worker
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _disk_usage(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> int:
+        """
+        Removes least recently used files until the cache is back under
+        90% of its budget (so a busy cache doesn't evict on every fill).
+        Returns the remaining size.
+        """
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            metrics.incr("storage.content_cache.evictions")
+
+        return total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_content_cache() -> ContentCache:
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ContentCache(
+                    CONTENT_CACHE_DIR,
+                    CONTENT_CACHE_MAX_BYTES,
+                    CONTENT_CACHE_MAX_OBJECT_BYTES,
+                )
+    return _cache
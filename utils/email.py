@@ -12,19 +12,57 @@ FROM_EMAIL = os.getenv("FROM_EMAIL", "support@aresjustice.com")
 RESEND_API_URL = "https://api.resend.com/emails"
 
 
+class PermanentEmailError(Exception):
+    """
+    Resend rejected the message itself (bad address, payload...);
+    retrying will not help.
+    """
+
+
 # ======================================================
-# Email Verification
+# Delivery (called by jobs/email_outbox.py, never inside a request)
 # ======================================================
 
-def send_verification_email(to_email: str, token: str):
+def deliver_email(payload: dict, idempotency_key: str = None):
     """
-    Sends a Constitution-themed email verification message via Resend.
-    Includes both HTML and plain-text versions to improve deliverability.
+    Sends one payload built below. The idempotency key makes a retry after
+    a timeout safe: Resend will not send the same message twice.
     """
 
     if not RESEND_API_KEY:
         raise RuntimeError("RESEND_API_KEY is not set")
 
+    headers = {
+        "Authorization": f"Bearer {RESEND_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
+
+    response = requests.post(
+        RESEND_API_URL,
+        headers=headers,
+        json=payload,
+        timeout=20,
+    )
+
+    if 400 <= response.status_code < 500 and response.status_code not in (408, 409, 429):
+        raise PermanentEmailError(f"{response.status_code}: {response.text[:500]}")
+
+    response.raise_for_status()
+    return response.json()
+
+
+# ======================================================
+# Email Verification
+# ======================================================
+
+def build_verification_email(to_email: str, token: str) -> dict:
+    """
+    Constitution-themed email verification message (Resend payload).
+    Includes both HTML and plain-text versions to improve deliverability.
+    """
+
     verify_link = f"{FRONTEND_URL}/verify-email?email={to_email}&token={token}"
 
     payload = {
@@ -116,33 +154,20 @@ def send_verification_email(to_email: str, token: str):
         """
     }
 
-    response = requests.post(
-        RESEND_API_URL,
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=20,
-    )
-
-    response.raise_for_status()
-    return response.json()
+    return payload
 
 
 # ======================================================
 # Password Reset
 # ======================================================
 
-def send_password_reset_email(to_email: str, token: str):
+def build_password_reset_email(to_email: str, token: str) -> dict:
     """
-    Sends a secure password reset email.
-    Token is NEVER stored in plaintext — only sent to the user.
+    Secure password reset email (Resend payload).
+    The token row only stores a hash. The raw token lives in the outbox
+    body until it is sent, dead-lettered or expired, then the body is dropped.
     """
 
-    if not RESEND_API_KEY:
-        raise RuntimeError("RESEND_API_KEY is not set")
-
     reset_link = f"{FRONTEND_URL}/reset-password?token={token}"
 
     payload = {
@@ -229,18 +254,7 @@ def send_password_reset_email(to_email: str, token: str):
         """
     }
 
-    response = requests.post(
-        RESEND_API_URL,
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=20,
-    )
-
-    response.raise_for_status()
-    return response.json()
+    return payload
 # --------------------------------------------------
 # 📧 ENTITY APPROVAL EMAIL
 # --------------------------------------------------
@@ -249,14 +263,11 @@ def send_password_reset_email(to_email: str, token: str):
 # 📧 ENTITY APPROVAL EMAIL
 # --------------------------------------------------
 
-def send_entity_approved_email(to_email: str, entity_name: str):
+def build_entity_approved_email(to_email: str, entity_name: str) -> dict:
     """
-    Sends an email notifying the user that their submitted entity was approved.
+    Email notifying the user that their submitted entity was approved.
     """
 
-    if not RESEND_API_KEY:
-        raise RuntimeError("RESEND_API_KEY is not set")
-
     payload = {
         "from": FROM_EMAIL,
         "to": [to_email],
@@ -320,15 +331,4 @@ def send_entity_approved_email(to_email: str, entity_name: str):
         """
     }
 
-    response = requests.post(
-        RESEND_API_URL,
-        headers={
-            "Authorization": f"Bearer {RESEND_API_KEY}",
-            "Content-Type": "application/json",
-        },
-        json=payload,
-        timeout=20,
-    )
-
-    response.raise_for_status()
-    return response.json()
+    return payload
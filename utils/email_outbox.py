@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from models.email_outbox import EmailOutbox
+from utils import metrics
+
+
+def enqueue_email(db: Session, kind: str, payload: dict, expires_at: datetime = None) -> EmailOutbox:
+    """
+    Queues a payload from utils/email.py. The caller commits, so the email
+    exists exactly when the change that triggered it does.
+
+    expires_at: when the one-time link in the body stops working. Such a
+    body is never sent after it, nor kept once the message is done.
+    """
+
+    message = EmailOutbox(
+        kind=kind,
+        to_email=", ".join(payload["to"]),
+        subject=payload.get("subject"),
+        payload=payload,
+        status="queued",
+        expires_at=expires_at,
+    )
+    db.add(message)
+    metrics.incr(f"email.outbox.{kind}.queued")
+    return message
+
+
+def scrub_payload(message: EmailOutbox):
+    """
+    Keeps only the envelope; links in the body carry one-time tokens.
+    """
+
+    message.payload = {"to": (message.payload or {}).get("to"), "subject": message.subject}
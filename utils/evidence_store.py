@@ -0,0 +1,290 @@
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from models.stored_blob import StoredBlob
+from utils import metrics
+from utils.blob_utils import upload_file_to_b2
+from utils.media_metadata import MetadataScanner
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files hashed / uploaded at once by a multi-file upload
+EVIDENCE_UPLOAD_CONCURRENCY = int(os.getenv("EVIDENCE_UPLOAD_CONCURRENCY", 4))
+
+
+# ======================================================
+# Content hashing
+# ======================================================
+def hash_file(file_obj, scanner: MetadataScanner = None):
+    """
+    Reads the (already spooled) upload once, returns (sha256 hex, size),
+    and rewinds it for the storage upload. Chunks are also fed to `scanner`.
+    """
+
+    digest = hashlib.sha256()
+    size = 0
+
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+        if scanner:
+            scanner.feed(chunk)
+    file_obj.seek(0)
+
+    return digest.hexdigest(), size
+
+
+def content_key(sha256: str, original_filename: str) -> str:
+    ext = os.path.splitext(original_filename or "")[1].lower()
+    return f"evidence/sha256/{sha256}{ext}"
+
+
+# ======================================================
+# Store (deduplicated)
+# ======================================================
+def scan_file(file_obj, content_type: str):
+    """
+    One read of the spooled upload: returns (sha256, size, metadata), where
+    metadata are Evidence column values (size, sniffed type, dimensions,
+    capture time...).
+    """
+
+    scanner = MetadataScanner()
+    sha256, size = hash_file(file_obj, scanner)
+    return sha256, size, scanner.result(content_type)
+
+
+def record_stored_blob(
+    db: Session,
+    *,
+    sha256: str,
+    key: str,
+    blob_url: str,
+    size: int,
+    content_type: str,
+    refs: int = 1,
+) -> str:
+    """
+    Inserts the StoredBlob row for freshly uploaded content holding `refs`
+    references, and returns the blob URL to use.
+
+    Another request may have stored the same content meanwhile; then its
+    row wins and gets the references (our object becomes an orphan for
+    the garbage collector if the extension, and so the key, differed).
+    """
+
+    savepoint = db.begin_nested()
+    try:
+        db.add(StoredBlob(
+            sha256=sha256,
+            object_key=key,
+            blob_url=blob_url,
+            byte_size=size,
+            content_type=content_type,
+            ref_count=refs,
+        ))
+        savepoint.commit()
+        return blob_url
+    except IntegrityError:
+        savepoint.rollback()
+        stored = (
+            db.query(StoredBlob)
+            .filter(StoredBlob.sha256 == sha256)
+            .with_for_update()
+            .one()
+        )
+        stored.ref_count += refs
+        return stored.blob_url
+
+
+def store_evidence_file(
+    db: Session,
+    *,
+    file_obj,
+    original_filename: str,
+    content_type: str,
+):
+    """
+    Stores the file once per unique content and returns
+    (blob_url, sha256, metadata) — see scan_file.
+
+    If the same bytes were uploaded before, the existing object is reused
+    and its reference count bumped; nothing is sent to B2. The caller commits.
+    """
+
+    sha256, size, metadata = scan_file(file_obj, content_type)
+
+    stored = (
+        db.query(StoredBlob)
+        .filter(StoredBlob.sha256 == sha256)
+        .with_for_update()
+        .first()
+    )
+
+    if stored:
+        stored.ref_count += 1
+        metrics.incr("storage.dedup.hits")
+        metrics.incr("storage.dedup.bytes_saved", size)
+        return stored.blob_url, sha256, metadata
+
+    key = content_key(sha256, original_filename)
+
+    blob_url = upload_file_to_b2(
+        file_obj=file_obj,
+        original_filename=original_filename,
+        content_type=content_type,
+        key=key,
+    )
+
+    blob_url = record_stored_blob(
+        db,
+        sha256=sha256,
+        key=key,
+        blob_url=blob_url,
+        size=size,
+        content_type=content_type,
+    )
+
+    metrics.incr("storage.dedup.misses")
+    return blob_url, sha256, metadata
+
+
+def _capture(fn, *args):
+    try:
+        return fn(*args)
+    except Exception as e:
+        return e
+
+
+def store_evidence_files(db: Session, files: list, concurrency: int = EVIDENCE_UPLOAD_CONCURRENCY) -> list:
+    """
+    Batch version of store_evidence_file for
+    files = [(file_obj, original_filename, content_type), ...].
+
+    Hashing and uploads of new content run on up to `concurrency` threads
+    (no DB access there); StoredBlob rows are locked only afterwards, so
+    no lock is held during network transfers.
+    Returns, per file, (blob_url, sha256, metadata) or the Exception that
+    made it fail — one bad file does not fail the others. The caller commits.
+    """
+
+    results = [None] * len(files)
+
+    def upload(sha):
+        file_obj, original_filename, content_type = files[by_sha[sha][0]]
+        key = content_key(sha, original_filename)
+        return key, upload_file_to_b2(
+            file_obj=file_obj,
+            original_filename=original_filename,
+            content_type=content_type,
+            key=key,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        scans = list(pool.map(lambda f: _capture(scan_file, f[0], f[2]), files))
+
+        # sha256 → indexes of the files with that content
+        by_sha = {}
+        for i, scan in enumerate(scans):
+            if isinstance(scan, Exception):
+                results[i] = scan
+            else:
+                by_sha.setdefault(scan[0], []).append(i)
+
+        if not by_sha:
+            return results
+
+        known = {
+            sha for (sha,) in
+            db.query(StoredBlob.sha256).filter(StoredBlob.sha256.in_(list(by_sha)))
+        }
+
+        # Each new content is uploaded once, from its first file
+        new_shas = [sha for sha in by_sha if sha not in known]
+        uploads = dict(zip(new_shas, pool.map(lambda sha: _capture(upload, sha), new_shas)))
+
+    locked = {
+        stored.sha256: stored
+        for stored in (
+            db.query(StoredBlob)
+            .filter(StoredBlob.sha256.in_(sorted(by_sha)))
+            .order_by(StoredBlob.sha256)  # consistent lock order
+            .with_for_update()
+            .all()
+        )
+    }
+
+    for sha, indexes in by_sha.items():
+        size = scans[indexes[0]][1]
+        stored = locked.get(sha)
+
+        if stored:
+            stored.ref_count += len(indexes)
+            blob_url = stored.blob_url
+            metrics.incr("storage.dedup.hits", len(indexes))
+            metrics.incr("storage.dedup.bytes_saved", size * len(indexes))
+        else:
+            # New content, or its last reference was released meanwhile
+            upload_result = uploads.get(sha) or _capture(upload, sha)
+            if isinstance(upload_result, Exception):
+                for i in indexes:
+                    results[i] = upload_result
+                continue
+
+            key, blob_url = upload_result
+            blob_url = record_stored_blob(
+                db,
+                sha256=sha,
+                key=key,
+                blob_url=blob_url,
+                size=size,
+                content_type=files[indexes[0]][2],
+                refs=len(indexes),
+            )
+            metrics.incr("storage.dedup.misses")
+            metrics.incr("storage.dedup.hits", len(indexes) - 1)
+
+        for i in indexes:
+            results[i] = (blob_url, sha, scans[i][2])
+
+    return results
+
+
+# ======================================================
+# Release (on evidence delete)
+# ======================================================
+def release_evidence_blob(db: Session, evidence: Evidence):
+    """
+    Drops one reference to the evidence's stored object. When the last
+    reference goes only the StoredBlob row is removed; the object itself
+    is left to jobs.orphan_blobs, so a delete that rolls back never loses
+    a file that is still referenced. Legacy evidence (no content hash) is
+    left alone. The caller commits.
+    """
+
+    if not evidence.content_sha256:
+        return
+
+    stored = (
+        db.query(StoredBlob)
+        .filter(StoredBlob.sha256 == evidence.content_sha256)
+        .with_for_update()
+        .first()
+    )
+
+    if not stored:
+        return
+
+    stored.ref_count -= 1
+
+    if stored.ref_count <= 0:
+        db.delete(stored)
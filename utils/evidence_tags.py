@@ -0,0 +1,111 @@
+import re
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from models.evidence_tag import EvidenceTag, TagCount
+
+MAX_TAG_LENGTH = 64
+MAX_TAGS_PER_EVIDENCE = 20
+
+
+def normalize_tag(raw: str):
+    """
+    " #BodyCam  Footage " → "bodycam footage". Returns None for empty tags.
+    """
+
+    tag = re.sub(r"\s+", " ", raw or "").strip().lstrip("#").strip().lower()
+    return tag[:MAX_TAG_LENGTH] or None
+
+
+def normalize_tags(raw: str) -> list:
+    """
+    Splits the comma-separated Evidence.tags string into unique normalized tags.
+    """
+
+    tags = []
+    for part in (raw or "").split(","):
+        tag = normalize_tag(part)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags[:MAX_TAGS_PER_EVIDENCE]
+
+
+def bump_tag_counts(db: Session, tags: list, delta: int):
+    for tag in sorted(tags):  # fixed order avoids deadlocks between uploads
+        updated = (
+            db.query(TagCount)
+            .filter(TagCount.tag == tag)
+            .update({TagCount.evidence_count: TagCount.evidence_count + delta})
+        )
+        if updated or delta < 0:
+            continue
+
+        # First use of this tag; another upload may be creating it too
+        savepoint = db.begin_nested()
+        try:
+            db.add(TagCount(tag=tag, evidence_count=delta))
+            savepoint.commit()
+        except IntegrityError:
+            savepoint.rollback()
+            (
+                db.query(TagCount)
+                .filter(TagCount.tag == tag)
+                .update({TagCount.evidence_count: TagCount.evidence_count + delta})
+            )
+
+
+def index_evidence_tags(db: Session, evidence: Evidence):
+    """
+    Writes the tag rows for a new (flushed) evidence row. The caller commits.
+    """
+
+    tags = normalize_tags(evidence.tags)
+    if not tags:
+        return
+
+    db.add_all(EvidenceTag(evidence_id=evidence.id, tag=tag) for tag in tags)
+
+    if evidence.is_public:
+        bump_tag_counts(db, tags, 1)
+
+
+def index_evidence_tags_many(db: Session, evidence_items: list):
+    """
+    index_evidence_tags for a batch of flushed rows: one insert for all tag
+    rows and one rollup update per distinct tag. The caller commits.
+    """
+
+    rows = []
+    public_counts = {}
+
+    for evidence in evidence_items:
+        tags = normalize_tags(evidence.tags)
+        rows.extend({"evidence_id": evidence.id, "tag": tag} for tag in tags)
+        if evidence.is_public:
+            for tag in tags:
+                public_counts[tag] = public_counts.get(tag, 0) + 1
+
+    if rows:
+        db.execute(insert(EvidenceTag), rows)
+
+    for tag, count in sorted(public_counts.items()):
+        bump_tag_counts(db, [tag], count)
+
+
+def unindex_evidence_tags(db: Session, evidence: Evidence):
+    """
+    Call before deleting an evidence row. The caller commits.
+    """
+
+    rows = db.query(EvidenceTag).filter(EvidenceTag.evidence_id == evidence.id).all()
+    if not rows:
+        return
+
+    if evidence.is_public:
+        bump_tag_counts(db, [row.tag for row in rows], -1)
+
+    for row in rows:
+        db.delete(row)
@@ -0,0 +1,201 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from db import SessionLocal
+from models.user import User, normalize_identifier
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+# Target false-positive rate (a false positive only costs one index lookup)
+AVAILABILITY_FILTER_FP_RATE = float(os.getenv("AVAILABILITY_FILTER_FP_RATE", 0.01))
+
+# Headroom over the current number of names before the filter is resized
+AVAILABILITY_FILTER_MIN_CAPACITY = int(os.getenv("AVAILABILITY_FILTER_MIN_CAPACITY", 100000))
+
+# Rebuilt periodically so names registered through other workers (and
+# deleted accounts) are picked up
+AVAILABILITY_FILTER_REBUILD_SECONDS = int(os.getenv("AVAILABILITY_FILTER_REBUILD_SECONDS", 600))
+
+
+class BloomFilter:
+    """
+    Fixed-size bit array with k probes derived from one sha256 digest
+    (double hashing). "No" is definite, "maybe" needs a real lookup.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(round(self.num_bits / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str):
+        digest = hashlib.sha256(value.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, value: str):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+# ======================================================
+# Registered names
+# Emails and usernames share one filter, prefixed by kind
+# ======================================================
+_filter = None
+_built_at = 0.0
+_added_during_build = None  # names signed up while a rebuild scans the table
+_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+
+
+def _key(kind: str, value: str) -> str:
+    return f"{kind}:{value}"
+
+
+def build_identifier_filter(db: Session) -> BloomFilter:
+    total = db.query(User.id).count()
+    bloom = BloomFilter(
+        max(total * 4, AVAILABILITY_FILTER_MIN_CAPACITY),  # 2 names per user, x2 growth
+        AVAILABILITY_FILTER_FP_RATE,
+    )
+
+    rows = db.query(User.email_normalized, User.username_normalized).yield_per(5000)
+    for email, username in rows:
+        if email:
+            bloom.add(_key("email", email))
+        if username:
+            bloom.add(_key("username", username))
+
+    metrics.observe("auth.availability.filter_size", bloom.count)
+    return bloom
+
+
+def refresh_identifier_filter():
+    """
+    (Re)builds the filter from the users table. Called at startup, then
+    from a background thread whenever the filter goes stale.
+    """
+
+    global _filter, _built_at, _added_during_build
+
+    started = time.monotonic()
+    with _lock:
+        _added_during_build = []
+
+    db = SessionLocal()
+    try:
+        bloom = build_identifier_filter(db)
+    except Exception:
+        with _lock:
+            _added_during_build = None
+        raise
+    finally:
+        db.close()
+
+    with _lock:
+        # The scan may have missed signups that committed meanwhile
+        for key in _added_during_build or ():
+            bloom.add(key)
+        _added_during_build = None
+        _filter = bloom
+        _built_at = time.monotonic()
+
+    print(f"🌸 Availability filter built: {bloom.count} names in {time.monotonic() - started:.2f}s")
+
+
+def _rebuild_in_background():
+    global _built_at
+
+    try:
+        refresh_identifier_filter()
+    except Exception as e:
+        print(f"⚠️ Availability filter rebuild failed, keeping the old one: {e}")
+        with _lock:
+            # Try again in a minute rather than on the next request
+            _built_at = time.monotonic() - AVAILABILITY_FILTER_REBUILD_SECONDS + 60
+    finally:
+        _rebuild_lock.release()
+
+
+def _current_filter():
+    with _lock:
+        bloom = _filter
+        stale = (
+            bloom is None
+            or time.monotonic() - _built_at > AVAILABILITY_FILTER_REBUILD_SECONDS
+            or bloom.count > bloom.capacity
+        )
+    if not stale:
+        return bloom
+
+    if bloom is None:
+        # Nothing to serve yet (startup build failed): build inline, once
+        with _rebuild_lock:
+            with _lock:
+                missing = _filter is None
+            if missing:
+                refresh_identifier_filter()
+        with _lock:
+            return _filter
+
+    # Full scan off the request thread; keep answering from the old filter
+    if _rebuild_lock.acquire(blocking=False):
+        threading.Thread(
+            target=_rebuild_in_background,
+            name="identifier-filter-rebuild",
+            daemon=True,
+        ).start()
+    return bloom
+
+
+def remember_identifiers(email: str = None, username: str = None):
+    """
+    Adds a newly registered user's names (after the signup commits).
+    """
+
+    keys = []
+    if email:
+        keys.append(_key("email", normalize_identifier(email)))
+    if username:
+        keys.append(_key("username", normalize_identifier(username)))
+
+    with _lock:
+        if _added_during_build is not None:
+            _added_during_build.extend(keys)
+        if _filter is None:
+            return
+        for key in keys:
+            _filter.add(key)
+
+
+def is_taken(db: Session, kind: str, value: str) -> bool:
+    """
+    kind: "email" | "username". Only a filter hit costs a (unique index) query.
+    """
+
+    value = normalize_identifier(value)
+    if _key(kind, value) not in _current_filter():
+        metrics.incr("auth.availability.filter_negative")
+        return False
+
+    metrics.incr("auth.availability.filter_positive")
+    column = User.email_normalized if kind == "email" else User.username_normalized
+    taken = db.query(User.id).filter(column == value).first() is not None
+    if not taken:
+        metrics.incr("auth.availability.false_positive")
+    return taken
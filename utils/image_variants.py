@@ -0,0 +1,100 @@
+import io
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from utils.blob_utils import (
+    key_for_url,
+    download_to_file,
+    upload_file_to_b2,
+)
+
+# name → longest edge in pixels
+VARIANT_SIZES = {
+    "thumb": 320,
+    "card": 960,
+    "full": 2048,
+}
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+def variant_key(original_key: str, name: str, fmt: str) -> str:
+    """
+    evidence/abc.jpg → evidence/abc/thumb.webp (stored next to the original)
+    """
+
+    stem = os.path.splitext(original_key)[0]
+    return f"{stem}/{name}.{fmt}"
+
+
+def upload_encoded(image: Image.Image, key: str, fmt: str) -> str:
+    buf = io.BytesIO()
+
+    if fmt == "webp":
+        image.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+        content_type = "image/webp"
+    else:
+        image.save(buf, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        content_type = "image/jpeg"
+
+    buf.seek(0)
+    return upload_file_to_b2(
+        file_obj=buf,
+        original_filename=key,
+        content_type=content_type,
+        key=key,
+    )
+
+
+def generate_image_variants(db: Session, evidence: Evidence):
+    """
+    Media-job handler: builds thumb/card/full WebP + JPEG copies of an image
+    and records their URLs on the evidence row. The caller commits.
+    """
+
+    # Same content already processed (deduplicated upload) → reuse
+    if evidence.content_sha256:
+        twin = (
+            db.query(Evidence)
+            .filter(
+                Evidence.content_sha256 == evidence.content_sha256,
+                Evidence.id != evidence.id,
+                Evidence.variants != None,
+            )
+            .first()
+        )
+        if twin:
+            evidence.variants = twin.variants
+            return
+
+    original_key = key_for_url(evidence.blob_url)
+    if not original_key:
+        raise ValueError(f"Evidence {evidence.id} is not stored in our bucket")
+
+    with tempfile.TemporaryFile() as f:
+        download_to_file(original_key, f)
+
+        with Image.open(f) as source:
+            # Apply camera rotation, drop alpha/palette for JPEG
+            source = ImageOps.exif_transpose(source)
+            source = source.convert("RGB")
+
+            variants = {}
+            for name, max_edge in VARIANT_SIZES.items():
+                image = source.copy()
+                # Never upscale; thumbnail() keeps the aspect ratio
+                image.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+                variants[name] = {
+                    "webp": upload_encoded(image, variant_key(original_key, name, "webp"), "webp"),
+                    "jpeg": upload_encoded(image, variant_key(original_key, name, "jpg"), "jpeg"),
+                    "width": image.width,
+                    "height": image.height,
+                }
+
+    evidence.variants = variants
@@ -0,0 +1,92 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from db import SessionLocal
+from models.job_run import JobRun
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+JOB_RUN_RETENTION_DAYS = int(os.getenv("JOB_RUN_RETENTION_DAYS", 30))
+
+
+def _metrics_delta(before: dict, after: dict):
+    """
+    What a pass added to this process's metrics: (counters, summaries).
+    """
+
+    counters = {
+        name: value - before["counters"].get(name, 0)
+        for name, value in after["counters"].items()
+        if name not in before["counters"] or value != before["counters"][name]
+    }
+
+    summaries = {}
+    for name, s in after["summaries"].items():
+        prev = before["summaries"].get(name, {"count": 0, "total": 0})
+        count = s["count"] - prev["count"]
+        if count:
+            total = s["total"] - prev["total"]
+            summaries[name] = {"count": count, "total": total, "avg": total / count}
+
+    return counters, summaries
+
+
+def save_job_run(job: str, started_at: datetime, counters: dict, summaries: dict, error: str = None):
+    """
+    Stores one pass in job_runs (own session, so a failed job still gets
+    its row) and trims that job's history past the retention period.
+    """
+
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        db.add(JobRun(
+            job=job,
+            status="failed" if error else "ok",
+            started_at=started_at,
+            finished_at=now,
+            counters=counters,
+            summaries=summaries,
+            error=error,
+        ))
+        (
+            db.query(JobRun)
+            .filter(
+                JobRun.job == job,
+                JobRun.started_at < now - timedelta(days=JOB_RUN_RETENTION_DAYS),
+            )
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️ Could not record {job} run: {e}")
+    finally:
+        db.close()
+
+
+@contextmanager
+def recorded_run(job: str, skip_if_idle: bool = False):
+    """
+    Wraps one pass of a job: its metric deltas are logged and saved to
+    job_runs, where the API can read them. Long-running workers pass
+    skip_if_idle so empty polls don't write rows.
+    """
+
+    before = metrics.snapshot()
+    started_at = datetime.now(timezone.utc)
+    error = None
+
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        counters, summaries = _metrics_delta(before, metrics.snapshot())
+        if counters or summaries or error or not skip_if_idle:
+            print(f"📈 {job}: {counters}")
+            save_job_run(job, started_at, counters, summaries, error)
@@ -0,0 +1,272 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request, status
+
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+LOGIN_THROTTLE_WINDOW_SECONDS = int(os.getenv("LOGIN_THROTTLE_WINDOW_SECONDS", 900))
+
+# Attempts allowed per window for one account name / one client address
+LOGIN_MAX_ATTEMPTS_PER_IDENTIFIER = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IDENTIFIER", 10))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", 100))
+
+# GET /auth/availability per client address (same window). Email checks
+# also count against a tighter budget: they tell who has an account.
+AVAILABILITY_MAX_CHECKS_PER_IP = int(os.getenv("AVAILABILITY_MAX_CHECKS_PER_IP", 120))
+AVAILABILITY_MAX_EMAIL_CHECKS_PER_IP = int(os.getenv("AVAILABILITY_MAX_EMAIL_CHECKS_PER_IP", 20))
+
+# Keys tracked per process; least recently seen are dropped first
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", 100000))
+
+# Set to share counters between workers (needs the `redis` package).
+# If Redis is unreachable, counting carries on per process.
+LOGIN_THROTTLE_REDIS_URL = os.getenv("LOGIN_THROTTLE_REDIS_URL")
+
+# Addresses of the reverse proxies / load balancers in front of the API,
+# comma separated. Behind a proxy every request comes from the proxy, so
+# all clients would share one per-IP budget; for requests from these
+# addresses the client is read from X-Forwarded-For instead. (uvicorn's
+# own --forwarded-allow-ips does the same job when it runs the app.)
+TRUSTED_PROXY_IPS = {
+    ip.strip() for ip in os.getenv("TRUSTED_PROXY_IPS", "").split(",") if ip.strip()
+}
+
+
+# ======================================================
+# Counter backends
+# Sliding window approximated from two fixed windows: the previous
+# window's count is weighted by how much of it still overlaps.
+# ======================================================
+class MemoryCounters:
+    """
+    key -> [window index, previous count, current count] in a bounded LRU.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key: str, window: int):
+        entry = self._counts.get(key)
+        if entry is None:
+            return None
+        if entry[0] != window:
+            # Roll forward; anything older than one window no longer matters
+            previous = entry[2] if entry[0] == window - 1 else 0
+            entry[:] = [window, previous, 0]
+        return entry
+
+    def counts(self, key: str, window: int):
+        with self._lock:
+            entry = self._entry(key, window)
+            return (entry[1], entry[2]) if entry else (0, 0)
+
+    def incr(self, key: str, window: int):
+        with self._lock:
+            entry = self._entry(key, window)
+            if entry is None:
+                self._counts[key] = [window, 0, 1]
+            else:
+                entry[2] += 1
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_keys:
+                self._counts.popitem(last=False)
+
+    def clear(self, key: str):
+        with self._lock:
+            self._counts.pop(key, None)
+
+
+class RedisCounters:
+    """
+    One INCR-ed key per (key, window) that expires after two windows.
+    Redis errors fall back to in-process counters instead of failing the
+    request; they are only as strict as a single worker until it is back.
+    """
+
+    def __init__(self, url: str, window_seconds: int, fallback: MemoryCounters):
+        import redis  # optional dependency
+
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.errors = (redis.RedisError,)
+        self.window_seconds = window_seconds
+        self.fallback = fallback
+
+    def _backend_error(self, e: Exception):
+        metrics.incr("auth.login_throttle.backend_errors")
+        print(f"⚠️ Login throttle Redis error, counting per process: {e}")
+
+    def counts(self, key: str, window: int):
+        try:
+            previous, current = self.client.mget(f"login:{key}:{window - 1}", f"login:{key}:{window}")
+        except self.errors as e:
+            self._backend_error(e)
+            return self.fallback.counts(key, window)
+        return int(previous or 0), int(current or 0)
+
+    def incr(self, key: str, window: int):
+        try:
+            pipe = self.client.pipeline()
+            pipe.incr(f"login:{key}:{window}")
+            pipe.expire(f"login:{key}:{window}", self.window_seconds * 2)
+            pipe.execute()
+        except self.errors as e:
+            self._backend_error(e)
+            self.fallback.incr(key, window)
+
+    def clear(self, key: str):
+        self.fallback.clear(key)
+        window = int(time.time() // self.window_seconds)
+        try:
+            self.client.delete(f"login:{key}:{window - 1}", f"login:{key}:{window}")
+        except self.errors as e:
+            self._backend_error(e)
+
+
+def make_counters():
+    if LOGIN_THROTTLE_REDIS_URL:
+        try:
+            return RedisCounters(
+                LOGIN_THROTTLE_REDIS_URL,
+                LOGIN_THROTTLE_WINDOW_SECONDS,
+                MemoryCounters(LOGIN_THROTTLE_MAX_KEYS),
+            )
+        except ImportError:
+            print("⚠️ LOGIN_THROTTLE_REDIS_URL is set but redis is not installed; throttling per process")
+    return MemoryCounters(LOGIN_THROTTLE_MAX_KEYS)
+
+
+# ======================================================
+# Throttle
+# ======================================================
+class LoginThrottle:
+    def __init__(self, counters, window_seconds: int):
+        self.counters = counters
+        self.window_seconds = window_seconds
+
+    def retry_after(self, key: str, limit: int, now: float) -> int:
+        """
+        0 if another attempt is allowed, else seconds until it will be.
+        """
+
+        window = int(now // self.window_seconds)
+        elapsed = (now % self.window_seconds) / self.window_seconds
+        previous, current = self.counters.counts(key, window)
+
+        if previous * (1 - elapsed) + current < limit:
+            return 0
+
+        if current < limit and previous:
+            # previous * (1 - t) + current < limit once t > 1 - (limit - current) / previous
+            opens_at = 1 - (limit - current) / previous
+            return max(math.ceil((opens_at - elapsed) * self.window_seconds), 1)
+
+        return max(math.ceil((1 - elapsed) * self.window_seconds), 1)
+
+    def record(self, key: str, now: float):
+        self.counters.incr(key, int(now // self.window_seconds))
+
+    def clear(self, key: str):
+        self.counters.clear(key)
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _throttle
+
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = LoginThrottle(make_counters(), LOGIN_THROTTLE_WINDOW_SECONDS)
+    return _throttle
+
+
+def client_ip(request: Request) -> str:
+    """
+    The address to throttle: the socket peer, or, when that is a trusted
+    proxy, the nearest X-Forwarded-For hop that isn't one (entries further
+    left are client-supplied and could be anything).
+    """
+
+    ip = request.client.host if request.client else "unknown"
+    if ip not in TRUSTED_PROXY_IPS:
+        return ip
+
+    hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    for hop in reversed(hops):
+        if hop not in TRUSTED_PROXY_IPS:
+            return hop
+    return ip
+
+
+def _enforce(checks, metric_prefix: str, detail: str):
+    """
+    checks: (kind, key, limit). Raises 429 if any key is over its limit,
+    otherwise counts the attempt against all of them.
+    """
+
+    throttle = get_login_throttle()
+    now = time.time()
+
+    for kind, key, limit in checks:
+        wait = throttle.retry_after(key, limit, now)
+        if wait:
+            metrics.incr(f"{metric_prefix}.blocked_{kind}")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=detail,
+                headers={"Retry-After": str(wait)},
+            )
+
+    for _, key, _ in checks:
+        throttle.record(key, now)
+    metrics.incr(f"{metric_prefix}.allowed")
+
+
+def check_login_attempt(identifier: str, request: Request):
+    """
+    Counts a login attempt, or raises 429 if the account name or the client
+    address is over its limit. Runs before any lookup or password hashing.
+    """
+
+    _enforce(
+        (
+            ("identifier", f"id:{identifier}", LOGIN_MAX_ATTEMPTS_PER_IDENTIFIER),
+            ("ip", f"ip:{client_ip(request)}", LOGIN_MAX_ATTEMPTS_PER_IP),
+        ),
+        "auth.login_throttle",
+        "Too many login attempts, please try again later",
+    )
+
+
+def check_availability_lookup(request: Request, checks_email: bool):
+    """
+    Counts an availability check from this address, or raises 429.
+    Caps how fast /auth/availability can be used to test for accounts.
+    """
+
+    ip = client_ip(request)
+    checks = [("ip", f"avail:{ip}", AVAILABILITY_MAX_CHECKS_PER_IP)]
+    if checks_email:
+        checks.append(("email_ip", f"avail-email:{ip}", AVAILABILITY_MAX_EMAIL_CHECKS_PER_IP))
+
+    _enforce(checks, "auth.availability_throttle", "Too many availability checks, please try again later")
+
+
+def login_succeeded(identifier: str):
+    """
+    A correct password clears the account's counter (not the address's).
+    """
+
+    get_login_throttle().clear(f"id:{identifier}")
@@ -0,0 +1,34 @@
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from models.media_job import MediaJob
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help; the worker fails the
+    job straight away instead of backing off.
+    """
+
+
+def enqueue_media_job(db: Session, evidence_id: int, kind: str) -> MediaJob:
+    job = MediaJob(evidence_id=evidence_id, kind=kind, status="queued")
+    db.add(job)
+    return job
+
+
+def enqueue_processing_for(db: Session, evidence: Evidence, content_type: str):
+    """
+    Queues background processing that fits the uploaded file type.
+    Call after the evidence row is flushed (needs its id); the caller commits.
+    """
+
+    content_type = (content_type or "").lower()
+
+    if content_type.startswith("image/"):
+        enqueue_media_job(db, evidence.id, "image_variants")
+        enqueue_media_job(db, evidence.id, "image_phash")
+
+    elif content_type.startswith("video/"):
+        evidence.processing_status = "pending"
+        enqueue_media_job(db, evidence.id, "video_hls")
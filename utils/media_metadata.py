@@ -0,0 +1,271 @@
+import io
+import struct
+from datetime import datetime, timedelta, timezone
+
+from PIL import Image
+
+# Bytes kept from the start of the file for sniffing, image headers and EXIF
+HEAD_BYTES = 512 * 1024
+
+# Bytes kept from the start of an MP4/MOV "moov" box (mvhd comes first)
+MOOV_SCAN_BYTES = 64 * 1024
+
+MP4_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+
+# EXIF tags
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+DATETIME_ORIGINAL = 36867
+OFFSET_TIME_ORIGINAL = 36881
+DATETIME = 306
+
+
+# ======================================================
+# MIME sniffing (magic bytes)
+# ======================================================
+def sniff_mime(head: bytes):
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"heic", b"heix", b"mif1", b"msf1"):
+            return "image/heic"
+        if brand == b"qt  ":
+            return "video/quicktime"
+        if brand == b"M4A ":
+            return "audio/mp4"
+        return "video/mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"ID3") or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "audio/mpeg"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    return None
+
+
+# ======================================================
+# Images (Pillow only parses headers here, nothing is decoded)
+# ======================================================
+def parse_exif_datetime(value: str, offset: str = None):
+    try:
+        dt = datetime.strptime(value.strip("\x00 "), "%Y:%m:%d %H:%M:%S")
+    except (AttributeError, ValueError):
+        return None
+
+    # EXIF times are camera-local; without OffsetTimeOriginal we assume UTC
+    tz = timezone.utc
+    if offset:
+        try:
+            sign = -1 if offset.startswith("-") else 1
+            hours, minutes = offset.lstrip("+-").split(":")
+            tz = timezone(sign * timedelta(hours=int(hours), minutes=int(minutes)))
+        except ValueError:
+            pass
+
+    return dt.replace(tzinfo=tz).astimezone(timezone.utc)
+
+
+def gps_to_degrees(dms, ref):
+    try:
+        degrees = float(dms[0]) + float(dms[1]) / 60 + float(dms[2]) / 3600
+    except (TypeError, ValueError, IndexError, ZeroDivisionError):
+        return None
+    return -degrees if ref in ("S", "W") else degrees
+
+
+def image_metadata(head: bytes) -> dict:
+    try:
+        image = Image.open(io.BytesIO(head))
+        meta = {"width": image.width, "height": image.height}
+        exif = image.getexif()
+    except Exception:
+        return {}
+
+    exif_ifd = exif.get_ifd(EXIF_IFD)
+    captured = exif_ifd.get(DATETIME_ORIGINAL) or exif.get(DATETIME)
+    if captured:
+        meta["captured_at"] = parse_exif_datetime(captured, exif_ifd.get(OFFSET_TIME_ORIGINAL))
+
+    gps = exif.get_ifd(GPS_IFD)
+    if gps.get(2) and gps.get(4):
+        meta["gps_latitude"] = gps_to_degrees(gps[2], gps.get(1))
+        meta["gps_longitude"] = gps_to_degrees(gps[4], gps.get(3))
+
+    return meta
+
+
+# ======================================================
+# Audio / video
+# ======================================================
+def mvhd_metadata(moov: bytes) -> dict:
+    """
+    Duration and creation time from the movie header inside "moov".
+    """
+
+    offset = 0
+    while offset + 8 <= len(moov):
+        size, kind = struct.unpack(">I4s", moov[offset:offset + 8])
+        if kind == b"mvhd":
+            body = moov[offset + 8:]
+            version = body[0] if body else 0
+            try:
+                if version == 1:
+                    created, _, timescale, duration = struct.unpack(">QQIQ", body[4:32])
+                else:
+                    created, _, timescale, duration = struct.unpack(">IIII", body[4:20])
+            except struct.error:
+                return {}
+
+            meta = {}
+            if timescale:
+                meta["duration_seconds"] = duration / timescale
+            if created:
+                meta["captured_at"] = MP4_EPOCH + timedelta(seconds=created)
+            return meta
+
+        if size < 8:
+            break
+        offset += size
+
+    return {}
+
+
+def wav_metadata(head: bytes) -> dict:
+    offset = 12
+    byte_rate = None
+
+    while offset + 8 <= len(head):
+        kind, size = struct.unpack("<4sI", head[offset:offset + 8])
+        if kind == b"fmt " and offset + 20 <= len(head):
+            byte_rate = struct.unpack("<I", head[offset + 16:offset + 20])[0]
+        elif kind == b"data":
+            if byte_rate:
+                return {"duration_seconds": size / byte_rate}
+            break
+        offset += 8 + size + (size % 2)
+
+    return {}
+
+
+# ======================================================
+# Streaming scanner
+# ======================================================
+class MetadataScanner:
+    """
+    Fed the upload chunk by chunk (alongside hashing), so metadata costs no
+    extra read. Keeps the first HEAD_BYTES, and for MP4/MOV walks top-level
+    boxes to capture the start of "moov" wherever it sits in the file.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.head = bytearray()
+        self.mime_type = None
+
+        self._next_box = None   # offset of the next top-level MP4 box
+        self._box_header = bytearray()
+        self._moov_range = None
+        self.moov = bytearray()
+
+    def feed(self, chunk: bytes):
+        start = self.size
+        self.size += len(chunk)
+
+        before = len(self.head)
+        if before < HEAD_BYTES:
+            self.head += chunk[:HEAD_BYTES - before]
+
+        if before < 16 <= len(self.head):
+            self.mime_type = sniff_mime(bytes(self.head[:16]))
+            if self.mime_type in ("video/mp4", "video/quicktime", "audio/mp4"):
+                self._next_box = 0
+                # Tiny first chunks: catch up on the bytes seen before sniffing
+                if start:
+                    self._walk_boxes(bytes(self.head[:start]), 0)
+
+        self._capture_moov(chunk, start)
+        self._walk_boxes(chunk, start)
+
+    def _capture_moov(self, chunk: bytes, start: int):
+        if not self._moov_range:
+            return
+        lo, hi = self._moov_range
+        end = start + len(chunk)
+        if end <= lo or start >= hi:
+            return
+        self.moov += chunk[max(lo, start) - start:min(hi, end) - start]
+
+    def _walk_boxes(self, chunk: bytes, start: int):
+        end = start + len(chunk)
+
+        while self._next_box is not None and not self._moov_range:
+            offset = self._next_box + len(self._box_header)
+            if offset >= end:
+                return
+
+            need = 8
+            if len(self._box_header) >= 8 and struct.unpack(">I", self._box_header[:4])[0] == 1:
+                need = 16  # 64-bit "largesize" follows the type
+
+            self._box_header += chunk[offset - start:offset - start + need - len(self._box_header)]
+            if len(self._box_header) < need:
+                return
+
+            size, kind = struct.unpack(">I4s", self._box_header[:8])
+            if size == 1 and need == 8:
+                continue
+            header_len = need
+            if size == 1:
+                size = struct.unpack(">Q", self._box_header[8:16])[0]
+
+            if size < header_len:
+                # size 0 ("to end of file") or corrupt: nothing more to walk
+                self._next_box = None
+                return
+
+            if kind == b"moov":
+                body_start = self._next_box + header_len
+                self._moov_range = (body_start, body_start + min(size - header_len, MOOV_SCAN_BYTES))
+                self._capture_moov(chunk, start)
+
+            self._next_box += size
+            self._box_header = bytearray()
+
+    def result(self, declared_type: str = None) -> dict:
+        """
+        Column values for Evidence. Unrecognised formats fall back to the
+        client's declared content type.
+        """
+
+        if self.mime_type is None and len(self.head) < 16:
+            self.mime_type = sniff_mime(bytes(self.head))
+
+        meta = {
+            "byte_size": self.size,
+            "mime_type": self.mime_type or declared_type,
+        }
+
+        head = bytes(self.head)
+        if self.mime_type and self.mime_type.startswith("image/"):
+            meta.update(image_metadata(head))
+        elif self.mime_type == "audio/wav":
+            meta.update(wav_metadata(head))
+        elif self.moov:
+            meta.update(mvhd_metadata(bytes(self.moov)))
+
+        return meta
@@ -0,0 +1,54 @@
+import threading
+from collections import defaultdict
+
+# ======================================================
+# In-process metrics
+# Cheap counters and summaries. API workers expose theirs via
+# GET /admin/metrics (each worker keeps its own numbers); background
+# jobs persist theirs per pass through utils/job_runs.py.
+# ======================================================
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_summaries = {}
+
+
+def incr(name: str, value: int = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float):
+    """
+    Records one sample (duration, size, throughput...) for a summary metric.
+    """
+
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            _summaries[name] = {
+                "count": 1,
+                "total": value,
+                "min": value,
+                "max": value,
+                "last": value,
+            }
+            return
+
+        s["count"] += 1
+        s["total"] += value
+        s["min"] = min(s["min"], value)
+        s["max"] = max(s["max"], value)
+        s["last"] = value
+
+
+def snapshot() -> dict:
+    with _lock:
+        summaries = {
+            name: {**s, "avg": s["total"] / s["count"]}
+            for name, s in _summaries.items()
+        }
+        return {
+            "counters": dict(_counters),
+            "summaries": summaries,
+        }
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+# Changing the cost makes existing hashes "need update"; they are
+# re-hashed transparently on the user's next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Processes doing bcrypt work (0 = hash inline in the calling thread)
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))
+)
+
+# Hashes allowed in flight or waiting; beyond this requests get a 503
+# instead of piling up behind a login burst
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 8)
+)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+
+# ======================================================
+# Work done in the pool (module-level so it pickles)
+# ======================================================
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    try:
+        return pwd_context.verify(password, hashed_password)
+    except (ValueError, TypeError):
+        return False  # unknown or corrupt hash
+
+
+# ======================================================
+# Pool
+# ======================================================
+_pool = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING, 1))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded server process is unsafe
+                _pool = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _reset_pool(broken: ProcessPoolExecutor = None):
+    """
+    Shuts the pool down. With `broken`, only if that is still the current
+    pool: concurrent callers that hit the same failure must not tear down
+    the replacement another of them already started.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if broken is not None and _pool is not broken:
+            return
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run(fn, *args):
+    if not PASSWORD_HASH_WORKERS:
+        return fn(*args)
+
+    if not _pending.acquire(blocking=False):
+        metrics.incr("auth.password_hash.rejected")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    try:
+        pool = _get_pool()
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (OOM kill...); start a fresh pool once
+            metrics.incr("auth.password_hash.pool_restarts")
+            _reset_pool(broken=pool)
+            return _get_pool().submit(fn, *args).result()
+    finally:
+        _pending.release()
+
+
+# ======================================================
+# Public API (blocking; call from sync handlers)
+# ======================================================
+def hash_password(password: str) -> str:
+    metrics.incr("auth.password_hash.hashes")
+    return _run(_hash, password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    metrics.incr("auth.password_hash.verifies")
+    return _run(_verify, plain_password, hashed_password)
+
+
+def verify_and_rehash(plain_password: str, hashed_password: str):
+    """
+    Returns (ok, new_hash). new_hash is set when the password matched but
+    the stored hash uses outdated settings and should be replaced.
+    """
+
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+
+    if pwd_context.needs_update(hashed_password):
+        metrics.incr("auth.password_hash.rehashed")
+        return True, hash_password(plain_password)
+
+    return True, None
+
+
+def shutdown_pool():
+    _reset_pool()
@@ -0,0 +1,186 @@
+import os
+import tempfile
+from itertools import combinations
+
+from PIL import Image, ImageOps
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from utils import metrics
+from utils.blob_utils import key_for_url, download_to_file
+
+# ======================================================
+# Config
+# ======================================================
+# dHash bits that may differ for two images to count as near-duplicates
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", 6))
+
+# Upper bound accepted by the admin endpoint (lookup cost grows quickly)
+MAX_SEARCH_DISTANCE = 11
+
+# Multi-index hashing: the 64-bit hash is split into 4 bands of 16 bits,
+# each stored in its own indexed column
+PHASH_BANDS = 4
+BAND_BITS = 16
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+# ======================================================
+# Hashing
+# ======================================================
+def dhash(image: Image.Image) -> int:
+    """
+    64-bit difference hash: shrink to 9x8 grayscale and record, row by
+    row, whether each pixel is brighter than its right neighbour. Survives
+    re-encoding, resizing and small crops / colour changes.
+    """
+
+    small = image.convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def to_signed(value: int) -> int:
+    # Postgres BIGINT is signed
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(to_unsigned(a) ^ to_unsigned(b)).count("1")
+
+
+def split_bands(value: int) -> list:
+    value = to_unsigned(value)
+    return [(value >> (BAND_BITS * i)) & BAND_MASK for i in range(PHASH_BANDS)]
+
+
+def band_neighbors(band: int, radius: int) -> list:
+    """
+    All 16-bit values within `radius` bit flips of `band`.
+    """
+
+    values = [band]
+    for r in range(1, radius + 1):
+        for bits in combinations(range(BAND_BITS), r):
+            flipped = band
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+
+def set_phash(evidence: Evidence, value: int):
+    evidence.phash = to_signed(value)
+    for i, band in enumerate(split_bands(value)):
+        setattr(evidence, f"phash_band{i}", band)
+
+
+# ======================================================
+# Lookup
+# ======================================================
+BAND_COLUMNS = [
+    Evidence.phash_band0,
+    Evidence.phash_band1,
+    Evidence.phash_band2,
+    Evidence.phash_band3,
+]
+
+
+def find_near_duplicates(
+    db: Session,
+    phash: int,
+    *,
+    max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE,
+    exclude_id: int = None,
+    limit: int = 50,
+) -> list:
+    """
+    Returns [(evidence, distance)] sorted by distance.
+
+    Pigeonhole: if two hashes differ in at most d bits, some band differs
+    in at most d // 4 bits. So only rows whose band i is within that radius
+    of ours are fetched (indexed IN lookups), then checked exactly.
+    """
+
+    radius = max_distance // PHASH_BANDS
+    bands = split_bands(phash)
+
+    query = db.query(Evidence).filter(
+        or_(*[
+            column.in_(band_neighbors(band, radius))
+            for column, band in zip(BAND_COLUMNS, bands)
+        ])
+    )
+    if exclude_id is not None:
+        query = query.filter(Evidence.id != exclude_id)
+
+    candidates = query.all()
+    metrics.observe("media.phash.candidates", len(candidates))
+
+    matches = []
+    for candidate in candidates:
+        distance = hamming(phash, candidate.phash)
+        if distance <= max_distance:
+            matches.append((candidate, distance))
+
+    matches.sort(key=lambda m: (m[1], m[0].id))
+    return matches[:limit]
+
+
+# ======================================================
+# Media-job handler
+# ======================================================
+def compute_image_phash(db: Session, evidence: Evidence):
+    """
+    Hashes an image and flags the closest earlier near-duplicate as a
+    moderation hint. Uses the small thumbnail variant when it exists —
+    9x8 pixels need no more. The caller commits.
+    """
+
+    twin = None
+    if evidence.content_sha256:
+        twin = (
+            db.query(Evidence)
+            .filter(
+                Evidence.content_sha256 == evidence.content_sha256,
+                Evidence.id != evidence.id,
+                Evidence.phash != None,
+            )
+            .first()
+        )
+
+    if twin:
+        value = to_unsigned(twin.phash)
+    else:
+        source_url = ((evidence.variants or {}).get("thumb") or {}).get("jpeg") or evidence.blob_url
+        key = key_for_url(source_url)
+        if not key:
+            raise ValueError(f"Evidence {evidence.id} is not stored in our bucket")
+
+        with tempfile.TemporaryFile() as f:
+            download_to_file(key, f)
+            with Image.open(f) as image:
+                value = dhash(ImageOps.exif_transpose(image))
+
+    set_phash(evidence, value)
+
+    earlier = [
+        (match, distance)
+        for match, distance in find_near_duplicates(db, value, exclude_id=evidence.id)
+        if match.id < evidence.id
+    ]
+    if earlier:
+        evidence.near_duplicate_of = earlier[0][0].id
+        metrics.incr("media.phash.near_duplicates")
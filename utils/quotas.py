@@ -0,0 +1,286 @@
+import json
+import os
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from jose import JWTError, jwt
+from sqlalchemy import case, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+
+from db import SessionLocal
+from models.evidence import Evidence
+from models.user_storage_usage import UserStorageUsage
+from utils import metrics
+from utils.auth import Principal, SECRET_KEY, ALGORITHM
+from utils.blob_utils import MB
+
+# ======================================================
+# Config (0 disables a quota; admins are never limited)
+# ======================================================
+USER_STORAGE_QUOTA_BYTES = int(os.getenv("USER_STORAGE_QUOTA_MB", 5120)) * MB
+USER_DAILY_UPLOAD_QUOTA_BYTES = int(os.getenv("USER_DAILY_UPLOAD_QUOTA_MB", 1024)) * MB
+
+# Multipart boundaries and form fields ride along with the file bytes
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+# ======================================================
+# Counters
+# ======================================================
+def today():
+    return datetime.now(timezone.utc).date()
+
+
+def get_usage(db: Session, user_id: int) -> UserStorageUsage:
+    """
+    Returns the user's counter row, creating it on first use.
+    """
+
+    query = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == user_id)
+    usage = query.first()
+    if usage:
+        return usage
+
+    # Another upload may be creating it too
+    savepoint = db.begin_nested()
+    try:
+        usage = UserStorageUsage(user_id=user_id, stored_bytes=0, evidence_count=0, day_uploaded_bytes=0)
+        db.add(usage)
+        savepoint.commit()
+    except IntegrityError:
+        savepoint.rollback()
+        usage = query.first()
+    return usage
+
+
+def uploaded_today(usage: UserStorageUsage) -> int:
+    if usage is None or usage.day != today():
+        return 0
+    return usage.day_uploaded_bytes or 0
+
+
+def remaining_upload_bytes(db: Session, user_id: int, role: str = None):
+    """
+    Bytes the user may still upload right now, or None when unlimited.
+    Read-only: a missing row just means nothing has been uploaded yet.
+    """
+
+    if role == "admin":
+        return None
+
+    usage = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == user_id).first()
+
+    limits = []
+    if USER_STORAGE_QUOTA_BYTES:
+        stored = usage.stored_bytes if usage else 0
+        limits.append(USER_STORAGE_QUOTA_BYTES - stored)
+    if USER_DAILY_UPLOAD_QUOTA_BYTES:
+        limits.append(USER_DAILY_UPLOAD_QUOTA_BYTES - uploaded_today(usage))
+
+    if not limits:
+        return None
+    return max(min(limits), 0)
+
+
+def quota_exceeded(remaining: int) -> HTTPException:
+    metrics.incr("uploads.quota.rejected")
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload quota exceeded ({remaining} bytes remaining)",
+    )
+
+
+def check_upload_quota(db: Session, user: Principal, incoming_bytes: int):
+    """
+    Raises 413 if `incoming_bytes` more would put the user over a quota.
+    Advisory (fails fast before storage work); reserve_upload is what
+    actually holds the line.
+    """
+
+    remaining = remaining_upload_bytes(db, user.id, user.role)
+    if remaining is None or incoming_bytes <= remaining:
+        return
+
+    raise quota_exceeded(remaining)
+
+
+def reserve_upload(db: Session, user: Principal, num_bytes: int, count: int = 1, stored: bool = True):
+    """
+    Adds an upload to the counters, or raises 413 if it doesn't fit. One
+    conditional UPDATE, so concurrent uploads can't all pass a check made
+    before any of them was counted. `stored=False` (anonymous evidence, not
+    attributed to the user) only counts towards the daily allowance.
+    The caller commits.
+    """
+
+    num_bytes = num_bytes or 0
+    usage = get_usage(db, user.id)  # the row must exist for the UPDATE to match
+
+    day = today()
+    uploaded_today_expr = case(
+        (UserStorageUsage.day == day, UserStorageUsage.day_uploaded_bytes),
+        else_=0,
+    )
+
+    values = {
+        UserStorageUsage.day: day,
+        UserStorageUsage.day_uploaded_bytes: uploaded_today_expr + num_bytes,
+    }
+    if stored:
+        values[UserStorageUsage.stored_bytes] = UserStorageUsage.stored_bytes + num_bytes
+        values[UserStorageUsage.evidence_count] = UserStorageUsage.evidence_count + count
+
+    conditions = [UserStorageUsage.user_id == user.id]
+    if user.role != "admin":
+        if stored and USER_STORAGE_QUOTA_BYTES:
+            conditions.append(UserStorageUsage.stored_bytes + num_bytes <= USER_STORAGE_QUOTA_BYTES)
+        if USER_DAILY_UPLOAD_QUOTA_BYTES:
+            conditions.append(uploaded_today_expr + num_bytes <= USER_DAILY_UPLOAD_QUOTA_BYTES)
+
+    result = db.execute(
+        update(UserStorageUsage)
+        .where(*conditions)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount != 1:
+        db.refresh(usage)
+        raise quota_exceeded(remaining_upload_bytes(db, user.id, user.role) or 0)
+
+
+def record_evidence_deleted(db: Session, evidence: Evidence):
+    """
+    Releases a deleted evidence row's bytes from its owner's counters.
+    The caller commits.
+    """
+
+    if not evidence.user_id:
+        return
+
+    usage = (
+        db.query(UserStorageUsage)
+        .filter(UserStorageUsage.user_id == evidence.user_id)
+        .with_for_update()
+        .first()
+    )
+    if not usage:
+        return
+
+    usage.stored_bytes = max((usage.stored_bytes or 0) - (evidence.byte_size or 0), 0)
+    usage.evidence_count = max((usage.evidence_count or 0) - 1, 0)
+
+
+# ======================================================
+# Early rejection (before the body is read)
+# ======================================================
+QUOTA_UPLOAD_PATHS = (
+    ("POST", "/vault"),
+    ("POST", "/vault/batch"),
+)
+
+
+def is_quota_upload(method: str, path: str) -> bool:
+    if (method, path.rstrip("/") or "/") in QUOTA_UPLOAD_PATHS:
+        return True
+    # PUT /vault/uploads/sessions/{id}/chunks/{n}
+    parts = path.strip("/").split("/")
+    return (
+        method == "PUT"
+        and len(parts) == 6
+        and parts[:3] == ["vault", "uploads", "sessions"]
+        and parts[4] == "chunks"
+    )
+
+
+def _remaining_for_token(token: str):
+    """
+    (user_id, remaining) for a bearer token, or None if it doesn't verify —
+    the endpoint itself then answers 401.
+    """
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+    db = SessionLocal()
+    try:
+        return user_id, remaining_upload_bytes(db, user_id, payload.get("role"))
+    finally:
+        db.close()
+
+
+class UploadQuotaMiddleware:
+    """
+    Rejects uploads that cannot fit the user's quota before the body is
+    accepted: by Content-Length when the client sends one, otherwise as
+    soon as the streamed body grows past the allowance. Endpoints still
+    check the exact file size afterwards.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not is_quota_upload(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            await self.app(scope, receive, send)
+            return
+
+        found = await run_in_threadpool(_remaining_for_token, token)
+        if found is None or found[1] is None:
+            await self.app(scope, receive, send)
+            return
+
+        _, remaining = found
+        limit = remaining
+        if headers.get(b"content-type", b"").startswith(b"multipart/"):
+            limit += MULTIPART_OVERHEAD_BYTES
+
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            metrics.incr("uploads.quota.rejected")
+            await self._reject(send, remaining)
+            return
+
+        received = 0
+
+        async def counting_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    metrics.incr("uploads.quota.rejected")
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Upload quota exceeded ({remaining} bytes remaining)",
+                    )
+            return message
+
+        await self.app(scope, counting_receive, send)
+
+    async def _reject(self, send, remaining: int):
+        body = json.dumps(
+            {"detail": f"Upload quota exceeded ({remaining} bytes remaining)"}
+        ).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
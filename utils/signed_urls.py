@@ -0,0 +1,179 @@
+import os
+import posixpath
+import threading
+import time
+from collections import OrderedDict
+
+from jose import JWTError, jwt
+
+from utils import metrics
+from utils.auth import SECRET_KEY, ALGORITHM
+from utils.blob_utils import key_for_url
+from utils.storage import get_storage
+
+# ======================================================
+# Config
+# ======================================================
+# Every signed URL stays valid for at least this long after it is handed out
+SIGNED_URL_TTL_SECONDS = int(os.getenv("SIGNED_URL_TTL_SECONDS", 3600))
+SIGNED_URL_CACHE_SIZE = int(os.getenv("SIGNED_URL_CACHE_SIZE", 20000))
+
+# Signing only protects anything once the bucket itself is private. Set this
+# together with a private bucket: public evidence then gets signed URLs too.
+# With a public bucket, a private file's unsigned URL still works for anyone
+# who has it.
+SIGN_ALL_EVIDENCE_URLS = os.getenv("SIGN_ALL_EVIDENCE_URLS", "false").lower() == "true"
+
+# Where clients reach this API; signed HLS playlists are served from it
+API_PUBLIC_URL = os.getenv("API_PUBLIC_URL", "http://localhost:8000").rstrip("/")
+
+HLS_TOKEN_PURPOSE = "hls_playlist"
+
+
+# ======================================================
+# Cache keyed by (object key, expiry bucket)
+# ======================================================
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def signed_url_for_key(key: str, now: float = None) -> str:
+    """
+    Returns a presigned GET URL, reusing one signature per object for a whole
+    TTL window. A URL signed in window N expires at the end of window N+1,
+    so callers always get at least SIGNED_URL_TTL_SECONDS of validity.
+    """
+
+    now = time.time() if now is None else now
+    window = int(now // SIGNED_URL_TTL_SECONDS)
+    cache_key = (key, window)
+
+    with _lock:
+        url = _cache.get(cache_key)
+        if url is not None:
+            _cache.move_to_end(cache_key)
+            metrics.incr("storage.signed_url.cache_hits")
+            return url
+
+    expires_at = (window + 2) * SIGNED_URL_TTL_SECONDS
+    url = get_storage().presigned_get(key, int(expires_at - now))
+    metrics.incr("storage.signed_url.cache_misses")
+
+    with _lock:
+        _cache[cache_key] = url
+        _cache.move_to_end(cache_key)
+        while len(_cache) > SIGNED_URL_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return url
+
+
+def needs_signing(is_public: bool) -> bool:
+    return not is_public or SIGN_ALL_EVIDENCE_URLS
+
+
+def evidence_url(url: str, is_public: bool):
+    """
+    URL to hand to clients for a stored evidence file (original, variant,
+    poster...). Private evidence gets an expiring signed URL.
+    """
+
+    if not url or not needs_signing(is_public):
+        return url
+
+    # Already signed
+    if "?" in url:
+        return url
+
+    key = key_for_url(url)
+    if key is None:
+        return url
+
+    return signed_url_for_key(key)
+
+
+def evidence_urls(evidence) -> dict:
+    """
+    blob_url / variants / hls_url / poster_url for an Evidence row,
+    signed where needed.
+    """
+
+    is_public = bool(evidence.is_public)
+
+    variants = None
+    if evidence.variants:
+        variants = {
+            name: {
+                field: evidence_url(value, is_public) if field in ("webp", "jpeg") else value
+                for field, value in variant.items()
+            }
+            for name, variant in evidence.variants.items()
+        }
+
+    hls_url = evidence.hls_url
+    if hls_url and needs_signing(is_public) and key_for_url(hls_url):
+        hls_url = hls_playlist_url(evidence.id)
+
+    return {
+        "blob_url": evidence_url(evidence.blob_url, is_public),
+        "variants": variants,
+        "hls_url": hls_url,
+        "poster_url": evidence_url(evidence.poster_url, is_public),
+    }
+
+
+# ======================================================
+# Signed HLS
+# Playlists reference renditions and segments by relative path, which a
+# signature on the master alone doesn't cover. Signed evidence plays from
+# playlists served by the API (GET /vault/{id}/hls/...), rewritten so every
+# rendition goes back through the API and every segment is a signed URL.
+# ======================================================
+def hls_token(evidence_id: int, now: float = None) -> str:
+    # Same windows as signed_url_for_key, so a playlist URL is stable (and
+    # cacheable) for a whole window and lives as long as its segment URLs
+    now = time.time() if now is None else now
+    window = int(now // SIGNED_URL_TTL_SECONDS)
+    return jwt.encode(
+        {
+            "purpose": HLS_TOKEN_PURPOSE,
+            "sub": str(evidence_id),
+            "exp": (window + 2) * SIGNED_URL_TTL_SECONDS,
+        },
+        SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+
+def verify_hls_token(token: str, evidence_id: int) -> bool:
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return False
+    return claims.get("purpose") == HLS_TOKEN_PURPOSE and claims.get("sub") == str(evidence_id)
+
+
+def hls_playlist_url(evidence_id: int, path: str = "master.m3u8", token: str = None) -> str:
+    return f"{API_PUBLIC_URL}/vault/{evidence_id}/hls/{path}?token={token or hls_token(evidence_id)}"
+
+
+def sign_hls_playlist(text: str, evidence_id: int, path: str, key_prefix: str, token: str) -> str:
+    """
+    Rewrites one playlist at `path` (relative to the HLS folder `key_prefix`):
+    nested playlists point back at the API, segments become signed URLs.
+    """
+
+    base = posixpath.dirname(path)
+    lines = []
+
+    for line in text.splitlines():
+        uri = line.strip()
+        if uri and not uri.startswith("#") and "://" not in uri:
+            rel = posixpath.normpath(posixpath.join(base, uri))
+            if rel.endswith(".m3u8"):
+                line = hls_playlist_url(evidence_id, rel, token)
+            else:
+                line = signed_url_for_key(f"{key_prefix}/{rel}")
+        lines.append(line)
+
+    return "\n".join(lines) + "\n"
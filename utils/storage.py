@@ -0,0 +1,550 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+from utils import metrics
+
+# ======================================================
+# Config
+# ======================================================
+# b2 (any S3-compatible API) | local (filesystem, for dev/tests/benchmarks)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "b2").lower()
+
+# S3 / B2 (Render)
+B2_ENDPOINT_URL = os.getenv("B2_ENDPOINT_URL")        # https://s3.us-east-005.backblazeb2.com
+B2_KEY_ID = os.getenv("B2_KEY_ID")
+B2_APPLICATION_KEY = os.getenv("B2_APPLICATION_KEY")
+B2_BUCKET_NAME = os.getenv("B2_BUCKET_NAME")          # ares-evidence
+
+# Multipart transfer tuning (large bodycam videos)
+MB = 1024 * 1024
+B2_MULTIPART_THRESHOLD_MB = int(os.getenv("B2_MULTIPART_THRESHOLD_MB", 16))
+B2_MULTIPART_CHUNKSIZE_MB = int(os.getenv("B2_MULTIPART_CHUNKSIZE_MB", 16))
+B2_MAX_CONCURRENCY = int(os.getenv("B2_MAX_CONCURRENCY", 8))
+
+# HTTP client tuning
+STORAGE_MAX_POOL_CONNECTIONS = int(
+    os.getenv("STORAGE_MAX_POOL_CONNECTIONS", max(10, B2_MAX_CONCURRENCY * 2))
+)
+STORAGE_CONNECT_TIMEOUT = float(os.getenv("STORAGE_CONNECT_TIMEOUT", 5))
+STORAGE_READ_TIMEOUT = float(os.getenv("STORAGE_READ_TIMEOUT", 60))
+STORAGE_MAX_RETRIES = int(os.getenv("STORAGE_MAX_RETRIES", 3))
+STORAGE_TCP_KEEPALIVE = os.getenv("STORAGE_TCP_KEEPALIVE", "true").lower() == "true"
+
+# S3 DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Local filesystem
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", "./local_storage")
+STORAGE_LOCAL_BASE_URL = os.getenv(
+    "STORAGE_LOCAL_BASE_URL", "http://localhost:8000/local-storage"
+).rstrip("/")
+
+# Dev only: serve the local store at /local-storage WITHOUT auth, private
+# evidence included (its "signed" URLs are plain paths). Off by default;
+# the API's own content/HLS endpoints work either way.
+STORAGE_LOCAL_SERVE = os.getenv("STORAGE_LOCAL_SERVE", "false").lower() == "true"
+
+
+def record_upload_metrics(num_bytes: int, seconds: float):
+    metrics.incr("storage.upload.count")
+    metrics.incr("storage.upload.bytes", num_bytes)
+    metrics.observe("storage.upload.seconds", seconds)
+    if seconds > 0:
+        metrics.observe("storage.upload.mb_per_second", num_bytes / MB / seconds)
+
+
+class _ByteCounter:
+    """
+    Transfer callback; boto3 calls it from several threads at once.
+    """
+
+    def __init__(self):
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, n: int):
+        with self._lock:
+            self.bytes += n
+
+
+# ======================================================
+# Interface
+# ======================================================
+class DirectUploadUnsupported(Exception):
+    """
+    The backend cannot hand out presigned upload URLs.
+    """
+
+
+class StorageBackend(ABC):
+    """
+    Object storage used for evidence. Keys are "/"-separated paths.
+    `head` returns S3-shaped metadata ({"ContentLength", "ContentType",
+    "LastModified"}) or None,
+    `list_objects` yields {"Key", "Size", "LastModified"} dicts.
+    """
+
+    # Whether presigned_put works (clients upload straight to the bucket)
+    supports_direct_upload = False
+
+    @abstractmethod
+    def public_url(self, key: str) -> str: ...
+
+    @abstractmethod
+    def key_for_url(self, url: str): ...
+
+    @abstractmethod
+    def upload_fileobj(self, key: str, file_obj, content_type: str): ...
+
+    @abstractmethod
+    def download_to_file(self, key: str, file_obj): ...
+
+    @abstractmethod
+    def iter_object(self, key: str, start: int = 0, end: int = None, chunk_size: int = MB):
+        """
+        Yields the bytes of `key` from `start` to `end` (inclusive, None = EOF).
+        """
+
+    @abstractmethod
+    def head(self, key: str): ...
+
+    @abstractmethod
+    def delete(self, key: str): ...
+
+    @abstractmethod
+    def delete_many(self, keys: list) -> list:
+        """
+        Deletes up to DELETE_BATCH_SIZE keys; returns the keys that failed.
+        """
+
+    @abstractmethod
+    def list_objects(self, prefix: str = ""): ...
+
+    def presigned_put(self, key: str, content_type: str, expires_in: int) -> str:
+        """
+        Only called when supports_direct_upload is set.
+        """
+        raise DirectUploadUnsupported("This storage backend does not support direct uploads")
+
+    @abstractmethod
+    def presigned_get(self, key: str, expires_in: int) -> str: ...
+
+    @abstractmethod
+    def create_multipart_upload(self, key: str, content_type: str) -> str: ...
+
+    @abstractmethod
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str: ...
+
+    @abstractmethod
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list): ...
+
+    @abstractmethod
+    def abort_multipart_upload(self, key: str, upload_id: str): ...
+
+
+# ======================================================
+# S3 / Backblaze B2
+# ======================================================
+class S3StorageBackend(StorageBackend):
+    supports_direct_upload = True
+
+    def __init__(self, *, endpoint_url, key_id, application_key, bucket):
+        if not all([endpoint_url, key_id, application_key, bucket]):
+            raise RuntimeError("Missing Backblaze B2 environment variables")
+
+        self.endpoint_url = endpoint_url
+        self.key_id = key_id
+        self.application_key = application_key
+        self.bucket = bucket
+
+        self._client = None
+        self._lock = threading.Lock()
+
+        from boto3.s3.transfer import TransferConfig
+        self.transfer_config = TransferConfig(
+            multipart_threshold=B2_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=B2_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=B2_MAX_CONCURRENCY,
+            use_threads=B2_MAX_CONCURRENCY > 1,
+        )
+
+    @property
+    def client(self):
+        """
+        Built on first use, then shared (boto3 clients are thread-safe).
+        """
+
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+
+                    self._client = boto3.client(
+                        "s3",
+                        endpoint_url=self.endpoint_url,
+                        aws_access_key_id=self.key_id,
+                        aws_secret_access_key=self.application_key,
+                        config=Config(
+                            # Every concurrent part upload needs its own pooled connection
+                            max_pool_connections=STORAGE_MAX_POOL_CONNECTIONS,
+                            connect_timeout=STORAGE_CONNECT_TIMEOUT,
+                            read_timeout=STORAGE_READ_TIMEOUT,
+                            tcp_keepalive=STORAGE_TCP_KEEPALIVE,
+                            retries={"max_attempts": STORAGE_MAX_RETRIES, "mode": "standard"},
+                        ),
+                    )
+        return self._client
+
+    def public_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{key}"
+
+    def key_for_url(self, url: str):
+        prefix = f"{self.endpoint_url}/{self.bucket}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
+
+    def upload_fileobj(self, key: str, file_obj, content_type: str):
+        counter = _ByteCounter()
+        started = time.perf_counter()
+
+        self.client.upload_fileobj(
+            Fileobj=file_obj,
+            Bucket=self.bucket,
+            Key=key,
+            ExtraArgs={"ContentType": content_type},
+            Config=self.transfer_config,
+            Callback=counter,
+        )
+
+        record_upload_metrics(counter.bytes, time.perf_counter() - started)
+
+    def download_to_file(self, key: str, file_obj):
+        self.client.download_fileobj(
+            Bucket=self.bucket,
+            Key=key,
+            Fileobj=file_obj,
+            Config=self.transfer_config,
+        )
+
+    def iter_object(self, key: str, start: int = 0, end: int = None, chunk_size: int = MB):
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = self.client.get_object(Bucket=self.bucket, Key=key, Range=byte_range)
+
+        body = response["Body"]
+        try:
+            for chunk in body.iter_chunks(chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    def head(self, key: str):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_many(self, keys: list) -> list:
+        if not keys:
+            return []
+        if len(keys) > DELETE_BATCH_SIZE:
+            raise ValueError(f"At most {DELETE_BATCH_SIZE} keys per delete_many call")
+
+        response = self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={
+                "Objects": [{"Key": key} for key in keys],
+                "Quiet": True,  # only errors come back
+            },
+        )
+        return [error["Key"] for error in response.get("Errors", [])]
+
+    def list_objects(self, prefix: str = ""):
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield {
+                    "Key": obj["Key"],
+                    "Size": obj["Size"],
+                    "LastModified": obj["LastModified"],
+                }
+
+    def presigned_put(self, key: str, content_type: str, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ContentType": content_type,
+            },
+            ExpiresIn=expires_in,
+        )
+
+    def presigned_get(self, key: str, expires_in: int) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            ContentType=content_type,
+        )
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        started = time.perf_counter()
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        record_upload_metrics(len(body), time.perf_counter() - started)
+        return response["ETag"]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list):
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [
+                    {"PartNumber": number, "ETag": etag}
+                    for number, etag in parts
+                ]
+            },
+        )
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except ClientError as e:
+            # Already completed, aborted or expired on the B2 side
+            if e.response.get("Error", {}).get("Code") != "NoSuchUpload":
+                raise
+
+
+# ======================================================
+# Local filesystem
+# ======================================================
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores objects under `root`. Content types live in a sidecar
+    "<file>.content-type" so head() can report them.
+    """
+
+    COPY_CHUNK_SIZE = MB
+
+    def __init__(self, *, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        self.multipart_root = os.path.join(self.root, ".multipart")
+
+    def path_for(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def key_for_url(self, url: str):
+        prefix = f"{self.base_url}/"
+        if not url or not url.startswith(prefix):
+            return None
+        return url[len(prefix):]
+
+    def presigned_get(self, key: str, expires_in: int) -> str:
+        # Dev backend: files are served unauthenticated from /local-storage
+        return self.public_url(key)
+
+    def write_content_type(self, path: str, content_type: str):
+        with open(path + ".content-type", "w") as f:
+            f.write(content_type or "application/octet-stream")
+
+    def upload_fileobj(self, key: str, file_obj, content_type: str):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        started = time.perf_counter()
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as out:
+            shutil.copyfileobj(file_obj, out, self.COPY_CHUNK_SIZE)
+        os.replace(tmp_path, path)
+        self.write_content_type(path, content_type)
+
+        record_upload_metrics(os.path.getsize(path), time.perf_counter() - started)
+
+    def download_to_file(self, key: str, file_obj):
+        with open(self.path_for(key), "rb") as f:
+            shutil.copyfileobj(f, file_obj, self.COPY_CHUNK_SIZE)
+
+    def iter_object(self, key: str, start: int = 0, end: int = None, chunk_size: int = MB):
+        with open(self.path_for(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def head(self, key: str):
+        path = self.path_for(key)
+        if not os.path.isfile(path):
+            return None
+
+        content_type = "application/octet-stream"
+        if os.path.exists(path + ".content-type"):
+            with open(path + ".content-type") as f:
+                content_type = f.read().strip()
+
+        stat = os.stat(path)
+        return {
+            "ContentLength": stat.st_size,
+            "ContentType": content_type,
+            "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+        }
+
+    def delete(self, key: str):
+        path = self.path_for(key)
+        for p in (path, path + ".content-type"):
+            if os.path.exists(p):
+                os.remove(p)
+
+    def delete_many(self, keys: list) -> list:
+        failed = []
+        for key in keys:
+            try:
+                self.delete(key)
+            except (OSError, ValueError):
+                failed.append(key)
+        return failed
+
+    def list_objects(self, prefix: str = ""):
+        for root, dirs, files in os.walk(self.root):
+            if root == self.root and ".multipart" in dirs:
+                dirs.remove(".multipart")
+
+            for filename in files:
+                # Sidecars and in-flight writes are not objects
+                if filename.endswith((".content-type", ".tmp")):
+                    continue
+
+                path = os.path.join(root, filename)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if not key.startswith(prefix):
+                    continue
+
+                stat = os.stat(path)
+                yield {
+                    "Key": key,
+                    "Size": stat.st_size,
+                    "LastModified": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                }
+
+    def create_multipart_upload(self, key: str, content_type: str) -> str:
+        upload_id = uuid.uuid4().hex
+        upload_dir = os.path.join(self.multipart_root, upload_id)
+        os.makedirs(upload_dir)
+        with open(os.path.join(upload_dir, "content-type"), "w") as f:
+            f.write(content_type)
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> str:
+        upload_dir = os.path.join(self.multipart_root, upload_id)
+        if not os.path.isdir(upload_dir):
+            raise ValueError("Unknown multipart upload")
+
+        with open(os.path.join(upload_dir, f"{part_number:05d}"), "wb") as f:
+            f.write(body)
+        return f'"{part_number}-{len(body)}"'
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list):
+        upload_dir = os.path.join(self.multipart_root, upload_id)
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "wb") as out:
+            for number, _ in parts:
+                with open(os.path.join(upload_dir, f"{number:05d}"), "rb") as part:
+                    shutil.copyfileobj(part, out, self.COPY_CHUNK_SIZE)
+
+        with open(os.path.join(upload_dir, "content-type")) as f:
+            self.write_content_type(path, f.read())
+
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    def abort_multipart_upload(self, key: str, upload_id: str):
+        shutil.rmtree(os.path.join(self.multipart_root, upload_id), ignore_errors=True)
+
+
+# ======================================================
+# Backend selection (lazy, one per process)
+# ======================================================
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def build_storage_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name in ("b2", "s3"):
+        return S3StorageBackend(
+            endpoint_url=B2_ENDPOINT_URL,
+            key_id=B2_KEY_ID,
+            application_key=B2_APPLICATION_KEY,
+            bucket=B2_BUCKET_NAME,
+        )
+
+    if name == "local":
+        return LocalStorageBackend(
+            root=STORAGE_LOCAL_ROOT,
+            base_url=STORAGE_LOCAL_BASE_URL,
+        )
+
+    raise RuntimeError(f"Unknown STORAGE_BACKEND: {name}")
+
+
+def get_storage() -> StorageBackend:
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = build_storage_backend()
+    return _backend
+
+
+def set_storage(backend: StorageBackend):
+    """
+    Swaps the process-wide backend (tests, benchmarks).
+    """
+
+    global _backend
+    _backend = backend
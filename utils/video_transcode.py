@@ -0,0 +1,235 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+from sqlalchemy.orm import Session
+
+from models.evidence import Evidence
+from utils.media_jobs import PermanentJobError
+from utils.blob_utils import (
+    key_for_url,
+    public_url_for_key,
+    download_to_file,
+    upload_file_to_b2,
+)
+
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFPROBE_BIN = os.getenv("FFPROBE_BIN", "ffprobe")
+
+# (name, height, video kbps, audio kbps) — rungs taller than the source are skipped
+HLS_LADDER = [
+    ("360p", 360, 800, 96),
+    ("720p", 720, 2800, 128),
+    ("1080p", 1080, 5000, 160),
+]
+
+# Whole transcode (every ffmpeg run) must finish well inside the media
+# worker's 30 minute job lease, or another worker takes the job over
+TRANSCODE_TIMEOUT_SECONDS = int(os.getenv("TRANSCODE_TIMEOUT_SECONDS", 20 * 60))
+
+HLS_SEGMENT_SECONDS = 4
+POSTER_AT_SECONDS = 1
+
+CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".jpg": "image/jpeg",
+}
+
+
+class TranscodeTimeout(PermanentJobError):
+    pass
+
+
+def run(cmd: list, deadline: float = None):
+    """
+    Runs ffmpeg/ffprobe, killing it if it is still going at `deadline`
+    (time.monotonic()). A timeout is not retried: the same input would hang again.
+    """
+
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise TranscodeTimeout(f"Transcode exceeded {TRANSCODE_TIMEOUT_SECONDS}s")
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise TranscodeTimeout(f"{cmd[0]} exceeded the {TRANSCODE_TIMEOUT_SECONDS}s transcode budget")
+
+    if result.returncode != 0:
+        raise RuntimeError(f"{cmd[0]} failed: {result.stderr[-2000:]}")
+    return result.stdout
+
+
+def probe_video(path: str, deadline: float = None) -> dict:
+    """
+    Returns {"width", "height", "has_audio"} for the first video stream.
+    """
+
+    out = run([
+        FFPROBE_BIN, "-v", "error",
+        "-show_entries", "stream=codec_type,width,height",
+        "-of", "json", path,
+    ], deadline)
+    streams = json.loads(out).get("streams", [])
+
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if not video:
+        raise ValueError("No video stream found")
+
+    return {
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
+
+
+def ladder_for(source_height: int) -> list:
+    rungs = [r for r in HLS_LADDER if r[1] <= source_height]
+    # Very small sources still get one rendition at their own size
+    return rungs or [("source", source_height, HLS_LADDER[0][2], HLS_LADDER[0][3])]
+
+
+def transcode_rendition(source: str, out_dir: str, name: str, height: int, v_kbps: int, a_kbps: int, has_audio: bool, deadline: float = None):
+    os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+
+    cmd = [
+        FFMPEG_BIN, "-y", "-v", "error",
+        "-i", source,
+        "-map", "0:v:0",
+    ]
+    if has_audio:
+        cmd += ["-map", "0:a:0", "-c:a", "aac", "-b:a", f"{a_kbps}k", "-ac", "2"]
+
+    cmd += [
+        # -2 keeps the width even, as H.264 requires
+        "-vf", f"scale=-2:{height}",
+        "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+        # Phones often record 4:2:2/4:4:4; players and the main profile need 4:2:0
+        "-pix_fmt", "yuv420p",
+        "-b:v", f"{v_kbps}k",
+        "-maxrate", f"{int(v_kbps * 1.07)}k",
+        "-bufsize", f"{v_kbps * 2}k",
+        # Keyframe at every segment boundary so players can switch rungs
+        "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SECONDS),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(out_dir, name, "seg_%05d.ts"),
+        os.path.join(out_dir, name, "index.m3u8"),
+    ]
+    run(cmd, deadline)
+
+
+def extract_poster(source: str, path: str, deadline: float = None):
+    # Clips shorter than POSTER_AT_SECONDS fall back to the first frame
+    for offset in (POSTER_AT_SECONDS, 0):
+        run([
+            FFMPEG_BIN, "-y", "-v", "error",
+            "-ss", str(offset), "-i", source,
+            "-frames:v", "1", "-q:v", "3",
+            path,
+        ], deadline)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            return
+    raise RuntimeError("Could not extract a poster frame")
+
+
+def write_master_playlist(out_dir: str, renditions: list, source_width: int, source_height: int):
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+
+    for name, height, v_kbps, a_kbps in renditions:
+        width = int(round(source_width * height / source_height / 2)) * 2
+        bandwidth = (v_kbps + a_kbps) * 1000
+        lines.append(f"#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},RESOLUTION={width}x{height}")
+        lines.append(f"{name}/index.m3u8")
+
+    with open(os.path.join(out_dir, "master.m3u8"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def upload_tree(out_dir: str, key_prefix: str):
+    for root, _, files in os.walk(out_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            rel = os.path.relpath(path, out_dir).replace(os.sep, "/")
+            ext = os.path.splitext(filename)[1]
+
+            with open(path, "rb") as f:
+                upload_file_to_b2(
+                    file_obj=f,
+                    original_filename=filename,
+                    content_type=CONTENT_TYPES.get(ext, "application/octet-stream"),
+                    key=f"{key_prefix}/{rel}",
+                )
+
+
+def transcode_to_hls(db: Session, evidence: Evidence):
+    """
+    Media-job handler: transcodes a video into an HLS ladder plus a poster
+    frame, uploads them next to the original and marks the evidence ready.
+    Commits once up front to publish the "processing" status; the caller
+    commits the result. Raises TranscodeTimeout past TRANSCODE_TIMEOUT_SECONDS.
+    """
+
+    # Same content already transcoded (deduplicated upload) → reuse
+    if evidence.content_sha256:
+        twin = (
+            db.query(Evidence)
+            .filter(
+                Evidence.content_sha256 == evidence.content_sha256,
+                Evidence.id != evidence.id,
+                Evidence.processing_status == "ready",
+            )
+            .first()
+        )
+        if twin:
+            evidence.hls_url = twin.hls_url
+            evidence.poster_url = twin.poster_url
+            evidence.processing_status = "ready"
+            return
+
+    original_key = key_for_url(evidence.blob_url)
+    if not original_key:
+        raise ValueError(f"Evidence {evidence.id} is not stored in our bucket")
+
+    # Visible to clients while the (long) transcode runs
+    evidence.processing_status = "processing"
+    db.commit()
+
+    stem = os.path.splitext(original_key)[0]
+    key_prefix = f"{stem}/hls"
+
+    deadline = time.monotonic() + TRANSCODE_TIMEOUT_SECONDS
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source = os.path.join(work_dir, "source")
+        with open(source, "wb") as f:
+            download_to_file(original_key, f)
+
+        info = probe_video(source, deadline)
+        renditions = ladder_for(info["height"])
+
+        # Upload-time extraction only reads the container header
+        evidence.width = evidence.width or info["width"]
+        evidence.height = evidence.height or info["height"]
+
+        out_dir = os.path.join(work_dir, "hls")
+        os.makedirs(out_dir)
+
+        for name, height, v_kbps, a_kbps in renditions:
+            transcode_rendition(source, out_dir, name, height, v_kbps, a_kbps, info["has_audio"], deadline)
+
+        write_master_playlist(out_dir, renditions, info["width"], info["height"])
+
+        extract_poster(source, os.path.join(out_dir, "poster.jpg"), deadline)
+
+        upload_tree(out_dir, key_prefix)
+
+    evidence.hls_url = public_url_for_key(f"{key_prefix}/master.m3u8")
+    evidence.poster_url = public_url_for_key(f"{key_prefix}/poster.jpg")
+    evidence.processing_status = "ready"
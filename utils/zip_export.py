@@ -0,0 +1,137 @@
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import metrics
+from utils.blob_utils import MB, download_to_file
+
+EXPORT_CONCURRENCY = int(os.getenv("EXPORT_CONCURRENCY", 4))
+
+# Downloads allowed to run ahead of the file currently being zipped
+# (bounds temp disk use for large entries)
+EXPORT_PREFETCH = int(os.getenv("EXPORT_PREFETCH", EXPORT_CONCURRENCY * 2))
+
+COPY_CHUNK_SIZE = MB
+
+
+class _StreamSink:
+    """
+    Write-only target for ZipFile; the generator drains it after each write.
+    Having no seek() makes zipfile emit streaming-friendly data descriptors.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offset = 0
+
+    def write(self, data):
+        self.buffer += data
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def archive_name(item: dict) -> str:
+    """
+    evidence/0042.mp4 — id-prefixed so names never collide.
+    """
+
+    ext = os.path.splitext(item["key"] or "")[1]
+    if not ext and item.get("mime_type"):
+        ext = mimetypes.guess_extension(item["mime_type"]) or ""
+    return f"evidence/{item['id']:04d}{ext}"
+
+
+def _fetch(key: str, work_dir: str, index: int) -> str:
+    path = os.path.join(work_dir, str(index))
+    with open(path, "wb") as f:
+        download_to_file(key, f)
+    return path
+
+
+def stream_zip(manifest: dict, items: list):
+    """
+    Yields a ZIP of `items` (dicts with "id", "key", "mime_type") followed
+    by manifest.json. Objects are downloaded concurrently to temp files,
+    a bounded window ahead, and copied into the archive chunk by chunk.
+    Files that cannot be fetched are listed under manifest["errors"].
+    """
+
+    sink = _StreamSink()
+    work_dir = tempfile.mkdtemp(prefix="ares-export-")
+    executor = ThreadPoolExecutor(max_workers=EXPORT_CONCURRENCY)
+    errors = []
+
+    try:
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            pending = deque()
+            queue = deque(
+                (index, item) for index, item in enumerate(items) if item["key"]
+            )
+            for item in items:
+                if not item["key"]:
+                    errors.append({"evidence_id": item["id"], "error": "File is not in our storage"})
+
+            def fill_window():
+                while queue and len(pending) < EXPORT_PREFETCH:
+                    index, item = queue.popleft()
+                    pending.append((item, executor.submit(_fetch, item["key"], work_dir, index)))
+
+            fill_window()
+            while pending:
+                item, future = pending.popleft()
+                fill_window()
+
+                try:
+                    path = future.result()
+                except Exception as e:
+                    errors.append({"evidence_id": item["id"], "error": str(e)})
+                    continue
+
+                item["archive_name"] = archive_name(item)
+                info = zipfile.ZipInfo(item["archive_name"], date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_STORED  # media is already compressed
+
+                with open(path, "rb") as src, archive.open(info, "w", force_zip64=True) as dest:
+                    while True:
+                        chunk = src.read(COPY_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield sink.drain()
+                os.remove(path)
+                yield sink.drain()
+
+            names = {item["id"]: item.get("archive_name") for item in items}
+            for entry in manifest["evidence"]:
+                entry["file"] = names.get(entry["id"])
+            manifest["errors"] = errors
+
+            archive.writestr(
+                "manifest.json",
+                json.dumps(manifest, indent=2, default=str),
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+
+        yield sink.drain()
+        metrics.incr("exports.zip.count")
+        metrics.incr("exports.zip.bytes", sink.offset)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(work_dir, ignore_errors=True)